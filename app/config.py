@@ -16,13 +16,247 @@ TRUSTED_SOURCES = [
     "https://www.theguardian.com"  # The Guardian
 ]
 
-# NLP Model configuration: specifies the name of the NLP model to be used, defaulting to a BERT model.
-NLP_MODEL_NAME = os.getenv("NLP_MODEL_NAME", "bert-base-uncased")
+# Scraper: all scraping shares one HTTP connection pool of SCRAPER_MAX_CONNECTIONS connections, with at most
+# SCRAPER_MAX_PER_HOST concurrent requests per host. Page bodies are truncated at SCRAPER_MAX_BODY_BYTES, and
+# ETag/Last-Modified validators are kept for SCRAPER_VALIDATOR_CACHE_SIZE pages to skip unchanged ones.
+SCRAPER_MAX_CONNECTIONS = int(os.getenv("SCRAPER_MAX_CONNECTIONS", "20"))
+SCRAPER_MAX_PER_HOST = int(os.getenv("SCRAPER_MAX_PER_HOST", "4"))
+SCRAPER_TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT", "10"))
+SCRAPER_MAX_BODY_BYTES = int(os.getenv("SCRAPER_MAX_BODY_BYTES", str(2 * 1024 * 1024)))
+SCRAPER_VALIDATOR_CACHE_SIZE = int(os.getenv("SCRAPER_VALIDATOR_CACHE_SIZE", "512"))
+
+# NLP Model configuration: specifies the name of the zero-shot classification (NLI) model to be used,
+# defaulting to Facebook's BART-large-MNLI. The model is loaded on first use. A suffix selects the inference
+# backend: "@torch" (fp32 PyTorch, the default), "@int8" (dynamically quantized PyTorch, CPU only) or "@onnx"
+# (ONNX Runtime, requires optimum[onnxruntime]; the exported graph is kept in NLP_ONNX_CACHE_DIR).
+NLP_MODEL_NAME = os.getenv("NLP_MODEL_NAME", "facebook/bart-large-mnli")
+NLP_ONNX_CACHE_DIR = os.getenv("NLP_ONNX_CACHE_DIR", "./onnx_models")
+
+# Threads used by one inference (intra-op) and between independent operations (inter-op). With 0, the cores are
+# divided between the CPU pool's worker processes (CPU_POOL_SIZE), so that several workers on one node do not
+# oversubscribe the CPU; the inter-op count is then left to the backend.
+NLP_INFERENCE_THREADS = int(os.getenv("NLP_INFERENCE_THREADS", "0"))
+NLP_INTEROP_THREADS = int(os.getenv("NLP_INTEROP_THREADS", "0"))
+
+# Load the NLP model in the background when the application starts, instead of on the first text request.
+NLP_WARMUP_ON_STARTUP = os.getenv("NLP_WARMUP_ON_STARTUP", "True").lower() in ["true", "1", "t"]
+
+# Database tuning: SQLite databases use WAL journaling (readers do not block the writer) with synchronous=NORMAL,
+# wait up to SQLITE_BUSY_TIMEOUT_MS for locks instead of failing with "database is locked", and keep
+# SQLITE_CACHE_SIZE_KB of page cache per connection. DB_POOL_SIZE connections are kept open (DB_MAX_OVERFLOW more on demand).
+SQLITE_WAL_ENABLED = os.getenv("SQLITE_WAL_ENABLED", "True").lower() in ["true", "1", "t"]
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "20000"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+
+# Write-behind persistence: when enabled, News rows are queued and inserted in bulk transactions of up to
+# NEWS_WRITE_BATCH_SIZE rows, at most NEWS_WRITE_FLUSH_MS milliseconds after they are queued. Record ids are
+# allocated up front from blocks of NEWS_ID_BLOCK_SIZE ids, so responses carry the final id either way.
+# A failed bulk insert is retried NEWS_WRITE_RETRIES times, NEWS_WRITE_RETRY_MS apart (doubling each time); the
+# rows of a batch that still fails are then inserted one by one, so one bad row does not lose the others.
+NEWS_WRITE_BEHIND = os.getenv("NEWS_WRITE_BEHIND", "False").lower() in ["true", "1", "t"]
+NEWS_WRITE_BATCH_SIZE = int(os.getenv("NEWS_WRITE_BATCH_SIZE", "100"))
+NEWS_WRITE_FLUSH_MS = float(os.getenv("NEWS_WRITE_FLUSH_MS", "200"))
+NEWS_ID_BLOCK_SIZE = int(os.getenv("NEWS_ID_BLOCK_SIZE", "100"))
+NEWS_WRITE_RETRIES = int(os.getenv("NEWS_WRITE_RETRIES", "2"))
+NEWS_WRITE_RETRY_MS = float(os.getenv("NEWS_WRITE_RETRY_MS", "100"))
+
+# Verdict reports are stored as a compact JSON summary in news.analysis_report, and the full report in a side table
+# (news_report_details) that is only read on demand. Full reports larger than REPORT_COMPRESS_MIN_BYTES are compressed
+# with REPORT_COMPRESSION: "zlib", "zstd" (requires the zstandard package; zlib is used without it) or "none".
+REPORT_COMPRESSION = os.getenv("REPORT_COMPRESSION", "zlib")
+REPORT_COMPRESS_MIN_BYTES = int(os.getenv("REPORT_COMPRESS_MIN_BYTES", "512"))
+
+# Headline store: scraped headlines are stored in the database with a full-text index. When enabled, a background
+# job refreshes the trusted sources every HEADLINE_REFRESH_INTERVAL seconds, so requests never wait on a scrape.
+# Text and link reports list up to HEADLINE_MATCH_LIMIT stored headlines seen within HEADLINE_MATCH_MAX_AGE_DAYS.
+HEADLINE_REFRESH_ENABLED = os.getenv("HEADLINE_REFRESH_ENABLED", "True").lower() in ["true", "1", "t"]
+HEADLINE_REFRESH_INTERVAL = float(os.getenv("HEADLINE_REFRESH_INTERVAL", "900"))
+HEADLINE_MATCH_LIMIT = int(os.getenv("HEADLINE_MATCH_LIMIT", "5"))
+HEADLINE_MATCH_MAX_AGE_DAYS = float(os.getenv("HEADLINE_MATCH_MAX_AGE_DAYS", "7"))
+
+# Semantic similarity: texts are compared with trusted-source headlines embedded by SIMILARITY_MODEL_NAME and
+# stored in a memory-mapped index under SIMILARITY_INDEX_DIR. Headlines not seen for SIMILARITY_MAX_AGE_DAYS are evicted.
+SIMILARITY_ENABLED = os.getenv("SIMILARITY_ENABLED", "False").lower() in ["true", "1", "t"]
+SIMILARITY_INDEX_DIR = os.getenv("SIMILARITY_INDEX_DIR", "./similarity_index")
+SIMILARITY_MODEL_NAME = os.getenv("SIMILARITY_MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2")
+SIMILARITY_TOP_K = int(os.getenv("SIMILARITY_TOP_K", "3"))
+SIMILARITY_MAX_AGE_DAYS = float(os.getenv("SIMILARITY_MAX_AGE_DAYS", "30"))
+
+# NLP micro-batching: concurrent text analyses are grouped into batches of at most NLP_BATCH_MAX_SIZE texts,
+# waiting at most NLP_BATCH_MAX_WAIT_MS milliseconds for a batch to fill before running the classifier.
+NLP_BATCHING_ENABLED = os.getenv("NLP_BATCHING_ENABLED", "True").lower() in ["true", "1", "t"]
+NLP_BATCH_MAX_SIZE = int(os.getenv("NLP_BATCH_MAX_SIZE", "8"))
+NLP_BATCH_MAX_WAIT_MS = float(os.getenv("NLP_BATCH_MAX_WAIT_MS", "10"))
+# Maximum number of texts waiting for a batch; further requests are rejected with 429 (0 means unbounded).
+NLP_BATCH_MAX_QUEUE = int(os.getenv("NLP_BATCH_MAX_QUEUE", "256"))
+
+# Long texts are split into overlapping windows of NLP_CHUNK_TOKENS tokens (consecutive windows share
+# NLP_CHUNK_OVERLAP tokens, at most NLP_MAX_CHUNKS windows per text), which are classified in one batched pass.
+# The per-window scores are combined with NLP_CHUNK_AGGREGATION: "mean", "min" or "attention" (a softmax
+# weighting that leans towards the least credible windows).
+NLP_CHUNKING_ENABLED = os.getenv("NLP_CHUNKING_ENABLED", "True").lower() in ["true", "1", "t"]
+NLP_CHUNK_TOKENS = int(os.getenv("NLP_CHUNK_TOKENS", "400"))
+NLP_CHUNK_OVERLAP = int(os.getenv("NLP_CHUNK_OVERLAP", "64"))
+NLP_MAX_CHUNKS = int(os.getenv("NLP_MAX_CHUNKS", "32"))
+NLP_CHUNK_AGGREGATION = os.getenv("NLP_CHUNK_AGGREGATION", "mean")
+# Largest number of (chunk, label) sequences the classifier runs through the model in one forward pass;
+# a batch with more chunks is processed in several passes, bounding the memory of a single pass.
+NLP_MAX_INFERENCE_BATCH = int(os.getenv("NLP_MAX_INFERENCE_BATCH", "64"))
+
+# Confidence cascade: with NLP_CASCADE_ENABLED, every text is first scored by a cheap hashed n-gram linear model
+# (trained offline by train_cascade.py and stored at NLP_CASCADE_MODEL_PATH). Only texts whose cheap score falls
+# inside the uncertainty band [NLP_CASCADE_LOW, NLP_CASCADE_HIGH] are escalated to the zero-shot classifier; a wider
+# band is more accurate, a narrower one faster (see benchmarks/bench_cascade.py).
+NLP_CASCADE_ENABLED = os.getenv("NLP_CASCADE_ENABLED", "False").lower() in ["true", "1", "t"]
+NLP_CASCADE_MODEL_PATH = os.getenv("NLP_CASCADE_MODEL_PATH", "./cascade_model.npz")
+NLP_CASCADE_FEATURES = int(os.getenv("NLP_CASCADE_FEATURES", str(2 ** 18)))
+NLP_CASCADE_LOW = float(os.getenv("NLP_CASCADE_LOW", "0.2"))
+NLP_CASCADE_HIGH = float(os.getenv("NLP_CASCADE_HIGH", "0.8"))
+
+# CPU pool: CPU-bound analysis (NLP inference, image and video decoding) runs in CPU_POOL_SIZE worker processes,
+# started with CPU_POOL_START_METHOD and, if CPU_POOL_PRELOAD_NLP is set, with the NLP model loaded in each worker.
+# With CPU_POOL_SIZE=0 the work runs in a pool of CPU_POOL_THREADS threads instead. When CPU_POOL_MAX_PENDING jobs
+# are running or queued (0 means four per worker or thread), further requests are rejected with 429.
+CPU_POOL_SIZE = int(os.getenv("CPU_POOL_SIZE", "0"))
+CPU_POOL_THREADS = int(os.getenv("CPU_POOL_THREADS", "4"))
+CPU_POOL_MAX_PENDING = int(os.getenv("CPU_POOL_MAX_PENDING", "0"))
+CPU_POOL_PRELOAD_NLP = os.getenv("CPU_POOL_PRELOAD_NLP", "True").lower() in ["true", "1", "t"]
+CPU_POOL_START_METHOD = os.getenv("CPU_POOL_START_METHOD", "spawn")
+
+# Uploads: forms are read straight from the request stream. Images (at most IMAGE_MAX_UPLOAD_BYTES) are analyzed from
+# memory, downscaled to IMAGE_MAX_SIDE pixels; videos (at most VIDEO_MAX_UPLOAD_BYTES) are written once, to a unique
+# temporary file in UPLOAD_SPOOL_DIR (the system temporary directory by default). Larger uploads are rejected with 413
+# as soon as their Content-Length or the received bytes exceed the limit.
+IMAGE_MAX_UPLOAD_BYTES = int(os.getenv("IMAGE_MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+VIDEO_MAX_UPLOAD_BYTES = int(os.getenv("VIDEO_MAX_UPLOAD_BYTES", str(1024 * 1024 * 1024)))
+IMAGE_MAX_SIDE = int(os.getenv("IMAGE_MAX_SIDE", "1024"))
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None
+
+# Streaming verification (POST /news/verify/stream): a comment line is sent after SSE_KEEPALIVE_SECONDS without an
+# event, so proxies do not close the connection during a long analysis.
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+
+# Latency budget: a verification answers within VERIFY_BUDGET_SECONDS (0 disables the budget); a request may ask for
+# another budget with 'budget_seconds', up to VERIFY_BUDGET_MAX_SECONDS. Each stage gets a share of the budget, capped
+# by what is left of it: scraping a link VERIFY_SHARE_SCRAPE, text analysis VERIFY_SHARE_NLP, image or video analysis
+# VERIFY_SHARE_MEDIA and the social media platforms VERIFY_SHARE_SOCIAL (they run concurrently with the primary
+# analysis). VERIFY_BUDGET_RESERVE_SECONDS are kept for the final verdict. Stages that overrun are cancelled or cut
+# short, and the verdict is computed from the components that completed.
+VERIFY_BUDGET_SECONDS = float(os.getenv("VERIFY_BUDGET_SECONDS", "15"))
+VERIFY_BUDGET_MAX_SECONDS = float(os.getenv("VERIFY_BUDGET_MAX_SECONDS", "60"))
+VERIFY_BUDGET_RESERVE_SECONDS = float(os.getenv("VERIFY_BUDGET_RESERVE_SECONDS", "0.5"))
+VERIFY_SHARE_SCRAPE = float(os.getenv("VERIFY_SHARE_SCRAPE", "0.4"))
+VERIFY_SHARE_NLP = float(os.getenv("VERIFY_SHARE_NLP", "0.6"))
+VERIFY_SHARE_MEDIA = float(os.getenv("VERIFY_SHARE_MEDIA", "0.8"))
+VERIFY_SHARE_SOCIAL = float(os.getenv("VERIFY_SHARE_SOCIAL", "0.6"))
+
+# Batch verification: at most VERIFY_BATCH_MAX_ITEMS items per request, verified VERIFY_BATCH_CONCURRENCY at a time.
+VERIFY_BATCH_MAX_ITEMS = int(os.getenv("VERIFY_BATCH_MAX_ITEMS", "10000"))
+VERIFY_BATCH_CONCURRENCY = int(os.getenv("VERIFY_BATCH_CONCURRENCY", "32"))
+
+# Verification jobs (POST /news/jobs): JOB_WORKERS jobs run concurrently, picked by priority per input type
+# (JOB_PRIORITIES, lower runs first) then by age. Job state is stored in the application database and finished jobs
+# are deleted after JOB_RESULT_TTL seconds. Uploads of media jobs are kept in JOB_SPOOL_DIR until the job expires.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_PRIORITIES = {
+    input_type: int(priority)
+    for input_type, priority in (
+        entry.split(":") for entry in os.getenv("JOB_PRIORITIES", "text:0,link:1,image:2,video:3").split(",") if entry
+    )
+}
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "86400"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+JOB_SPOOL_DIR = os.getenv("JOB_SPOOL_DIR", "./job_uploads")
+# A running job is leased to the process running it for JOB_LEASE_SECONDS, renewed while it runs. Jobs whose lease
+# has expired (their process died) are queued again, while jobs of live processes are left alone.
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+# Video analysis: about VIDEO_SAMPLE_FRAMES frames are decoded per video. Targets less than VIDEO_SEEK_THRESHOLD
+# frames ahead are reached by grabbing, farther ones by seeking. Videos longer than VIDEO_SEGMENT_SECONDS are split
+# into segments sampled in parallel by VIDEO_SEGMENT_WORKERS threads (OpenCV decodes without holding the GIL), as
+# long as each segment keeps at least VIDEO_SEGMENT_MIN_FRAMES sampled frames; shorter videos are sampled in one pass.
+VIDEO_SAMPLE_FRAMES = int(os.getenv("VIDEO_SAMPLE_FRAMES", "10"))
+VIDEO_SEEK_THRESHOLD = int(os.getenv("VIDEO_SEEK_THRESHOLD", "48"))
+VIDEO_SEGMENT_SECONDS = float(os.getenv("VIDEO_SEGMENT_SECONDS", "60"))
+VIDEO_SEGMENT_WORKERS = int(os.getenv("VIDEO_SEGMENT_WORKERS", "4"))
+VIDEO_SEGMENT_MIN_FRAMES = int(os.getenv("VIDEO_SEGMENT_MIN_FRAMES", "4"))
+
+# Reused media detection: uploaded images and MEDIA_HASH_VIDEO_FRAMES sampled video frames are fingerprinted with a
+# perceptual hash (MEDIA_HASH_ALGORITHM: "phash" or "dhash") and looked up in a persistent index. An image within
+# MEDIA_HASH_MAX_DISTANCE bits of a known one, or a video with at least MEDIA_HASH_VIDEO_MATCH_RATIO of its frames
+# matching frames of one known video, gets the earlier verdict and its first-seen date without a new analysis.
+MEDIA_HASH_ENABLED = os.getenv("MEDIA_HASH_ENABLED", "True").lower() in ["true", "1", "t"]
+MEDIA_HASH_ALGORITHM = os.getenv("MEDIA_HASH_ALGORITHM", "phash")
+MEDIA_HASH_MAX_DISTANCE = int(os.getenv("MEDIA_HASH_MAX_DISTANCE", "8"))
+MEDIA_HASH_VIDEO_FRAMES = int(os.getenv("MEDIA_HASH_VIDEO_FRAMES", "10"))
+MEDIA_HASH_VIDEO_MATCH_RATIO = float(os.getenv("MEDIA_HASH_VIDEO_MATCH_RATIO", "0.6"))
+
+# Verdict cache: results of /news/verify are cached by a hash of the normalized input, in a bounded in-memory
+# LRU tier (VERDICT_CACHE_MAX_ENTRIES entries) and optionally in a persistent table of the application database.
+# Each component has its own TTL in seconds, since social media scores go stale faster than NLP or media scores.
+VERDICT_CACHE_ENABLED = os.getenv("VERDICT_CACHE_ENABLED", "True").lower() in ["true", "1", "t"]
+VERDICT_CACHE_PERSISTENT = os.getenv("VERDICT_CACHE_PERSISTENT", "True").lower() in ["true", "1", "t"]
+VERDICT_CACHE_MAX_ENTRIES = int(os.getenv("VERDICT_CACHE_MAX_ENTRIES", "1024"))
+VERDICT_CACHE_TTL_PRIMARY = int(os.getenv("VERDICT_CACHE_TTL_PRIMARY", "86400"))
+VERDICT_CACHE_TTL_SOCIAL = int(os.getenv("VERDICT_CACHE_TTL_SOCIAL", "900"))
+VERDICT_CACHE_TTL_VERDICT = int(os.getenv("VERDICT_CACHE_TTL_VERDICT", str(min(VERDICT_CACHE_TTL_PRIMARY, VERDICT_CACHE_TTL_SOCIAL))))
 
 # API keys for social media platforms (placeholders); these should be set in the environment for production.
 TWITTER_API_KEY = os.getenv("TWITTER_API_KEY", "")
 FACEBOOK_API_KEY = os.getenv("FACEBOOK_API_KEY", "")
 INSTAGRAM_API_KEY = os.getenv("INSTAGRAM_API_KEY", "")
 
+# Social media fan-out: the platform analyzers run concurrently on a bounded thread pool of SOCIAL_MAX_WORKERS
+# threads. Each platform has its own timeout in seconds; a platform that times out is left out of the social score.
+# Instagram pagination also stops after SOCIAL_TIMEOUT_INSTAGRAM seconds, so the thread running it is freed.
+SOCIAL_MAX_WORKERS = int(os.getenv("SOCIAL_MAX_WORKERS", "8"))
+SOCIAL_TIMEOUT_TWITTER = float(os.getenv("SOCIAL_TIMEOUT_TWITTER", "5"))
+SOCIAL_TIMEOUT_FACEBOOK = float(os.getenv("SOCIAL_TIMEOUT_FACEBOOK", "5"))
+SOCIAL_TIMEOUT_INSTAGRAM = float(os.getenv("SOCIAL_TIMEOUT_INSTAGRAM", "8"))
+
+# Social signal cache: platform results are cached per (platform, keyword) for SOCIAL_CACHE_TTL_<PLATFORM> seconds, in
+# a bounded in-memory LRU of SOCIAL_CACHE_MAX_ENTRIES entries. Platform calls are rate limited by a token bucket per
+# platform (SOCIAL_RATE_LIMIT_<PLATFORM>, "<requests>/<seconds>", matching the platform's quota); when a bucket is
+# empty, an expired result no older than SOCIAL_STALE_TTL seconds is returned instead, or a "rate_limited" result.
+SOCIAL_CACHE_ENABLED = os.getenv("SOCIAL_CACHE_ENABLED", "True").lower() in ["true", "1", "t"]
+SOCIAL_CACHE_MAX_ENTRIES = int(os.getenv("SOCIAL_CACHE_MAX_ENTRIES", "4096"))
+SOCIAL_CACHE_TTL_TWITTER = int(os.getenv("SOCIAL_CACHE_TTL_TWITTER", "300"))
+SOCIAL_CACHE_TTL_FACEBOOK = int(os.getenv("SOCIAL_CACHE_TTL_FACEBOOK", "900"))
+SOCIAL_CACHE_TTL_INSTAGRAM = int(os.getenv("SOCIAL_CACHE_TTL_INSTAGRAM", "1800"))
+SOCIAL_STALE_TTL = int(os.getenv("SOCIAL_STALE_TTL", "86400"))
+SOCIAL_RATE_LIMIT_TWITTER = os.getenv("SOCIAL_RATE_LIMIT_TWITTER", "180/900")
+SOCIAL_RATE_LIMIT_FACEBOOK = os.getenv("SOCIAL_RATE_LIMIT_FACEBOOK", "200/3600")
+SOCIAL_RATE_LIMIT_INSTAGRAM = os.getenv("SOCIAL_RATE_LIMIT_INSTAGRAM", "100/3600")
+
+# Pre-fork serving (python -m app.serve): SERVE_WORKERS worker processes accept connections on SERVE_HOST:SERVE_PORT.
+# With SERVE_PRELOAD, the NLP model is loaded once in the parent before forking, so the workers share its weights
+# copy-on-write. A worker is replaced after SERVE_MAX_REQUESTS requests (plus up to SERVE_MAX_REQUESTS_JITTER, so
+# workers do not all restart together; 0 disables recycling) and gets SERVE_GRACEFUL_TIMEOUT seconds to finish its
+# requests when stopped.
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", str(os.cpu_count() or 1)))
+SERVE_HOST = os.getenv("SERVE_HOST", "0.0.0.0")
+SERVE_PORT = int(os.getenv("SERVE_PORT", "8000"))
+SERVE_PRELOAD = os.getenv("SERVE_PRELOAD", "True").lower() in ["true", "1", "t"]
+SERVE_MAX_REQUESTS = int(os.getenv("SERVE_MAX_REQUESTS", "0"))
+SERVE_MAX_REQUESTS_JITTER = int(os.getenv("SERVE_MAX_REQUESTS_JITTER", "0"))
+SERVE_GRACEFUL_TIMEOUT = float(os.getenv("SERVE_GRACEFUL_TIMEOUT", "30"))
+
+# Metrics: GET /metrics exposes per-stage and per-service latency histograms (METRICS_LATENCY_BUCKETS, in seconds),
+# error counters and in-flight gauges in the Prometheus text format. METRICS_SERVER_TIMING adds a Server-Timing header
+# with the timed stages to every response. A METRICS_PROFILE_SAMPLE_RATE fraction of requests runs under cProfile, and
+# the profiles of those taking at least METRICS_PROFILE_MIN_SECONDS are written to METRICS_PROFILE_DIR.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() in ["true", "1", "t"]
+METRICS_LATENCY_BUCKETS = tuple(
+    float(bound) for bound in os.getenv(
+        "METRICS_LATENCY_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30"
+    ).split(",") if bound
+)
+METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "False").lower() in ["true", "1", "t"]
+METRICS_PROFILE_SAMPLE_RATE = float(os.getenv("METRICS_PROFILE_SAMPLE_RATE", "0"))
+METRICS_PROFILE_MIN_SECONDS = float(os.getenv("METRICS_PROFILE_MIN_SECONDS", "1.0"))
+METRICS_PROFILE_DIR = os.getenv("METRICS_PROFILE_DIR", "./profiles")
+
 # Other configurations: a flag to indicate if the application should run in debug mode.
 DEBUG_MODE = os.getenv("DEBUG_MODE", "True").lower() in ["true", "1", "t"]
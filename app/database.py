@@ -1,13 +1,40 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-from app.config import DATABASE_URL
+from app.config import (
+    DATABASE_URL, SQLITE_WAL_ENABLED, SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KB, DB_POOL_SIZE, DB_MAX_OVERFLOW
+)
+
+_is_sqlite = DATABASE_URL.startswith("sqlite")
+_is_memory = _is_sqlite and (":memory:" in DATABASE_URL or DATABASE_URL.rstrip("/") == "sqlite:")
 
-# Create SQLAlchemy engine using the DATABASE_URL from configuration
+# Create SQLAlchemy engine using the DATABASE_URL from configuration.
+# File databases keep a pool of DB_POOL_SIZE connections, so requests do not reopen the database.
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+    connect_args={"check_same_thread": False} if _is_sqlite else {},
+    **({} if _is_memory else {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_pre_ping": not _is_sqlite})
 )
 
+@event.listens_for(engine, "connect")
+def _configure_sqlite(dbapi_connection, connection_record):
+    """
+    Tunes every new SQLite connection: WAL journaling lets readers run alongside the writer,
+    synchronous=NORMAL is durable in WAL mode with far fewer fsyncs, and the busy timeout makes
+    concurrent writers wait for the lock instead of failing with "database is locked".
+    """
+    if not _is_sqlite:
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+        if SQLITE_WAL_ENABLED and not _is_memory:
+            cursor.execute("PRAGMA journal_mode = WAL")
+            cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+    finally:
+        cursor.close()
+
 # Create a configured "Session" class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -1,17 +1,93 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.config import NLP_WARMUP_ON_STARTUP, HEADLINE_REFRESH_ENABLED, HEADLINE_REFRESH_INTERVAL, METRICS_ENABLED
 from app.routes.news import router as news_router
+from app.routes.models import router as models_router
+from app.services import (
+    model_registry, executor, scraper, scheduler, headline_store, verdict_cache, job_queue, news_writer, instrumentation
+)
+from app.services.nlp_service import get_batcher
+from app.migrations import migrate
+from app.services.social_service import shutdown_executor
+from app.services.media_service import shutdown_segment_executor
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Starts background services when the application starts and stops them on shutdown.
+    """
+    # Create missing tables and indexes and apply pending schema migrations
+    await asyncio.to_thread(migrate)
+    # Load the NLP model in the background so the first text request does not pay for it.
+    # When inference runs in worker processes, the workers load it instead.
+    if NLP_WARMUP_ON_STARTUP and not executor.uses_processes():
+        model_registry.warm_up()
+    # Start the CPU pool workers (and preload their models) before the first request
+    executor.start()
+    # Background jobs: refresh trusted-source headlines so requests never wait on a scrape,
+    # and drop expired verdict cache rows
+    if HEADLINE_REFRESH_ENABLED:
+        scheduler.add_task("refresh_trusted_sources", HEADLINE_REFRESH_INTERVAL, headline_store.refresh_trusted_sources)
+    scheduler.add_task("purge_verdict_cache", 3600, lambda: asyncio.to_thread(verdict_cache.purge_expired), initial_delay=60)
+    scheduler.add_task("purge_expired_jobs", 3600, lambda: asyncio.to_thread(job_queue.purge_expired), initial_delay=60)
+    scheduler.start()
+    # Workers running queued verification jobs (jobs interrupted by a restart are queued again)
+    job_queue.start()
+    yield
+    await job_queue.stop()
+    await scheduler.stop()
+    # Write the News rows still queued by the write-behind writer
+    news_writer.shutdown()
+    get_batcher().shutdown()
+    shutdown_executor()
+    executor.shutdown()
+    shutdown_segment_executor()
+    scraper.shutdown()
 
 # Create a FastAPI instance
 app = FastAPI(
     title="News Veracity Checker",
     description="AI tool to verify fake news using various services.",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
+@app.exception_handler(executor.PoolSaturatedError)
+async def pool_saturated_handler(request: Request, exc: executor.PoolSaturatedError):
+    """
+    Applies backpressure: when the CPU-bound analysis queue is full, the request is rejected
+    with 429 so the client can retry later instead of piling up behind the queue.
+    """
+    return JSONResponse(status_code=429, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+@app.get("/health", summary="Liveness check", tags=["Health"])
+async def health():
+    """
+    Cheap liveness check; it never waits on the analysis pool.
+    """
+    return {"status": "ok"}
+
+if METRICS_ENABLED:
+    # Request durations by route, plus the optional Server-Timing header and sampled profiles
+    app.add_middleware(instrumentation.MetricsMiddleware)
+
+    @app.get("/metrics", summary="Metrics in the Prometheus text format", tags=["Health"],
+             response_class=PlainTextResponse)
+    async def metrics():
+        """
+        Per-stage and per-service latency histograms, error counters and in-flight gauges of this process.
+        """
+        return PlainTextResponse(instrumentation.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Include the news router
 app.include_router(news_router, prefix="/news", tags=["News"])
 
+# Include the model registry router (readiness, swap and unload)
+app.include_router(models_router, prefix="/models", tags=["Models"])
+
 if __name__ == "__main__":
     import uvicorn
-    # Run the application using uvicorn server
+    # Run the application using uvicorn server (one process; see app/serve.py for several workers)
     uvicorn.run(app, host="0.0.0.0", port=8000)
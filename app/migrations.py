@@ -0,0 +1,137 @@
+import logging
+from datetime import datetime
+from sqlalchemy import Index, bindparam, inspect, select, text as sql_text
+
+from app.database import engine
+from app.models import Base, News, NewsReportDetail, SchemaMigration, VerificationJob
+from app.services import report_store
+
+logger = logging.getLogger(__name__)
+
+# Indexes backing the verdict query API (keyset pagination on (sort column, id))
+NEWS_INDEXES = [
+    Index("ix_news_published_date_id", News.published_date, News.id),
+    Index("ix_news_is_fake_published_date_id", News.is_fake, News.published_date, News.id),
+    Index("ix_news_veracity_score_id", News.veracity_score, News.id),
+    Index("ix_news_source_published_date_id", News.source, News.published_date, News.id),
+]
+
+# Full-text index over news titles and contents, kept in sync with the news table by triggers
+NEWS_FTS_STATEMENTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(title, content, content='news', content_rowid='id')",
+    """CREATE TRIGGER IF NOT EXISTS news_fts_insert AFTER INSERT ON news BEGIN
+        INSERT INTO news_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS news_fts_delete AFTER DELETE ON news BEGIN
+        INSERT INTO news_fts(news_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS news_fts_update AFTER UPDATE OF title, content ON news BEGIN
+        INSERT INTO news_fts(news_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO news_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+    # Index the rows stored before the full-text index existed
+    "INSERT INTO news_fts(news_fts) VALUES ('rebuild')",
+]
+
+def _add_news_indexes(connection):
+    for index in NEWS_INDEXES:
+        index.create(bind=connection, checkfirst=True)
+
+def _add_news_fts(connection):
+    if connection.dialect.name != "sqlite":
+        return
+    try:
+        with connection.begin_nested():
+            for statement in NEWS_FTS_STATEMENTS:
+                connection.execute(sql_text(statement))
+    except Exception as e:
+        logger.warning(f"SQLite FTS5 is not available, verdict search falls back to LIKE: {e}")
+
+def _convert_legacy_reports(connection, chunk_size: int = 1000):
+    """
+    Rewrites reports stored as a Python repr of the whole report: the summary stays on the news
+    row and the full report moves to news_report_details. Rows are converted in id order, in chunks
+    of one batched UPDATE and INSERT each, committed chunk by chunk so the write lock is only held
+    briefly. Converted rows are recognized by their summary, so an interrupted conversion resumes
+    where it stopped.
+    """
+    news = News.__table__
+    set_summary = news.update().where(news.c.id == bindparam("row_id")).values(analysis_report=bindparam("summary"))
+    last_id = 0
+    converted = 0
+    while True:
+        rows = connection.execute(
+            select(News.id, News.analysis_report)
+            .where(News.id > last_id, News.analysis_report.isnot(None))
+            .order_by(News.id).limit(chunk_size)
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        details = []
+        summaries = []
+        for news_id, stored in rows:
+            report = report_store.legacy_report(stored)
+            if report is None:
+                continue
+            codec, payload = report_store.encode_details(report)
+            details.append({"news_id": news_id, "codec": codec, "payload": payload})
+            summaries.append({"row_id": news_id, "summary": report_store.encode_summary(report)})
+        if details:
+            connection.execute(set_summary, summaries)
+            connection.execute(NewsReportDetail.__table__.insert(), details)
+            converted += len(details)
+        connection.commit()
+    if converted:
+        logger.info(f"Converted {converted} legacy analysis reports")
+
+def _add_job_leases(connection):
+    # Tables created before job leases lack their columns (new tables are created with them)
+    table = VerificationJob.__table__
+    existing = {column["name"] for column in inspect(connection).get_columns(table.name)}
+    for column in [table.c.owner, table.c.lease_expires_at]:
+        if column.name not in existing:
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(sql_text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+    for index in table.indexes:
+        if list(index.columns) == [table.c.lease_expires_at]:
+            index.create(bind=connection, checkfirst=True)
+
+# Schema migrations, applied in order; each runs once per database
+MIGRATIONS = [
+    (1, "Composite indexes for the verdict query API", _add_news_indexes),
+    (2, "Full-text index over news titles and contents", _add_news_fts),
+    (3, "Structured analysis reports with full reports in news_report_details", _convert_legacy_reports),
+    (4, "Owner and lease of running verification jobs", _add_job_leases),
+]
+
+def migrate(bind=None) -> list:
+    """
+    Creates missing tables and applies the pending schema migrations.
+
+    Safe to run on every startup and on databases created by older versions of `create_db.py`.
+
+    Parameters:
+        bind: The engine to migrate; defaults to the application database.
+
+    Returns:
+        list: The versions applied by this call.
+    """
+    bind = bind if bind is not None else engine
+    Base.metadata.create_all(bind=bind)
+    applied = []
+    # Each migration is committed with its version row; a migration may also commit as it goes
+    with bind.connect() as connection:
+        done = {row[0] for row in connection.execute(sql_text("SELECT version FROM schema_migrations"))}
+        connection.commit()
+        for version, description, upgrade in MIGRATIONS:
+            if version in done:
+                continue
+            logger.info(f"Applying migration {version}: {description}")
+            upgrade(connection)
+            connection.execute(SchemaMigration.__table__.insert().values(
+                version=version, description=description, applied_at=datetime.utcnow()
+            ))
+            connection.commit()
+            applied.append(version)
+    return applied
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, Float, Boolean, LargeBinary, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 from datetime import datetime
 
 # Define the base class for SQLAlchemy models
@@ -29,5 +30,143 @@ class News(Base):
     # Flag indicating whether the news is considered fake
     is_fake = Column(Boolean, default=False)
     
-    # Detailed analysis report about the news veracity
+    # Compact JSON summary of the analysis report (scores and conclusion); see app/services/report_store.py
     analysis_report = Column(Text, nullable=True)
+
+    # Full analysis report, stored in a side table and loaded only when accessed
+    report_details = relationship("NewsReportDetail", uselist=False, lazy="select", cascade="all, delete-orphan")
+
+class NewsReportDetail(Base):
+    __tablename__ = "news_report_details"
+
+    # The news entry this report belongs to
+    news_id = Column(Integer, ForeignKey("news.id", ondelete="CASCADE"), primary_key=True)
+
+    # Encoding of the payload: "json", "json+zlib" or "json+zstd"
+    codec = Column(String(16), nullable=False)
+
+    # Full analysis report (analysis texts, headlines, social media posts)
+    payload = Column(LargeBinary, nullable=False)
+
+class MediaItem(Base):
+    __tablename__ = "media_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # "image" or "video"
+    media_type = Column(String(16), nullable=False)
+
+    # SHA-256 of the uploaded bytes
+    content_digest = Column(String(64), nullable=False, index=True)
+
+    # When the media was first analyzed
+    first_seen = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    veracity_score = Column(Float, nullable=False)
+
+    # Final report of the analysis, encoded by app/services/report_store.py
+    report_codec = Column(String(16), nullable=False)
+    report_payload = Column(LargeBinary, nullable=False)
+
+class MediaFingerprint(Base):
+    __tablename__ = "media_fingerprints"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    media_id = Column(Integer, ForeignKey("media_items.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # "phash" or "dhash"; fingerprints of another algorithm are never compared
+    algorithm = Column(String(16), nullable=False)
+
+    # 64-bit perceptual hash, stored as a signed integer
+    hash = Column(BigInteger, nullable=False)
+
+class VerdictCacheEntry(Base):
+    __tablename__ = "verdict_cache"
+
+    # Content hash of the normalized input (text, URL or uploaded file bytes)
+    key = Column(String(64), primary_key=True)
+
+    # Cached pipeline component, e.g. "primary", "social" or "verdict"
+    component = Column(String(32), primary_key=True)
+
+    # JSON-encoded result of the component
+    payload = Column(Text, nullable=False)
+
+    # Date and time when the component result was stored; used to apply its TTL
+    stored_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class Headline(Base):
+    __tablename__ = "headlines"
+
+    # Unique identifier for each headline (also the row id of the full-text index)
+    id = Column(Integer, primary_key=True)
+
+    # Hash of the normalized headline text, used to deduplicate headlines
+    text_hash = Column(String(40), nullable=False, unique=True, index=True)
+
+    # Headline text as scraped
+    text = Column(Text, nullable=False)
+
+    # Source URL the headline was scraped from
+    source = Column(String(256), nullable=True, index=True)
+
+    # Date and time when the headline was first and last seen by a scrape
+    first_seen = Column(DateTime, default=datetime.utcnow)
+    last_seen = Column(DateTime, default=datetime.utcnow, index=True)
+
+class VerificationJob(Base):
+    __tablename__ = "verification_jobs"
+
+    # Random job identifier returned to the client
+    id = Column(String(32), primary_key=True)
+
+    # Job state: "queued", "running", "done" or "failed"
+    status = Column(String(16), nullable=False, default="queued", index=True)
+
+    # Input of the verification, as for /news/verify
+    input_type = Column(String(16), nullable=False)
+    input_data = Column(Text, nullable=True)
+    no_cache = Column(Boolean, default=False)
+
+    # Spooled upload of image and video jobs, and the SHA-256 digest of its bytes
+    upload_path = Column(String(512), nullable=True)
+    upload_digest = Column(String(64), nullable=True)
+
+    # Jobs with a lower priority value run first
+    priority = Column(Integer, nullable=False, default=0)
+
+    # Date and time when the job was submitted, started and finished
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Process running the job ("<host>:<pid>") and the end of its lease, renewed while the job runs;
+    # a running job whose lease has expired was abandoned and is queued again
+    owner = Column(String(128), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True, index=True)
+
+    # JSON-encoded final report, or the error of a failed job
+    result = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+
+class IdSequence(Base):
+    __tablename__ = "id_sequences"
+
+    # Name of the sequence, e.g. "news"
+    name = Column(String(32), primary_key=True)
+
+    # Next value not reserved by any process; ids are reserved in blocks
+    next_value = Column(Integer, nullable=False)
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+
+    # Version number of an applied migration (see app/migrations.py)
+    version = Column(Integer, primary_key=True)
+
+    # What the migration changed
+    description = Column(String(256), nullable=False)
+
+    # Date and time when the migration was applied
+    applied_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, HTTPException, Form
+from fastapi.responses import JSONResponse
+
+from app.services import model_registry, executor
+
+router = APIRouter()
+
+@router.get("/ready", summary="Readiness of the active NLP model", response_model=dict)
+async def model_ready():
+    """
+    Reports whether the active NLP model is loaded.
+    Responds with 200 once the model is ready to serve requests, and 503 while it is still loading.
+    When inference runs in CPU pool worker processes, the model is ready once a worker has loaded it.
+    """
+    state = model_registry.status()
+    if executor.uses_processes():
+        state["workers_ready"] = executor.workers_ready()
+        state["ready"] = state["workers_ready"] > 0
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=state)
+
+@router.get("", summary="Status of the model registry", response_model=dict)
+async def list_models():
+    """
+    Returns the active model name together with the loaded models, models being loaded and load errors.
+    """
+    return model_registry.status()
+
+@router.post("/swap", summary="Switch the active NLP model", response_model=dict)
+def swap_model(
+    name: str = Form(...),              # Model name, e.g. "facebook/bart-large-mnli" or "facebook/bart-large-mnli@int8"
+    unload_previous: bool = Form(True)  # Free the previously active model after the switch
+):
+    """
+    Loads the given model and makes it the active one without restarting the application.
+    Requests keep using the previous model until the new one has finished loading.
+    """
+    try:
+        previous = model_registry.swap_model(name, unload_previous=unload_previous)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not load model '{name}': {e}")
+    return {"previous_model": previous, **model_registry.status()}
+
+@router.delete("/{name:path}", summary="Unload a model", response_model=dict)
+async def unload_model(name: str):
+    """
+    Unloads the given model to free its memory. If it is the active model, it is loaded
+    again on the next text request.
+    """
+    if not model_registry.unload(name):
+        raise HTTPException(status_code=404, detail=f"Model '{name}' is not loaded.")
+    return model_registry.status()
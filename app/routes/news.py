@@ -1,25 +1,64 @@
-import os
+import json
+import asyncio
+import logging
 import datetime
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models import News
 
 # Import advanced analysis functions from services
-from app.services.nlp_service import analyze_text
-from app.services.media_service import analyze_image, analyze_video
-from app.services.social_service import analyze_twitter, analyze_facebook, analyze_instagram
-from app.services.scraper import scrape_headlines
+from app.services.nlp_service import get_batching_stats
+from app.services import (
+    verdict_cache, executor, scraper, headline_store, scheduler, uploads, verification, job_queue, news_writer,
+    news_query, social_service, media_index
+)
+from app.config import (
+    VERIFY_BATCH_MAX_ITEMS, VERIFY_BATCH_CONCURRENCY, JOB_SPOOL_DIR,
+    SSE_KEEPALIVE_SECONDS
+)
 
 router = APIRouter()
 
-@router.post("/verify", summary="Verify the veracity of news", response_model=dict)
-async def verify_news(
-    input_type: str = Form(...),         # Expected values: "text", "link", "image", "video"
-    input_data: str = Form(None),          # For text or link input (a single field for both)
-    file: UploadFile = File(None),         # For image or video input
-    db: Session = Depends(get_db)
-):
+logger = logging.getLogger(__name__)
+
+# Form fields of the verification endpoints. The forms are read by `uploads.receive_form` straight from the
+# request stream (so upload limits hold before the body is stored), hence described here for the OpenAPI schema.
+_VERIFY_FORM = {
+    "input_type": {"type": "string", "enum": ["text", "link", "image", "video"]},
+    "input_data": {"type": "string", "description": "For text or link input (a single field for both)"},
+    "file": {"type": "string", "format": "binary", "description": "For image or video input"},
+    "no_cache": {"type": "boolean", "default": False, "description": "Bypass cached results and re-run the full analysis"},
+}
+_BUDGET_FIELD = {
+    "budget_seconds": {"type": "number", "description": "Time budget of the verification (VERIFY_BUDGET_SECONDS by default)"}
+}
+
+def _form_schema(fields: dict) -> dict:
+    schema = {"type": "object", "required": ["input_type"], "properties": fields}
+    return {"requestBody": {"required": True, "content": {
+        "multipart/form-data": {"schema": schema}, "application/x-www-form-urlencoded": {"schema": schema}
+    }}}
+
+def _input_type(fields: dict) -> str:
+    if not fields.get("input_type"):
+        raise HTTPException(status_code=422, detail="The 'input_type' field is required.")
+    return fields["input_type"]
+
+def _form_bool(fields: dict, name: str) -> bool:
+    return fields.get(name, "").lower() in ["true", "1", "t"]
+
+def _form_float(fields: dict, name: str) -> float:
+    if not fields.get(name):
+        return None
+    try:
+        return float(fields[name])
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"The '{name}' field must be a number.")
+
+@router.post("/verify", summary="Verify the veracity of news", response_model=dict,
+             openapi_extra=_form_schema({**_VERIFY_FORM, **_BUDGET_FIELD}))
+async def verify_news(request: Request, db: Session = Depends(get_db)):
     """
     This endpoint processes the user input (which can be text, link, image, or video)
     and performs advanced veracity analysis. It integrates:
@@ -30,94 +69,310 @@ async def verify_news(
     Input requirements:
       - For "text" or "link": only the 'input_data' field is required.
       - For "image" or "video": only the file upload is required.
-    """
-    primary_report = {}
-
-    if input_type.lower() == "text":
-        if not input_data:
-            raise HTTPException(status_code=400, detail="Text content is required for text input.")
-        score, report = analyze_text(input_data)
-        primary_report = {"veracity_score": score, "analysis_report": report}
-
-    elif input_type.lower() == "link":
-        if not input_data:
-            raise HTTPException(status_code=400, detail="URL is required for link input.")
-        # Scrape the link to extract headlines (as a proxy for article content)
-        headlines = scrape_headlines(input_data)
-        if not headlines:
-            raise HTTPException(status_code=400, detail="Could not extract content from the provided URL.")
-        combined_text = " ".join(headlines)
-        score, report = analyze_text(combined_text)
-        primary_report = {
-            "veracity_score": score,
-            "analysis_report": report,
-            "extracted_headlines": headlines
-        }
-
-    elif input_type.lower() == "image":
-        if file is None:
-            raise HTTPException(status_code=400, detail="Image file is required for image input.")
-        file_location = f"temp_{file.filename}"
-        with open(file_location, "wb") as f:
-            f.write(await file.read())
-        score, report = analyze_image(file_location)
-        primary_report = {"veracity_score": score, "analysis_report": report}
-        os.remove(file_location)
-
-    elif input_type.lower() == "video":
-        if file is None:
-            raise HTTPException(status_code=400, detail="Video file is required for video input.")
-        file_location = f"temp_{file.filename}"
-        with open(file_location, "wb") as f:
-            f.write(await file.read())
-        score, report = analyze_video(file_location)
-        primary_report = {"veracity_score": score, "analysis_report": report}
-        os.remove(file_location)
-
-    else:
-        raise HTTPException(status_code=400, detail="Invalid input type provided.")
-
-    # Social media analysis integration:
-    # Use a snippet from the input_data (if available) or default keyword for social media search.
-    social_keyword = input_data.split()[0] if input_data else "news"
-    twitter_score, twitter_report = analyze_twitter(social_keyword)
-    facebook_score, facebook_report = analyze_facebook(social_keyword)
-    instagram_score, instagram_report = analyze_instagram(social_keyword)
-
-    social_media = {
-        "twitter": {"score": twitter_score, "report": twitter_report},
-        "facebook": {"score": facebook_score, "report": facebook_report},
-        "instagram": {"score": instagram_score, "report": instagram_report}
-    }
 
-    # Calculate a weighted final veracity score:
-    # Primary analysis weight: 60%, Social media analysis weight: 40%
-    social_avg = (twitter_score + facebook_score + instagram_score) / 3
-    final_score = 0.6 * primary_report["veracity_score"] + 0.4 * social_avg
-
-    # Prepare the final integrated report
-    final_report = {
-        "input_type": input_type,
-        "primary_analysis": primary_report,
-        "social_media_analysis": social_media,
-        "final_veracity_score": final_score,
-        "conclusion": "News is likely authentic." if final_score > 0.5 else "News is likely fake."
-    }
+    Results are cached by a hash of the normalized input. Each component (primary analysis,
+    social media analysis and the final verdict) has its own TTL; set 'no_cache' to ignore
+    cached results for this request.
 
-    # Optionally, save the record to the database for text and link inputs
-    if input_type.lower() in ["text", "link"]:
-        new_news = News(
-            title=input_data if input_data else (file.filename if file else "Media Analysis"),
-            content=input_data if input_data else "Media file analysis",
-            source=input_data if input_type.lower() == "link" else "User Submitted",
-            published_date=datetime.datetime.utcnow(),
-            veracity_score=final_score,
-            is_fake=(final_score < 0.5),
-            analysis_report=str(final_report)
+    The verification answers within its time budget ('budget_seconds', up to VERIFY_BUDGET_MAX_SECONDS).
+    Stages that overrun their share of it are cancelled or cut short: the verdict is then computed
+    from the components that completed, 'partial' is set and 'skipped' lists the components left out
+    ("primary", "social.<platform>"). If none completed, 'final_veracity_score' is null.
+    """
+    # Uploads are received with a size limit: images into memory, videos into a unique temporary
+    # file that is removed once the request is done
+    fields, upload = await uploads.receive_form(request)
+    try:
+        input_type = _input_type(fields)
+        budget = verification.request_budget(_form_float(fields, "budget_seconds"))
+        final_report, _ = await verification.verify(
+            input_type, fields.get("input_data"), upload, _form_bool(fields, "no_cache"), db, budget_seconds=budget
         )
-        db.add(new_news)
-        db.commit()
-        db.refresh(new_news)
-        final_report["news_record_id"] = new_news.id
+        return final_report
+    finally:
+        if upload is not None:
+            upload.cleanup()
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def _stream_verification(input_type: str, input_data: str, upload, no_cache: bool, budget: float = None):
+    """
+    Yields the Server-Sent Events of one verification, with keep-alive comments while waiting.
+    """
+    events = verification.verify_events(input_type, input_data, upload, no_cache, budget_seconds=budget)
+    next_event = None
+    try:
+        while True:
+            next_event = asyncio.ensure_future(anext(events))
+            while not (await asyncio.wait({next_event}, timeout=SSE_KEEPALIVE_SECONDS))[0]:
+                yield ": keep-alive\n\n"
+            try:
+                event, data = next_event.result()
+            except StopAsyncIteration:
+                return
+            if event == "final":
+                final_report, _ = data
+                # The primary and social media results were sent in their own events
+                data = {
+                    key: value for key, value in final_report.items()
+                    if key not in ["primary_analysis", "social_media_analysis"]
+                }
+            yield _sse(event, data)
+    except HTTPException as e:
+        yield _sse("error", {"status_code": e.status_code, "detail": e.detail})
+    except executor.PoolSaturatedError as e:
+        yield _sse("error", {"status_code": 429, "detail": str(e)})
+    except Exception as e:
+        logger.error(f"Streamed verification failed: {e}")
+        yield _sse("error", {"status_code": 500, "detail": str(e)})
+    finally:
+        # The client went away while an analysis was running: cancelling the pending step stops the
+        # verification (no await here, the response may be cancelled)
+        if next_event is not None and not next_event.done():
+            next_event.cancel()
+        if upload is not None:
+            upload.cleanup()
+
+@router.post("/verify/stream", summary="Verify the veracity of news, streaming results as they are ready",
+             openapi_extra=_form_schema({**_VERIFY_FORM, **_BUDGET_FIELD}))
+async def verify_news_stream(request: Request):
+    """
+    Runs the same verification as `/news/verify`, with the same inputs, and streams its results
+    as Server-Sent Events (`text/event-stream`) as soon as each one is ready:
+
+      - `primary`: the primary analysis report (text, link or media analysis).
+      - `social`: one event per social media platform, {"platform", "score", "report", "status"}, in completion order.
+      - `final`: the aggregated verdict: 'final_veracity_score', 'conclusion', 'excluded_platforms',
+        'skipped' and 'partial' (see `/news/verify`), 'news_record_id' (text and link input) and the cache status.
+      - `error`: {"status_code", "detail"} if the verification fails once the stream has started.
+
+    The primary and social media analyses run concurrently, so the primary result usually arrives
+    long before the slowest platform. The time budget is the same as for `/news/verify`.
+    """
+    fields, upload = await uploads.receive_form(request)
+    try:
+        # Invalid input is rejected with a 400 response rather than in the stream
+        input_type = _input_type(fields)
+        budget = verification.request_budget(_form_float(fields, "budget_seconds"))
+        verification.check_input(input_type, fields.get("input_data"), upload)
+    except HTTPException:
+        if upload is not None:
+            upload.cleanup()
+        raise
+    return StreamingResponse(
+        _stream_verification(input_type, fields.get("input_data"), upload, _form_bool(fields, "no_cache"), budget),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _parse_batch(body: bytes, content_type: str) -> list:
+    """
+    Parses a batch request body: a JSON list (or {"items": [...]}) or NDJSON, one item per line.
+    """
+    try:
+        if "ndjson" in content_type or "jsonlines" in content_type:
+            items = [json.loads(line) for line in body.decode("utf-8").splitlines() if line.strip()]
+        else:
+            items = json.loads(body)
+            if isinstance(items, dict):
+                items = items.get("items")
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch body: {e}")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="The batch must be a list of items.")
+    if len(items) > VERIFY_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"A batch holds at most {VERIFY_BATCH_MAX_ITEMS} items.")
+    return items
+
+def _item_error(item) -> str:
+    if not isinstance(item, dict):
+        return "Each item must be an object with 'input_type' and 'input_data'."
+    if str(item.get("input_type", "")).lower() not in ["text", "link"]:
+        return "Batch items must have input_type 'text' or 'link'."
+    if not isinstance(item.get("input_data"), str) or not item["input_data"].strip():
+        return "Text content or URL is required in 'input_data'."
+    return None
+
+def _line(payload: dict) -> str:
+    return json.dumps(payload, default=str) + "\n"
+
+async def _stream_batch(items: list, no_cache: bool):
+    """
+    Verifies the items of a batch concurrently and yields one NDJSON line per item as soon as
+    its result is ready, then a summary line once the News rows have been stored.
+    """
+    # Identical items (same normalized input) are verified once
+    groups = {}
+    errors = 0
+    for index, item in enumerate(items):
+        error = _item_error(item)
+        if error:
+            errors += 1
+            yield _line({"type": "result", "index": index, "id": None, "status": "error", "error": error})
+            continue
+        key = verdict_cache.make_key(item["input_type"], item["input_data"])
+        groups.setdefault(key, []).append(index)
+
+    # Enough concurrent verifications to fill the NLP micro-batches
+    semaphore = asyncio.Semaphore(VERIFY_BATCH_CONCURRENCY)
+
+    async def run(key: str, item: dict):
+        async with semaphore:
+            try:
+                report, record = await verification.verify(
+                    item["input_type"], item["input_data"], no_cache=no_cache, store_record=False
+                )
+                return key, report, record, None
+            except HTTPException as e:
+                return key, None, None, e.detail
+            except Exception as e:
+                logger.error(f"Batch item failed: {e}")
+                return key, None, None, str(e)
+
+    tasks = [asyncio.create_task(run(key, items[indices[0]])) for key, indices in groups.items()]
+    records = {}
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            key, report, record, error = await next_done
+            if record is not None:
+                records[key] = record
+            first = groups[key][0]
+            for index in groups[key]:
+                line = {"type": "result", "index": index, "id": items[index].get("id")}
+                if index != first:
+                    line["duplicate_of"] = first
+                if error is None:
+                    line.update(status="ok", result=report)
+                else:
+                    errors += 1
+                    line.update(status="error", error=error)
+                yield _line(line)
+    finally:
+        # The client went away: stop verifying the remaining items
+        for task in tasks:
+            task.cancel()
+
+    # All News rows of the batch are written at the end, in one transaction
+    record_ids = await asyncio.to_thread(news_writer.save_many, list(records.values()))
+    news_record_ids = {}
+    for key, record_id in zip(records, record_ids):
+        for index in groups[key]:
+            news_record_ids[str(index)] = record_id
+    yield _line({
+        "type": "summary",
+        "items": len(items),
+        "unique": len(groups),
+        "errors": errors,
+        "news_record_ids": news_record_ids
+    })
+
+@router.post("/verify/batch", summary="Verify a batch of text and link items")
+async def verify_batch(request: Request, no_cache: bool = False):
+    """
+    Verifies many text or link items in one request.
 
-    return final_report
+    The body is a JSON list of items (or NDJSON, one item per line, with an `application/x-ndjson`
+    content type); each item has 'input_type' ("text" or "link"), 'input_data' and an optional
+    client 'id'. Identical items are verified once, and all items run through the same pipeline
+    as `/news/verify` concurrently, so their texts share NLP batches.
+
+    The response is streamed as NDJSON: one {"type": "result", "index", "id", "status", ...}
+    line per item, in completion order, followed by a {"type": "summary"} line with the ids of
+    the News rows, which are written in bulk once all items are done.
+    """
+    items = _parse_batch(await request.body(), request.headers.get("content-type", ""))
+    return StreamingResponse(_stream_batch(items, no_cache), media_type="application/x-ndjson")
+
+@router.post("/jobs", summary="Submit a verification job", status_code=202, response_model=dict,
+             openapi_extra=_form_schema(_VERIFY_FORM))
+async def submit_job(request: Request):
+    """
+    Queues a verification with the same inputs as `/news/verify` and returns its job id right away.
+    Background workers run the job; poll `GET /news/jobs/{job_id}` for its status and final report.
+    """
+    # The upload is written straight to the job spool directory and kept there until the job has run,
+    # so it survives a restart
+    fields, upload = await uploads.receive_form(request, JOB_SPOOL_DIR, images_in_memory=False)
+    try:
+        kind = _input_type(fields).lower()
+        input_data = fields.get("input_data")
+        if kind in ["text", "link"]:
+            if not input_data:
+                raise HTTPException(status_code=400, detail="Text content or URL is required for text and link input.")
+        elif kind in ["image", "video"]:
+            if upload is None:
+                raise HTTPException(status_code=400, detail=f"A file is required for {kind} input.")
+        else:
+            raise HTTPException(status_code=400, detail="Invalid input type provided.")
+        job_id = await asyncio.to_thread(job_queue.submit, kind, input_data, upload, _form_bool(fields, "no_cache"))
+    except BaseException:
+        if upload is not None:
+            upload.cleanup()
+        raise
+    return {"job_id": job_id, "status": "queued"}
+
+@router.get("/jobs/{job_id}", summary="Status and result of a verification job", response_model=dict)
+async def get_job(job_id: str):
+    """
+    Returns the job status ("queued", "running", "done" or "failed"), with the final report
+    once it is done or the error if it failed.
+    """
+    state = await asyncio.to_thread(job_queue.get, job_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return state
+
+@router.get("/verdicts", summary="List and search stored verdicts", response_model=dict)
+async def list_verdicts(
+    start: datetime.datetime = None,       # Published on or after this date
+    end: datetime.datetime = None,         # Published before this date
+    is_fake: bool = None,
+    min_score: float = None,
+    max_score: float = None,
+    source: str = None,
+    q: str = None,                         # Full-text search over titles and contents
+    sort: str = Query("published_date", pattern="^(published_date|veracity_score)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=news_query.MAX_LIMIT),
+    cursor: str = None                     # The next_cursor of the previous page
+):
+    """
+    Lists stored verdicts matching the filters, newest first by default.
+
+    Results are paginated with an opaque cursor: pass the `next_cursor` of a page to get the
+    next one (it is null on the last page). Deep pages cost the same as the first one.
+    """
+    return await asyncio.to_thread(
+        news_query.list_verdicts, start, end, is_fake, min_score, max_score, source, q, sort, order, limit, cursor
+    )
+
+@router.get("/verdicts/{news_id}", summary="A stored verdict with its analysis report", response_model=dict)
+async def get_verdict(news_id: int, detail: str = Query("summary", pattern="^(summary|full)$")):
+    """
+    Returns a stored verdict, including its content and analysis report: the summary (scores
+    and conclusion) by default, or the full report with `detail=full`.
+    """
+    verdict = await asyncio.to_thread(news_query.get_verdict, news_id, detail)
+    if verdict is None:
+        raise HTTPException(status_code=404, detail="Verdict not found.")
+    return verdict
+
+@router.get("/stats", summary="Runtime statistics of the analysis services", response_model=dict)
+async def service_stats():
+    """
+    Returns runtime counters of the analysis services, such as the NLP micro-batcher's
+    batch sizes and queue wait times, for tuning against latency targets.
+    """
+    return {
+        "nlp_batching": get_batching_stats(),
+        "verdict_cache": verdict_cache.get_stats(),
+        "cpu_pool": executor.get_stats(),
+        "scraper": scraper.get_stats(),
+        "headline_store": headline_store.get_stats(),
+        "scheduler": scheduler.get_stats(),
+        "jobs": job_queue.get_stats(),
+        "news_writer": news_writer.get_stats(),
+        "social": social_service.get_stats(),
+        "media_index": media_index.get_stats()
+    }
@@ -0,0 +1,267 @@
+"""
+Pre-fork server: loads the NLP model once, then forks worker processes serving the application
+on a shared listening socket.
+
+The parent process loads the model, runs the migrations and freezes its heap (`gc.freeze`)
+before forking, so the workers share the model weights copy-on-write instead of each loading
+its own copy: memory per worker drops from about one model to a few tens of megabytes. The
+cores are divided between the workers for inference.
+
+    python -m app.serve --workers 4 --port 8000
+
+Signals to the parent: SIGHUP replaces the workers one at a time (a rolling restart, e.g. to give
+back memory they have accumulated); SIGTERM or SIGINT stops the workers gracefully, then exits.
+A worker that exits (after SERVE_MAX_REQUESTS requests, or on a crash) is replaced.
+
+Keep CPU_POOL_SIZE=0 with this server: CPU pool processes are spawned, so each would load its
+own copy of the model again.
+"""
+import os
+import gc
+import sys
+import time
+import random
+import select
+import signal
+import socket
+import logging
+import argparse
+
+from app.config import (
+    SERVE_WORKERS, SERVE_HOST, SERVE_PORT, SERVE_PRELOAD, SERVE_MAX_REQUESTS, SERVE_MAX_REQUESTS_JITTER,
+    SERVE_GRACEFUL_TIMEOUT
+)
+
+logger = logging.getLogger("app.serve")
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """
+    Opens the listening socket shared by all workers (the kernel spreads connections between them).
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+def preload() -> bool:
+    """
+    Prepares the parent process before forking: applies the migrations, loads the active NLP
+    model and imports the application, then freezes the heap.
+
+    The model is loaded with a single intra-op thread, so the parent never starts an OpenMP
+    thread pool (which forked children would inherit in a broken state); each worker sets its
+    own share of the cores. Models with the "@onnx" backend are not preloaded, since ONNX
+    Runtime sessions do not survive a fork.
+
+    Returns:
+        bool: Whether the model was preloaded (otherwise each worker loads it).
+    """
+    from app.migrations import migrate
+    from app.database import engine
+    from app.services import model_registry
+
+    migrate()
+    # No pooled database connection may be shared with the workers
+    engine.dispose()
+
+    preloaded = model_registry.split_model_name(model_registry.get_active_model_name())[1] != "onnx"
+    if preloaded:
+        model_registry.configure_threads(1)
+        model_registry.get_model()
+    else:
+        logger.warning("ONNX Runtime models are loaded by each worker, not shared")
+
+    import app.main  # noqa: F401
+
+    # Objects created so far are never collected: the collector no longer writes to their headers,
+    # so the pages holding them stay shared with the workers
+    gc.collect()
+    gc.freeze()
+    return preloaded
+
+def fork_worker(target, *args) -> int:
+    """
+    Forks a worker process running `target(*args)`.
+
+    Returns:
+        int: The pid of the worker.
+    """
+    pid = os.fork()
+    if pid:
+        return pid
+    # In the worker: default signal handling until the server installs its own
+    signal.set_wakeup_fd(-1)
+    for signum in [signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD]:
+        signal.signal(signum, signal.SIG_DFL)
+    random.seed()
+    code = 0
+    try:
+        target(*args)
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 1
+    except BaseException:
+        logger.exception("Worker failed")
+        code = 1
+    finally:
+        os._exit(code)
+
+def serve_worker(sock: socket.socket, workers: int, max_requests: int, graceful_timeout: float):
+    """
+    Runs the application with uvicorn on the shared socket, until stopped by SIGTERM or after
+    `max_requests` requests.
+    """
+    import uvicorn
+    from app.main import app
+    from app.services import model_registry, executor
+
+    model_registry.set_serving_workers(workers)
+    if executor.uses_processes():
+        logger.warning("CPU_POOL_SIZE > 0: each CPU pool process loads its own copy of the model")
+    config = uvicorn.Config(
+        app, limit_max_requests=max_requests or None, timeout_graceful_shutdown=int(graceful_timeout)
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Launcher:
+    """
+    Forks and supervises the workers: replaces those that exit, replaces all of them one at a time
+    on SIGHUP and stops them gracefully (then forcibly after `graceful_timeout`) on SIGTERM or SIGINT.
+    """
+
+    def __init__(self, host: str = SERVE_HOST, port: int = SERVE_PORT, workers: int = SERVE_WORKERS,
+                 preload_model: bool = SERVE_PRELOAD, max_requests: int = SERVE_MAX_REQUESTS,
+                 max_requests_jitter: int = SERVE_MAX_REQUESTS_JITTER,
+                 graceful_timeout: float = SERVE_GRACEFUL_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.preload_model = preload_model
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        # pid -> start time of the running workers
+        self._workers = {}
+        # pid -> deadline of the workers asked to stop
+        self._stopping = {}
+        # Workers still to be replaced by a rolling restart
+        self._to_replace = []
+        self._signals = []
+        self._shutting_down = False
+        self._sock = None
+
+    def _handle_signal(self, signum, frame):
+        self._signals.append(signum)
+
+    def _spawn(self):
+        max_requests = self.max_requests
+        if max_requests and self.max_requests_jitter:
+            max_requests += random.randint(0, self.max_requests_jitter)
+        pid = fork_worker(serve_worker, self._sock, self.workers, max_requests, self.graceful_timeout)
+        self._workers[pid] = time.monotonic()
+        logger.info(f"Started worker {pid}")
+
+    def _stop_worker(self, pid: int):
+        if pid in self._stopping:
+            return
+        self._stopping[pid] = time.monotonic() + self.graceful_timeout
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self._workers.pop(pid, None)
+            expected = self._stopping.pop(pid, None) is not None
+            if started is not None and not expected:
+                code = os.waitstatus_to_exitcode(status)
+                logger.info(f"Worker {pid} exited with code {code} after {time.monotonic() - started:.0f}s")
+                if code != 0 and time.monotonic() - started < 1:
+                    # Failing at startup: do not fork in a tight loop
+                    time.sleep(1)
+
+    def _step(self):
+        for signum in self._signals:
+            if signum in [signal.SIGTERM, signal.SIGINT]:
+                self._shutting_down = True
+            elif signum == signal.SIGHUP and not self._shutting_down:
+                logger.info("Replacing the workers")
+                self._to_replace = list(self._workers)
+        self._signals.clear()
+        self._reap()
+
+        if self._shutting_down:
+            for pid in self._workers:
+                self._stop_worker(pid)
+        else:
+            # Rolling restart, one worker at a time: a replacement is forked as soon as an old worker
+            # is asked to stop, and the next old worker is stopped once that one has exited
+            self._to_replace = [pid for pid in self._to_replace if pid in self._workers]
+            if self._to_replace and not any(pid in self._stopping for pid in self._workers):
+                self._stop_worker(self._to_replace.pop(0))
+            while len(self._workers) - len(self._stopping) < self.workers:
+                self._spawn()
+
+        now = time.monotonic()
+        for pid, deadline in list(self._stopping.items()):
+            if now > deadline:
+                logger.warning(f"Worker {pid} did not stop within {self.graceful_timeout:.0f}s; killing it")
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                self._stopping[pid] = now + 60
+
+    def run(self):
+        """
+        Binds the socket, preloads the model and supervises the workers until SIGTERM or SIGINT.
+        """
+        self._sock = bind_socket(self.host, self.port)
+        if self.preload_model:
+            preload()
+
+        # Signals only set flags; the wake-up pipe interrupts the wait in the supervision loop
+        wakeup_read, wakeup_write = os.pipe()
+        os.set_blocking(wakeup_write, False)
+        signal.set_wakeup_fd(wakeup_write)
+        for signum in [signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD]:
+            signal.signal(signum, self._handle_signal)
+
+        logger.info(f"Serving on {self.host}:{self.port} with {self.workers} workers (pid {os.getpid()})")
+        self._step()
+        while self._workers or not self._shutting_down:
+            ready, _, _ = select.select([wakeup_read], [], [], 1.0)
+            if ready:
+                os.read(wakeup_read, 1024)
+            self._step()
+        self._sock.close()
+        logger.info("All workers stopped")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=SERVE_HOST)
+    parser.add_argument("--port", type=int, default=SERVE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS)
+    parser.add_argument("--no-preload", dest="preload", action="store_false", default=SERVE_PRELOAD,
+                        help="load the model in each worker instead of sharing the parent's copy")
+    parser.add_argument("--max-requests", type=int, default=SERVE_MAX_REQUESTS)
+    parser.add_argument("--max-requests-jitter", type=int, default=SERVE_MAX_REQUESTS_JITTER)
+    parser.add_argument("--graceful-timeout", type=float, default=SERVE_GRACEFUL_TIMEOUT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    Launcher(args.host, args.port, args.workers, args.preload, args.max_requests, args.max_requests_jitter,
+             args.graceful_timeout).run()
+
+if __name__ == "__main__":
+    sys.exit(main())
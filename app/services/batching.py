@@ -0,0 +1,193 @@
+import time
+import queue
+import threading
+import logging
+from collections import deque
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from many callers into batches and runs them through a single
+    batch-processing function on a background thread.
+
+    A batch is dispatched as soon as it reaches `max_batch_size` items, or once the oldest item
+    in it has waited `max_wait_ms` milliseconds, whichever comes first. Every caller receives a
+    Future resolved with its own result (or with the exception raised for the whole batch).
+
+    Parameters:
+        process_batch (callable): Function taking a list of items and returning a list of results
+            of the same length and order.
+        max_batch_size (int): Maximum number of items processed in one call.
+        max_wait_ms (float): Maximum time the first item of a batch waits for more items.
+        max_queue (int): Maximum number of items waiting for a batch (0 means unbounded).
+        name (str): Name used for the worker thread and in log messages.
+    """
+
+    # Number of recent queue-wait samples kept for percentile estimates
+    WAIT_SAMPLE_SIZE = 1024
+
+    def __init__(self, process_batch, max_batch_size: int = 8, max_wait_ms: float = 10.0,
+                 max_queue: int = 0, name: str = "batcher"):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.max_queue = max(0, int(max_queue))
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+
+        # Tuning counters
+        self._batches_total = 0
+        self._items_total = 0
+        self._errors_total = 0
+        self._rejected_total = 0
+        self._batch_size_counts = {}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_samples = deque(maxlen=self.WAIT_SAMPLE_SIZE)
+
+    def submit(self, item) -> Future:
+        """
+        Queues an item for batched processing.
+
+        Returns:
+            Future: Resolved with the result for this item once its batch has been processed.
+
+        Raises:
+            queue.Full: If `max_queue` items are already waiting.
+        """
+        if self.max_queue and self._queue.qsize() >= self.max_queue:
+            with self._lock:
+                self._rejected_total += 1
+            raise queue.Full(f"{self.name}: {self.max_queue} items already waiting")
+        future = Future()
+        self._ensure_started()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> list:
+        """
+        Blocks until at least one item is queued, then keeps collecting until the batch is full
+        or the first item's wait budget is exhausted.
+        """
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                # Shutdown sentinel: finish this batch, then let the loop exit
+                self._stopping = True
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while not self._stopping:
+            batch = self._collect()
+            if not batch:
+                break
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: list):
+        # Items whose caller gave up (e.g. its deadline passed) while waiting are dropped; the others
+        # can no longer be cancelled
+        batch = [entry for entry in batch if entry[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        dispatched_at = time.perf_counter()
+        waits = [dispatched_at - enqueued_at for _, _, enqueued_at in batch]
+        items = [item for item, _, _ in batch]
+        futures = [future for _, future, _ in batch]
+
+        with self._lock:
+            self._batches_total += 1
+            self._items_total += len(batch)
+            self._batch_size_counts[len(batch)] = self._batch_size_counts.get(len(batch), 0) + 1
+            self._wait_total += sum(waits)
+            self._wait_max = max(self._wait_max, max(waits))
+            self._wait_samples.extend(waits)
+
+        try:
+            results = self.process_batch(items)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"{self.name}: batch function returned {len(results)} results for {len(items)} items"
+                )
+        except Exception as e:
+            logger.error(f"{self.name}: batch of {len(items)} items failed: {e}")
+            with self._lock:
+                self._errors_total += 1
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        for future, result in zip(futures, results):
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        """
+        Returns batch-size and queue-wait counters for tuning the batch size and wait time.
+
+        Returns:
+            dict: Totals, the batch size distribution and queue-wait statistics in milliseconds.
+        """
+        with self._lock:
+            samples = sorted(self._wait_samples)
+            batches = self._batches_total
+            items = self._items_total
+
+            def percentile(p):
+                if not samples:
+                    return 0.0
+                index = min(len(samples) - 1, int(round(p / 100.0 * (len(samples) - 1))))
+                return samples[index] * 1000.0
+
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "queue_depth": self._queue.qsize(),
+                "batches_total": batches,
+                "items_total": items,
+                "errors_total": self._errors_total,
+                "rejected_total": self._rejected_total,
+                "mean_batch_size": items / batches if batches else 0.0,
+                "batch_size_counts": dict(sorted(self._batch_size_counts.items())),
+                "queue_wait_ms": {
+                    "mean": self._wait_total / items * 1000.0 if items else 0.0,
+                    "max": self._wait_max * 1000.0,
+                    "p50": percentile(50),
+                    "p95": percentile(95),
+                    "p99": percentile(99),
+                },
+            }
+
+    def shutdown(self, timeout: float = 5.0):
+        """
+        Stops the worker thread after the items already queued have been processed.
+        """
+        with self._lock:
+            thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(None)
+        thread.join(timeout)
@@ -0,0 +1,186 @@
+import os
+import re
+import zlib
+import random
+import logging
+import threading
+import numpy as np
+
+from app.config import NLP_CASCADE_MODEL_PATH, NLP_CASCADE_FEATURES, NLP_CASCADE_LOW, NLP_CASCADE_HIGH
+
+logger = logging.getLogger(__name__)
+
+# News rows whose id falls in this bucket (id % HOLD_OUT_MODULO == 0) are held out of training,
+# so the cascade can be evaluated against the zero-shot classifier on rows it has never seen
+HOLD_OUT_MODULO = 5
+
+def is_held_out(news_id: int) -> bool:
+    return news_id % HOLD_OUT_MODULO == 0
+
+def hash_features(text: str, n_features: int = NLP_CASCADE_FEATURES) -> tuple:
+    """
+    Maps a text to a sparse, L2-normalized vector of hashed word unigrams and bigrams.
+
+    CRC32 is used rather than `hash()` so that features are identical across processes and runs.
+
+    Returns:
+        tuple: (feature indices, feature values) as numpy arrays.
+    """
+    words = re.findall(r"\w+", text.lower())
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if not grams:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    hashes = np.array([zlib.crc32(gram.encode("utf-8")) for gram in grams], dtype=np.int64)
+    # The low bits pick the feature, the top bit its sign (so that collisions tend to cancel out)
+    signs = np.where(hashes & 0x80000000, -1.0, 1.0)
+    indices, inverse = np.unique(hashes % n_features, return_inverse=True)
+    values = np.bincount(inverse, weights=signs).astype(np.float32)
+    norm = np.linalg.norm(values)
+    return indices, values / norm if norm else values
+
+
+class CascadeModel:
+    """
+    Logistic regression over hashed n-gram features: a first-pass classifier cheap enough to
+    score every text on the CPU before deciding whether the zero-shot model is needed.
+
+    Parameters:
+        weights (np.ndarray): One weight per hashed feature.
+        bias (float): The intercept.
+    """
+
+    def __init__(self, weights: np.ndarray, bias: float = 0.0):
+        self.weights = weights.astype(np.float32)
+        self.bias = float(bias)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.weights)
+
+    def score(self, texts: list) -> list:
+        """
+        Returns the probability of each text being real.
+        """
+        scores = []
+        for text in texts:
+            indices, values = hash_features(text, self.n_features)
+            z = float(self.weights[indices] @ values) + self.bias
+            scores.append(1.0 / (1.0 + np.exp(-z)))
+        return scores
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            np.savez_compressed(f, weights=self.weights, bias=np.float32(self.bias))
+
+    @classmethod
+    def load(cls, path: str) -> "CascadeModel":
+        with np.load(path) as data:
+            return cls(data["weights"], float(data["bias"]))
+
+def train(texts: list, labels: list, n_features: int = NLP_CASCADE_FEATURES, epochs: int = 5,
+          learning_rate: float = 0.5, l2: float = 1e-6, seed: int = 0) -> CascadeModel:
+    """
+    Trains a cascade model with stochastic gradient descent on the logistic loss.
+
+    Parameters:
+        texts (list): Training texts.
+        labels (list): 1 for real, 0 for fake.
+        n_features (int): Size of the hashed feature space.
+        epochs (int): Passes over the training set.
+        learning_rate (float): Initial step size, decayed as 1/sqrt(step).
+        l2 (float): L2 regularization strength.
+
+    Returns:
+        CascadeModel: The trained model.
+    """
+    rows = [hash_features(text, n_features) for text in texts]
+    weights = np.zeros(n_features, dtype=np.float32)
+    bias = 0.0
+    order = list(range(len(rows)))
+    rng = random.Random(seed)
+    step = 0
+    for _ in range(epochs):
+        rng.shuffle(order)
+        for i in order:
+            step += 1
+            rate = learning_rate / np.sqrt(step)
+            indices, values = rows[i]
+            z = float(weights[indices] @ values) + bias
+            gradient = 1.0 / (1.0 + np.exp(-z)) - labels[i]
+            weights[indices] -= rate * (gradient * values + l2 * weights[indices])
+            bias -= rate * gradient
+    return CascadeModel(weights, bias)
+
+def labeled_news(held_out: bool = False, limit: int = None) -> tuple:
+    """
+    Reads the labeled News rows used to train (or, with `held_out`, to evaluate) the cascade model.
+
+    Returns:
+        tuple: (texts, labels) with label 1 for real and 0 for fake.
+    """
+    from app.database import SessionLocal
+    from app.models import News
+
+    db = SessionLocal()
+    try:
+        texts, labels = [], []
+        for news_id, content, is_fake in db.query(News.id, News.content, News.is_fake).filter(
+            News.is_fake.isnot(None)
+        ).order_by(News.id).yield_per(1000):
+            if is_held_out(news_id) != held_out:
+                continue
+            texts.append(content)
+            labels.append(0 if is_fake else 1)
+            if limit and len(texts) >= limit:
+                break
+        return texts, labels
+    finally:
+        db.close()
+
+def route(scores: list, low: float = NLP_CASCADE_LOW, high: float = NLP_CASCADE_HIGH) -> list:
+    """
+    Returns, for each cascade score, whether it falls inside the uncertainty band [low, high]
+    and must be escalated to the zero-shot classifier.
+    """
+    return [low <= score <= high for score in scores]
+
+
+# Model loaded from NLP_CASCADE_MODEL_PATH on first use (per process); False when it is missing
+_model = None
+_model_lock = threading.Lock()
+_counters = {"decided": 0, "escalated": 0}
+
+def get_model():
+    """
+    Returns the trained cascade model, or None if NLP_CASCADE_MODEL_PATH does not exist
+    (the cascade is then skipped and every text goes to the zero-shot classifier).
+    """
+    global _model
+    with _model_lock:
+        if _model is None:
+            if os.path.exists(NLP_CASCADE_MODEL_PATH):
+                _model = CascadeModel.load(NLP_CASCADE_MODEL_PATH)
+                logger.info(f"Loaded cascade model from {NLP_CASCADE_MODEL_PATH}")
+            else:
+                logger.warning(f"Cascade model {NLP_CASCADE_MODEL_PATH} not found; run train_cascade.py to create it")
+                _model = False
+        return _model or None
+
+def set_model(model: CascadeModel):
+    """
+    Replaces the cascade model of this process (None reloads it from NLP_CASCADE_MODEL_PATH on next use).
+    """
+    global _model
+    with _model_lock:
+        _model = model
+
+def count(decided: int, escalated: int):
+    _counters["decided"] += decided
+    _counters["escalated"] += escalated
+
+def get_stats() -> dict:
+    """
+    Returns the number of texts decided by the cascade and escalated to the zero-shot classifier.
+    """
+    total = _counters["decided"] + _counters["escalated"]
+    return {**_counters, "escalation_rate": _counters["escalated"] / total if total else None}
@@ -0,0 +1,220 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from app.config import (
+    CPU_POOL_SIZE, CPU_POOL_THREADS, CPU_POOL_MAX_PENDING, CPU_POOL_PRELOAD_NLP, CPU_POOL_START_METHOD
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSaturatedError(RuntimeError):
+    """
+    Raised when CPU-bound work is submitted while the pool already has its maximum number of pending jobs.
+    """
+
+
+# Process pool (or thread pool when CPU_POOL_SIZE is 0) running CPU-bound analysis; created on first use
+_pool = None
+
+# Queue-depth accounting
+_lock = threading.Lock()
+_in_flight = 0
+_counters = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "max_in_flight": 0}
+
+# Pids of the worker processes that reported their NLP model as loaded after start(), and the
+# warm-up jobs sent so far. A fast worker can take several warm-up jobs while another is still
+# loading, so a duplicate report sends one more job (after a pause), up to WARMUP_MAX_JOBS_PER_WORKER
+# jobs per worker in all.
+_ready_pids = set()
+_warmup_jobs = 0
+WARMUP_MAX_JOBS_PER_WORKER = 4
+WARMUP_RETRY_DELAY_SECONDS = 0.5
+
+def _init_worker(preload_nlp: bool):
+    """
+    Initializes a pool worker process: imports the analysis libraries and, if requested, loads
+    the NLP model so the first job sent to the worker does not pay for it.
+    """
+    import app.services.media_service  # noqa: F401  (imports OpenCV and PIL)
+    if preload_nlp:
+        from app.services import model_registry
+        try:
+            model_registry.get_model()
+        except Exception as e:
+            logger.error(f"Worker could not preload the NLP model: {e}")
+
+def _worker_ready(delay: float = 0.0) -> int:
+    """
+    Runs in a worker, after its initializer (and a pause of `delay` seconds, so that a retry is
+    more likely to reach a worker that was still loading); returns the worker's pid if its NLP
+    model is loaded, None otherwise.
+    """
+    from app.services import model_registry
+    time.sleep(delay)
+    return os.getpid() if model_registry.is_loaded() else None
+
+def _submit_warmup(delay: float = 0.0):
+    global _warmup_jobs
+    with _lock:
+        if _warmup_jobs >= WARMUP_MAX_JOBS_PER_WORKER * CPU_POOL_SIZE:
+            return
+        _warmup_jobs += 1
+    try:
+        submit(_worker_ready, delay).add_done_callback(_count_ready)
+    except PoolSaturatedError:
+        logger.warning("CPU pool is saturated; worker warm-up skipped.")
+
+def _count_ready(future: Future):
+    if future.cancelled() or future.exception() is not None:
+        return
+    pid = future.result()
+    if pid is None:
+        return
+    with _lock:
+        duplicate = pid in _ready_pids
+        _ready_pids.add(pid)
+        complete = len(_ready_pids) >= CPU_POOL_SIZE
+    if duplicate and not complete:
+        _submit_warmup(WARMUP_RETRY_DELAY_SECONDS)
+
+def uses_processes() -> bool:
+    """
+    Returns True if CPU-bound work runs in worker processes rather than in threads.
+    """
+    return CPU_POOL_SIZE > 0
+
+def pool_workers() -> int:
+    """
+    Returns the number of workers of the pool: CPU_POOL_SIZE processes, or CPU_POOL_THREADS threads.
+    """
+    return CPU_POOL_SIZE if uses_processes() else max(CPU_POOL_THREADS, 1)
+
+def max_pending() -> int:
+    """
+    Returns the number of jobs that may be running or queued before submissions are rejected.
+    """
+    if CPU_POOL_MAX_PENDING > 0:
+        return CPU_POOL_MAX_PENDING
+    return 4 * pool_workers()
+
+def get_pool():
+    """
+    Returns the pool used for CPU-bound analysis, creating it on first use.
+
+    With CPU_POOL_SIZE > 0 this is a process pool whose workers are initialized with the
+    analysis libraries and models; with CPU_POOL_SIZE = 0 the work runs in a thread pool,
+    which still keeps it off the event loop.
+    """
+    global _pool
+    with _lock:
+        if _pool is None:
+            if uses_processes():
+                _pool = ProcessPoolExecutor(
+                    max_workers=CPU_POOL_SIZE,
+                    mp_context=multiprocessing.get_context(CPU_POOL_START_METHOD),
+                    initializer=_init_worker,
+                    initargs=(CPU_POOL_PRELOAD_NLP,)
+                )
+            else:
+                _pool = ThreadPoolExecutor(max_workers=pool_workers(), thread_name_prefix="cpu")
+        return _pool
+
+def start():
+    """
+    Creates the pool and starts its workers ahead of the first request.
+    """
+    get_pool()
+    if uses_processes():
+        # Sent like any other job, so they count towards the pending jobs
+        for _ in range(CPU_POOL_SIZE):
+            _submit_warmup()
+
+def workers_ready() -> int:
+    """
+    Returns how many distinct worker processes have reported their NLP model as loaded.
+    """
+    with _lock:
+        return len(_ready_pids)
+
+def _release(future: Future):
+    global _in_flight
+    with _lock:
+        _in_flight -= 1
+        if future.cancelled() or future.exception() is not None:
+            _counters["failed"] += 1
+        else:
+            _counters["completed"] += 1
+
+def submit(fn, *args) -> Future:
+    """
+    Submits a CPU-bound call to the pool, applying backpressure.
+
+    Parameters:
+        fn (callable): A module-level (picklable) function.
+        *args: Its arguments.
+
+    Returns:
+        Future: Resolved with the function's result.
+
+    Raises:
+        PoolSaturatedError: If the pool already has `max_pending()` jobs running or queued.
+    """
+    global _in_flight
+    pool = get_pool()
+    with _lock:
+        if _in_flight >= max_pending():
+            _counters["rejected"] += 1
+            raise PoolSaturatedError(f"CPU pool is saturated ({_in_flight} jobs pending).")
+        _in_flight += 1
+        _counters["submitted"] += 1
+        _counters["max_in_flight"] = max(_counters["max_in_flight"], _in_flight)
+    try:
+        future = pool.submit(fn, *args)
+    except Exception:
+        with _lock:
+            _in_flight -= 1
+        raise
+    future.add_done_callback(_release)
+    return future
+
+async def run_cpu_bound(fn, *args):
+    """
+    Runs a CPU-bound call in the pool and awaits its result without blocking the event loop.
+
+    Raises:
+        PoolSaturatedError: If the pool is saturated.
+    """
+    return await asyncio.wrap_future(submit(fn, *args))
+
+def get_stats() -> dict:
+    """
+    Returns the pool configuration and queue-depth counters.
+    """
+    with _lock:
+        workers = pool_workers()
+        return {
+            "mode": "process" if uses_processes() else "thread",
+            "workers": workers,
+            "max_pending": max_pending(),
+            "workers_ready": len(_ready_pids),
+            "in_flight": _in_flight,
+            "queued": max(0, _in_flight - workers),
+            **_counters,
+        }
+
+def shutdown():
+    """
+    Shuts the pool down, cancelling jobs that have not started yet.
+    """
+    global _pool, _warmup_jobs
+    with _lock:
+        pool, _pool = _pool, None
+        _ready_pids.clear()
+        _warmup_jobs = 0
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
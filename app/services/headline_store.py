@@ -0,0 +1,208 @@
+import re
+import asyncio
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, text as sql_text
+
+from app.config import SIMILARITY_ENABLED
+from app.database import SessionLocal, engine
+from app.models import Headline
+
+logger = logging.getLogger(__name__)
+
+# Whether the headline table (and its full-text index) has been created, and whether FTS5 is available
+_schema_ready = False
+_fts_available = False
+_schema_lock = threading.Lock()
+
+# Full-text index over headlines.text, kept in sync with the headlines table by triggers
+_FTS_STATEMENTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS headlines_fts USING fts5(text, content='headlines', content_rowid='id')",
+    """CREATE TRIGGER IF NOT EXISTS headlines_fts_insert AFTER INSERT ON headlines BEGIN
+        INSERT INTO headlines_fts(rowid, text) VALUES (new.id, new.text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS headlines_fts_delete AFTER DELETE ON headlines BEGIN
+        INSERT INTO headlines_fts(headlines_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS headlines_fts_update AFTER UPDATE OF text ON headlines BEGIN
+        INSERT INTO headlines_fts(headlines_fts, rowid, text) VALUES ('delete', old.id, old.text);
+        INSERT INTO headlines_fts(rowid, text) VALUES (new.id, new.text);
+    END""",
+]
+
+def _ensure_schema():
+    """
+    Creates the headline table and, on SQLite with FTS5, its full-text index.
+    Other databases fall back to substring search.
+    """
+    global _schema_ready, _fts_available
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        Headline.__table__.create(bind=engine, checkfirst=True)
+        if engine.dialect.name == "sqlite":
+            try:
+                with engine.begin() as connection:
+                    for statement in _FTS_STATEMENTS:
+                        connection.execute(sql_text(statement))
+                _fts_available = True
+            except Exception as e:
+                logger.warning(f"SQLite FTS5 is not available, headline search falls back to LIKE: {e}")
+        _schema_ready = True
+
+def normalize_headline(text: str) -> str:
+    """
+    Normalizes a headline for deduplication: lowercase with runs of whitespace collapsed.
+    """
+    return " ".join(text.lower().split())
+
+def headline_hash(text: str) -> str:
+    return hashlib.sha1(normalize_headline(text).encode("utf-8")).hexdigest()
+
+def store_headlines(headlines: list, source: str) -> dict:
+    """
+    Stores scraped headlines, deduplicated by normalized text hash.
+    New headlines are inserted; known ones get their last-seen time refreshed.
+
+    Parameters:
+        headlines (list): Headline texts.
+        source (str): The source they were scraped from.
+
+    Returns:
+        dict: Numbers of inserted and refreshed headlines.
+    """
+    _ensure_schema()
+    now = datetime.utcnow()
+    by_hash = {}
+    for headline in headlines:
+        if headline and headline.strip():
+            by_hash.setdefault(headline_hash(headline), headline.strip())
+    if not by_hash:
+        return {"inserted": 0, "refreshed": 0}
+
+    db = SessionLocal()
+    try:
+        existing = set()
+        hashes = list(by_hash)
+        # Query in chunks to stay below SQLite's bound-parameter limit
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            existing.update(row[0] for row in db.query(Headline.text_hash).filter(Headline.text_hash.in_(chunk)))
+            db.query(Headline).filter(Headline.text_hash.in_(chunk)).update(
+                {Headline.last_seen: now}, synchronize_session=False
+            )
+        new_rows = [
+            Headline(text_hash=key, text=text, source=source, first_seen=now, last_seen=now)
+            for key, text in by_hash.items() if key not in existing
+        ]
+        db.add_all(new_rows)
+        db.commit()
+        return {"inserted": len(new_rows), "refreshed": len(existing)}
+    finally:
+        db.close()
+
+def store_sources(sources_data: dict) -> dict:
+    """
+    Stores the result of `scraper.update_trusted_sources` (source URL -> list of headlines).
+
+    Returns:
+        dict: Numbers of inserted and refreshed headlines, summed over all sources.
+    """
+    totals = {"inserted": 0, "refreshed": 0}
+    for source, headlines in sources_data.items():
+        counts = store_headlines(headlines, source)
+        totals["inserted"] += counts["inserted"]
+        totals["refreshed"] += counts["refreshed"]
+    logger.info(f"Headline store: {totals['inserted']} new and {totals['refreshed']} known headlines")
+    return totals
+
+async def refresh_trusted_sources() -> dict:
+    """
+    Scrapes all trusted sources and stores their headlines (and indexes them for semantic
+    similarity when enabled). Run periodically by the background scheduler.
+
+    Returns:
+        dict: Numbers of inserted and refreshed headlines.
+    """
+    # Imported here: the scraper itself uses this store for local keyword lookups
+    from app.services import scraper, similarity_index
+
+    sources_data = await scraper.update_trusted_sources_async()
+    totals = await asyncio.to_thread(store_sources, sources_data)
+    if SIMILARITY_ENABLED:
+        await asyncio.to_thread(similarity_index.update_index, sources_data)
+    return totals
+
+def _query_terms(query: str, max_terms: int) -> list:
+    terms = []
+    for word in re.findall(r"\w+", query.lower()):
+        if len(word) > 2 and word not in terms:
+            terms.append(word)
+        if len(terms) >= max_terms:
+            break
+    return terms
+
+def search(query: str, limit: int = 20, match_any: bool = False, max_terms: int = 12,
+           max_age_days: float = None) -> list:
+    """
+    Keyword search over stored headlines, served from the local full-text index.
+
+    Parameters:
+        query (str): A keyword or free text; its first `max_terms` words (longer than two characters) are used.
+        limit (int): Maximum number of results.
+        match_any (bool): Match headlines containing any term (ranked by relevance) instead of all terms.
+        max_age_days (float): Only return headlines seen within this many days.
+
+    Returns:
+        list: Dicts with "headline", "source" and "last_seen", best matches first.
+    """
+    _ensure_schema()
+    terms = _query_terms(query, max_terms)
+    if not terms:
+        return []
+    cutoff = datetime.utcnow() - timedelta(days=max_age_days) if max_age_days else None
+
+    db = SessionLocal()
+    try:
+        if _fts_available:
+            match = (" OR " if match_any else " AND ").join(f'"{term}"' for term in terms)
+            statement = (
+                "SELECT h.text, h.source, h.last_seen FROM headlines_fts "
+                "JOIN headlines h ON h.id = headlines_fts.rowid "
+                "WHERE headlines_fts MATCH :match"
+                + (" AND h.last_seen >= :cutoff" if cutoff else "")
+                + " ORDER BY bm25(headlines_fts) LIMIT :limit"
+            )
+            params = {"match": match, "limit": limit}
+            if cutoff:
+                params["cutoff"] = cutoff
+            rows = db.execute(sql_text(statement), params).fetchall()
+        else:
+            conditions = [Headline.text.ilike(f"%{term}%") for term in terms]
+            query_rows = db.query(Headline.text, Headline.source, Headline.last_seen).filter(
+                or_(*conditions) if match_any else and_(*conditions)
+            )
+            if cutoff:
+                query_rows = query_rows.filter(Headline.last_seen >= cutoff)
+            rows = query_rows.order_by(Headline.last_seen.desc()).limit(limit).all()
+        return [
+            {"headline": row[0], "source": row[1], "last_seen": str(row[2])}
+            for row in rows
+        ]
+    finally:
+        db.close()
+
+def get_stats() -> dict:
+    """
+    Returns the number of stored headlines and whether the FTS5 index is used.
+    """
+    _ensure_schema()
+    db = SessionLocal()
+    try:
+        return {"headlines": db.query(Headline).count(), "full_text_index": _fts_available}
+    finally:
+        db.close()
@@ -0,0 +1,220 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import cProfile
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from fastapi import HTTPException
+
+from app.config import (
+    METRICS_LATENCY_BUCKETS, METRICS_SERVER_TIMING, METRICS_PROFILE_SAMPLE_RATE, METRICS_PROFILE_MIN_SECONDS,
+    METRICS_PROFILE_DIR
+)
+from app.utils.metrics import Registry
+
+logger = logging.getLogger(__name__)
+
+# Metrics of this process, exposed by GET /metrics
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "news_verify_stage_duration_seconds", "Duration of the stages of /news/verify.", ("stage", "input_type"),
+    METRICS_LATENCY_BUCKETS
+)
+STAGE_ERRORS = REGISTRY.counter(
+    "news_verify_stage_errors", "Stages of /news/verify that raised an error.", ("stage", "input_type")
+)
+STAGE_IN_FLIGHT = REGISTRY.gauge(
+    "news_verify_stage_in_flight", "Stages of /news/verify currently running.", ("stage", "input_type")
+)
+CALL_SECONDS = REGISTRY.histogram(
+    "news_service_call_duration_seconds", "Duration of analysis service calls.", ("function",), METRICS_LATENCY_BUCKETS
+)
+CALL_ERRORS = REGISTRY.counter("news_service_call_errors", "Analysis service calls that raised an error.", ("function",))
+CALL_IN_FLIGHT = REGISTRY.gauge("news_service_call_in_flight", "Analysis service calls currently running.", ("function",))
+SOCIAL_SECONDS = REGISTRY.histogram(
+    "news_social_platform_duration_seconds", "Duration of social media lookups by platform and result status.",
+    ("platform", "status"), METRICS_LATENCY_BUCKETS
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "news_http_request_duration_seconds", "Duration of HTTP requests by route and status code.",
+    ("method", "route", "status"), METRICS_LATENCY_BUCKETS
+)
+
+# Input types used as label values; anything else is labeled "other" so clients cannot create series
+INPUT_TYPES = ["text", "link", "image", "video"]
+
+# (name, seconds) of the stages and calls timed during the current request, for the Server-Timing header
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+def input_type_label(input_type: str) -> str:
+    input_type = (input_type or "").lower()
+    return input_type if input_type in INPUT_TYPES else "other"
+
+def _is_error(exc: BaseException) -> bool:
+    # Rejected input (4xx) is the client's error, not a failure of the stage
+    if isinstance(exc, HTTPException):
+        return exc.status_code >= 500
+    return not isinstance(exc, asyncio.CancelledError)
+
+def _record_timing(name: str, seconds: float):
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+@contextmanager
+def stage(name: str, input_type: str):
+    """
+    Times a stage of the verification pipeline: its duration histogram, error counter and
+    in-flight gauge, labeled by stage and input type. Works around awaits as well.
+    """
+    labels = {"stage": name, "input_type": input_type_label(input_type)}
+    STAGE_IN_FLIGHT.inc(**labels)
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        if _is_error(e):
+            STAGE_ERRORS.inc(**labels)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_IN_FLIGHT.dec(**labels)
+        STAGE_SECONDS.observe(elapsed, **labels)
+        _record_timing(name, elapsed)
+
+@contextmanager
+def call(function: str):
+    """
+    Times one call of an analysis service function.
+    """
+    CALL_IN_FLIGHT.inc(function=function)
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        if _is_error(e):
+            CALL_ERRORS.inc(function=function)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        CALL_IN_FLIGHT.dec(function=function)
+        CALL_SECONDS.observe(elapsed, function=function)
+        _record_timing(function, elapsed)
+
+def timed(function: str):
+    """
+    Decorator timing every call of a service function (sync or async) with `call`.
+    """
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with call(function):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with call(function):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def observe_social(platform: str, status: str, seconds: float):
+    SOCIAL_SECONDS.observe(seconds, platform=platform, status=status)
+    _record_timing(f"social.{platform}", seconds)
+
+def render() -> str:
+    return REGISTRY.render()
+
+def server_timing_header(timings: list, total: float) -> str:
+    """
+    Formats timings as a Server-Timing header value, e.g. `primary;dur=41.2, social;dur=12.0, total;dur=55.1`.
+    """
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+def route_label(scope: dict) -> str:
+    """
+    Returns the route template of a handled request (e.g. /news/verdicts/{news_id}), so that ids
+    in paths do not create series, or "unmatched" if no route matched.
+    """
+    if "endpoint" not in scope:
+        return "unmatched"
+    names = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    return "/".join(f"{{{names[part]}}}" if part in names else part for part in scope["path"].split("/"))
+
+
+# Only one request is profiled at a time: cProfile cannot run twice on the same thread
+_profile_lock = threading.Lock()
+
+def _dump_profile(profiler: cProfile.Profile, method: str, route: str, elapsed: float):
+    os.makedirs(METRICS_PROFILE_DIR, exist_ok=True)
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{method}{route.replace('/', '_')}-{int(elapsed * 1000)}ms.prof"
+    path = os.path.join(METRICS_PROFILE_DIR, name)
+    profiler.dump_stats(path)
+    logger.info(f"Slow request {method} {route} ({elapsed:.2f}s) profiled to {path}")
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the duration of every HTTP request by route and status code.
+
+    With METRICS_SERVER_TIMING, responses carry a Server-Timing header with the stages and
+    service calls timed during the request. With METRICS_PROFILE_SAMPLE_RATE, that fraction of
+    requests runs under cProfile and the profiles of those slower than METRICS_PROFILE_MIN_SECONDS
+    are written to METRICS_PROFILE_DIR (load them with `pstats` or snakeviz). The profiler sees
+    the event loop thread, so the profile also includes other requests served meanwhile, but not
+    the work done on thread or process pools.
+    """
+
+    def __init__(self, app, server_timing: bool = METRICS_SERVER_TIMING,
+                 profile_sample_rate: float = METRICS_PROFILE_SAMPLE_RATE):
+        self.app = app
+        self.server_timing = server_timing
+        self.profile_sample_rate = profile_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = []
+        token = _request_timings.set(timings)
+        status = {"code": 500}
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if self.server_timing:
+                    header = server_timing_header(timings, time.perf_counter() - started)
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode("latin-1"))]}
+            await send(message)
+
+        profiler = None
+        if self.profile_sample_rate > 0 and random.random() < self.profile_sample_rate and _profile_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_timings.reset(token)
+            route = route_label(scope)
+            REQUEST_SECONDS.observe(elapsed, method=scope["method"], route=route, status=str(status["code"]))
+            if profiler is not None:
+                profiler.disable()
+                try:
+                    if elapsed >= METRICS_PROFILE_MIN_SECONDS:
+                        await asyncio.to_thread(_dump_profile, profiler, scope["method"], route, elapsed)
+                except OSError as e:
+                    logger.error(f"Could not write the request profile: {e}")
+                finally:
+                    _profile_lock.release()
@@ -0,0 +1,366 @@
+import os
+import json
+import uuid
+import socket
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy import func, update
+
+from app.config import JOB_WORKERS, JOB_PRIORITIES, JOB_RESULT_TTL, JOB_POLL_INTERVAL, JOB_LEASE_SECONDS
+from app.database import SessionLocal, engine
+from app.models import VerificationJob
+from app.services import verification
+from app.services.executor import PoolSaturatedError
+from app.services.uploads import Upload
+
+logger = logging.getLogger(__name__)
+
+# Whether the job table has been created
+_table_ready = False
+
+# Background worker tasks and the event that wakes them when a job is submitted
+_workers = []
+_wakeup = None
+
+# Counters since startup
+_counters = {"submitted": 0, "completed": 0, "failed": 0, "requeued": 0}
+
+def _owner() -> str:
+    # Computed on each claim: pre-forked workers share the parent's module state
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def _ensure_table():
+    global _table_ready
+    if not _table_ready:
+        VerificationJob.__table__.create(bind=engine, checkfirst=True)
+        _table_ready = True
+
+def priority_of(input_type: str) -> int:
+    """
+    Returns the priority of a job of the given input type (lower runs first).
+    """
+    return JOB_PRIORITIES.get(input_type.lower(), max(JOB_PRIORITIES.values(), default=0) + 1)
+
+def submit(input_type: str, input_data: str = None, upload: Upload = None, no_cache: bool = False) -> str:
+    """
+    Stores a new queued job and wakes a worker.
+
+    Parameters:
+        input_type (str): "text", "link", "image" or "video".
+        input_data (str): The text or URL, for text and link input.
+        upload (Upload): The upload spooled to a file, for image and video input; the job owns the file from now on.
+        no_cache (bool): Ignore cached results.
+
+    Returns:
+        str: The job id.
+    """
+    _ensure_table()
+    job_id = uuid.uuid4().hex
+    db = SessionLocal()
+    try:
+        db.add(VerificationJob(
+            id=job_id,
+            status="queued",
+            input_type=input_type.lower(),
+            input_data=input_data,
+            no_cache=no_cache,
+            upload_path=upload.path if upload else None,
+            upload_digest=upload.digest if upload else None,
+            priority=priority_of(input_type),
+            created_at=datetime.utcnow()
+        ))
+        db.commit()
+    finally:
+        db.close()
+    _counters["submitted"] += 1
+    if _wakeup is not None:
+        _wakeup.set()
+    return job_id
+
+def get(job_id: str) -> dict:
+    """
+    Returns the state of a job, with its final report once it is done, or None if it is unknown.
+    """
+    _ensure_table()
+    db = SessionLocal()
+    try:
+        job = db.get(VerificationJob, job_id)
+        if job is None:
+            return None
+        state = {
+            "job_id": job.id,
+            "status": job.status,
+            "input_type": job.input_type,
+            "priority": job.priority,
+            "created_at": str(job.created_at),
+            "started_at": str(job.started_at) if job.started_at else None,
+            "finished_at": str(job.finished_at) if job.finished_at else None,
+        }
+        if job.status == "done":
+            state["result"] = json.loads(job.result)
+        elif job.status == "failed":
+            state["error"] = job.error
+        elif job.status == "queued":
+            # Number of queued jobs that will run before this one
+            state["position"] = db.query(VerificationJob).filter(
+                VerificationJob.status == "queued",
+                (VerificationJob.priority < job.priority)
+                | ((VerificationJob.priority == job.priority) & (VerificationJob.created_at < job.created_at))
+            ).count()
+        return state
+    finally:
+        db.close()
+
+def _claim_next() -> dict:
+    """
+    Atomically marks the next queued job (by priority, then age) as running, leased to this process
+    for JOB_LEASE_SECONDS, and returns its fields. The conditional update makes the claim safe between
+    workers and between application processes.
+    """
+    db = SessionLocal()
+    try:
+        while True:
+            job = db.query(VerificationJob).filter(VerificationJob.status == "queued").order_by(
+                VerificationJob.priority, VerificationJob.created_at
+            ).first()
+            if job is None:
+                return None
+            now = datetime.utcnow()
+            owner = _owner()
+            claimed = db.execute(
+                update(VerificationJob)
+                .where(VerificationJob.id == job.id, VerificationJob.status == "queued")
+                .values(status="running", started_at=now, owner=owner,
+                        lease_expires_at=now + timedelta(seconds=JOB_LEASE_SECONDS))
+            ).rowcount
+            db.commit()
+            if claimed:
+                return {
+                    "id": job.id, "input_type": job.input_type, "input_data": job.input_data,
+                    "no_cache": job.no_cache, "upload_path": job.upload_path, "upload_digest": job.upload_digest,
+                    "owner": owner
+                }
+            # Another worker claimed it first; try the next one
+            db.expire_all()
+    finally:
+        db.close()
+
+def _remove_upload(path: str):
+    if path:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def _finish(job: dict, status: str, result: dict = None, error: str = None) -> bool:
+    """
+    Records the outcome of a job, or puts it back in the queue, if this process still holds its lease.
+
+    Returns:
+        bool: False if the lease was lost (the job was queued again and may be run by another process).
+    """
+    db = SessionLocal()
+    try:
+        values = {
+            "status": status, "finished_at": datetime.utcnow() if status in ["done", "failed"] else None,
+            "owner": None, "lease_expires_at": None
+        }
+        if result is not None:
+            values["result"] = json.dumps(result, default=str)
+        if error is not None:
+            values["error"] = error
+        if status == "queued":
+            values["started_at"] = None
+        updated = db.execute(
+            update(VerificationJob)
+            .where(VerificationJob.id == job["id"], VerificationJob.status == "running",
+                   VerificationJob.owner == job["owner"])
+            .values(**values)
+        ).rowcount
+        db.commit()
+    finally:
+        db.close()
+    if not updated:
+        logger.warning(f"Job {job['id']} lost its lease; its outcome here is discarded")
+    return bool(updated)
+
+def _renew_lease(job: dict) -> bool:
+    """
+    Extends the lease of a running job held by this process.
+
+    Returns:
+        bool: False if the lease was lost.
+    """
+    db = SessionLocal()
+    try:
+        renewed = db.execute(
+            update(VerificationJob)
+            .where(VerificationJob.id == job["id"], VerificationJob.status == "running",
+                   VerificationJob.owner == job["owner"])
+            .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=JOB_LEASE_SECONDS))
+        ).rowcount
+        db.commit()
+        return bool(renewed)
+    finally:
+        db.close()
+
+async def _heartbeat(job: dict):
+    # Renews the lease three times per lease period while the job runs
+    while True:
+        await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+        try:
+            if not await asyncio.to_thread(_renew_lease, job):
+                logger.warning(f"Job {job['id']} lost its lease while running")
+                return
+        except Exception as e:
+            logger.error(f"Could not renew the lease of job {job['id']}: {e}")
+
+def _load_upload(job: dict) -> Upload:
+    """
+    Rebuilds the upload of a media job: images are read back into memory, videos are analyzed from the file.
+    """
+    if not job["upload_path"]:
+        return None
+    if job["input_type"] == "image":
+        with open(job["upload_path"], "rb") as f:
+            data = f.read()
+        return Upload(job["upload_digest"], len(data), data=data)
+    return Upload(job["upload_digest"], os.path.getsize(job["upload_path"]), path=job["upload_path"])
+
+async def _run(job: dict):
+    heartbeat = asyncio.create_task(_heartbeat(job))
+    try:
+        db = SessionLocal()
+        try:
+            upload = await asyncio.to_thread(_load_upload, job)
+            final_report, _ = await verification.verify(
+                job["input_type"], job["input_data"], upload, job["no_cache"], db
+            )
+        finally:
+            db.close()
+    except PoolSaturatedError:
+        # The analysis pool is full: put the job back and let the worker back off
+        _counters["requeued"] += 1
+        await asyncio.to_thread(_finish, job, "queued")
+        await asyncio.sleep(JOB_POLL_INTERVAL)
+        return
+    except asyncio.CancelledError:
+        # Stopping: hand the job back right away rather than when its lease expires (a short synchronous
+        # update, as the task is being cancelled)
+        _finish(job, "queued")
+        raise
+    except Exception as e:
+        error = str(e.detail) if isinstance(e, HTTPException) else str(e)
+        if not isinstance(e, HTTPException):
+            logger.error(f"Job {job['id']} failed: {e}")
+        _counters["failed"] += 1
+        if await asyncio.to_thread(_finish, job, "failed", None, error):
+            await asyncio.to_thread(_remove_upload, job["upload_path"])
+        return
+    finally:
+        heartbeat.cancel()
+    _counters["completed"] += 1
+    # The upload is only needed until the job has run; a job that lost its lease keeps it for its new runner
+    if await asyncio.to_thread(_finish, job, "done", final_report):
+        await asyncio.to_thread(_remove_upload, job["upload_path"])
+
+async def _worker_loop(index: int):
+    while True:
+        job = await asyncio.to_thread(_claim_next)
+        if job is None:
+            # Recover jobs abandoned by a process that died, then wait for work
+            requeued = await asyncio.to_thread(_requeue_expired)
+            if requeued:
+                logger.info(f"Re-queued {requeued} abandoned verification jobs")
+                continue
+            # Sleep until a job is submitted in this process, or poll for jobs submitted by other processes
+            _wakeup.clear()
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        await _run(job)
+
+def _requeue_expired() -> int:
+    """
+    Puts running jobs whose lease has expired (left by a process that died) back in the queue. Jobs
+    leased by live processes, including sibling workers of a pre-fork server, are left alone.
+    """
+    db = SessionLocal()
+    try:
+        count = db.execute(
+            update(VerificationJob)
+            .where(VerificationJob.status == "running",
+                   (VerificationJob.lease_expires_at < datetime.utcnow()) | VerificationJob.lease_expires_at.is_(None))
+            .values(status="queued", started_at=None, owner=None, lease_expires_at=None)
+        ).rowcount
+        db.commit()
+        return count
+    finally:
+        db.close()
+
+def start(workers: int = JOB_WORKERS):
+    """
+    Starts the background job workers on the running event loop.
+    """
+    global _wakeup
+    _ensure_table()
+    requeued = _requeue_expired()
+    if requeued:
+        logger.info(f"Re-queued {requeued} interrupted verification jobs")
+    _wakeup = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for index in range(workers):
+        _workers.append(loop.create_task(_worker_loop(index), name=f"job-worker:{index}"))
+
+async def stop():
+    """
+    Stops the job workers; a job interrupted here is put back in the queue.
+    """
+    for task in _workers:
+        task.cancel()
+    for task in _workers:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    _workers.clear()
+
+def purge_expired() -> int:
+    """
+    Deletes finished jobs older than JOB_RESULT_TTL seconds (and any upload left behind).
+
+    Returns:
+        int: The number of deleted jobs.
+    """
+    _ensure_table()
+    cutoff = datetime.utcnow() - timedelta(seconds=JOB_RESULT_TTL)
+    db = SessionLocal()
+    try:
+        expired = db.query(VerificationJob).filter(
+            VerificationJob.status.in_(["done", "failed"]), VerificationJob.finished_at < cutoff
+        ).all()
+        for job in expired:
+            _remove_upload(job.upload_path)
+            db.delete(job)
+        db.commit()
+        return len(expired)
+    finally:
+        db.close()
+
+def get_stats() -> dict:
+    """
+    Returns the number of jobs per status and the worker counters.
+    """
+    _ensure_table()
+    db = SessionLocal()
+    try:
+        by_status = dict(
+            db.query(VerificationJob.status, func.count(VerificationJob.id)).group_by(VerificationJob.status).all()
+        )
+    finally:
+        db.close()
+    return {"workers": len(_workers), "jobs": by_status, **_counters}
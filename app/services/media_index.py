@@ -0,0 +1,153 @@
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import func
+
+from app.config import MEDIA_HASH_ALGORITHM, MEDIA_HASH_MAX_DISTANCE, MEDIA_HASH_VIDEO_MATCH_RATIO
+from app.database import SessionLocal, engine
+from app.models import MediaItem, MediaFingerprint
+from app.services import report_store
+from app.utils.bk_tree import BKTree
+
+logger = logging.getLogger(__name__)
+
+# Whether the media tables have been created
+_tables_ready = False
+
+# In-memory BK-tree over the stored fingerprints of MEDIA_HASH_ALGORITHM, with (media type, media id)
+# items. It is loaded from the database on first use, then extended with the rows added since
+# (by this or another process) before each lookup.
+_tree = BKTree()
+_loaded_up_to = 0
+_sync_lock = threading.Lock()
+
+# Counters since startup
+_counters = {"lookups": 0, "matches": 0, "registered": 0}
+
+_SIGN_BIT = 1 << 63
+
+def _to_signed(value: int) -> int:
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= _SIGN_BIT else value
+
+def _to_unsigned(value: int) -> int:
+    return value & ((1 << 64) - 1)
+
+def _ensure_tables():
+    global _tables_ready
+    if not _tables_ready:
+        MediaItem.__table__.create(bind=engine, checkfirst=True)
+        MediaFingerprint.__table__.create(bind=engine, checkfirst=True)
+        _tables_ready = True
+
+def _sync(db):
+    """
+    Adds the fingerprints stored since the last sync to the BK-tree.
+    """
+    global _loaded_up_to
+    with _sync_lock:
+        rows = db.query(MediaFingerprint.id, MediaFingerprint.hash, MediaItem.media_type, MediaItem.id).join(
+            MediaItem, MediaItem.id == MediaFingerprint.media_id
+        ).filter(
+            MediaFingerprint.id > _loaded_up_to, MediaFingerprint.algorithm == MEDIA_HASH_ALGORITHM
+        ).order_by(MediaFingerprint.id).all()
+        for fingerprint_id, value, media_type, media_id in rows:
+            _tree.add(_to_unsigned(value), (media_type, media_id))
+            _loaded_up_to = fingerprint_id
+
+def find_match(media_type: str, fingerprints: list) -> dict:
+    """
+    Looks for earlier media of the same type that the given fingerprints nearly match.
+
+    An image matches when its hash is within MEDIA_HASH_MAX_DISTANCE bits of a known image. A video
+    matches the known video with the most nearly matching frames, if at least MEDIA_HASH_VIDEO_MATCH_RATIO
+    of its sampled frames match.
+
+    Parameters:
+        media_type (str): "image" or "video".
+        fingerprints (list): The perceptual hashes of the upload.
+
+    Returns:
+        dict: {"media_id", "first_seen", "distance", "matched_frames", "final_report"} of the match, or None.
+    """
+    if not fingerprints:
+        return None
+    _ensure_tables()
+    _counters["lookups"] += 1
+    db = SessionLocal()
+    try:
+        _sync(db)
+        # Per known media: the upload frames it matches, and the smallest distance
+        matched_frames = defaultdict(set)
+        best_distance = {}
+        for position, value in enumerate(fingerprints):
+            for distance, (item_type, media_id) in _tree.search(value, MEDIA_HASH_MAX_DISTANCE):
+                if item_type != media_type:
+                    continue
+                matched_frames[media_id].add(position)
+                best_distance[media_id] = min(distance, best_distance.get(media_id, distance))
+        if not matched_frames:
+            return None
+        media_id = max(matched_frames, key=lambda candidate: (len(matched_frames[candidate]), -best_distance[candidate]))
+        if len(matched_frames[media_id]) < MEDIA_HASH_VIDEO_MATCH_RATIO * len(fingerprints):
+            return None
+
+        item = db.get(MediaItem, media_id)
+        if item is None:
+            return None
+        _counters["matches"] += 1
+        return {
+            "media_id": item.id,
+            "first_seen": item.first_seen.isoformat(),
+            "distance": best_distance[media_id],
+            "matched_frames": len(matched_frames[media_id]),
+            "final_report": report_store.decode_details(item.report_codec, item.report_payload),
+        }
+    finally:
+        db.close()
+
+def register(media_type: str, content_digest: str, fingerprints: list, final_report: dict) -> int:
+    """
+    Stores the verdict of newly analyzed media with its fingerprints.
+
+    Returns:
+        int: The id of the media item.
+    """
+    _ensure_tables()
+    codec, payload = report_store.encode_details(final_report)
+    db = SessionLocal()
+    try:
+        item = MediaItem(
+            media_type=media_type,
+            content_digest=content_digest,
+            first_seen=datetime.utcnow(),
+            veracity_score=final_report["final_veracity_score"],
+            report_codec=codec,
+            report_payload=payload
+        )
+        db.add(item)
+        db.flush()
+        db.add_all(
+            MediaFingerprint(media_id=item.id, algorithm=MEDIA_HASH_ALGORITHM, hash=_to_signed(value))
+            for value in fingerprints
+        )
+        db.commit()
+        _counters["registered"] += 1
+        media_id = item.id
+        # Picked up by the BK-tree on the next lookup
+        return media_id
+    finally:
+        db.close()
+
+def get_stats() -> dict:
+    """
+    Returns the number of indexed fingerprints and the lookup counters.
+    """
+    _ensure_tables()
+    db = SessionLocal()
+    try:
+        items = db.query(func.count(MediaItem.id)).scalar()
+    finally:
+        db.close()
+    return {"media_items": items, "indexed_fingerprints": len(_tree), **_counters}
@@ -1,17 +1,50 @@
 import cv2
 import numpy as np
 from PIL import Image, ExifTags
+import io
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.config import (
+    VIDEO_SAMPLE_FRAMES, VIDEO_SEEK_THRESHOLD, VIDEO_SEGMENT_SECONDS,
+    VIDEO_SEGMENT_WORKERS, VIDEO_SEGMENT_MIN_FRAMES, IMAGE_MAX_SIDE,
+    MEDIA_HASH_ALGORITHM, MEDIA_HASH_VIDEO_FRAMES
+)
+
+# Frames or images with a lower intensity standard deviation (blank, black or single-color) are not
+# fingerprinted: their hashes are identical whatever the media, and would match unrelated uploads
+MIN_FINGERPRINT_STD = 4.0
 
 def analyze_image(image_path: str) -> tuple:
     """
-    Performs advanced analysis on the given image.
+    Performs advanced analysis on the image stored at the given path.
+    
+    Parameters:
+        image_path (str): The file path to the image.
+    
+    Returns:
+        tuple: See `analyze_image_bytes`.
+    """
+    try:
+        with open(image_path, "rb") as f:
+            data = f.read()
+    except Exception as e:
+        return 0.0, f"Error loading image: {str(e)}"
+    return analyze_image_bytes(data)
+
+def analyze_image_bytes(data: bytes) -> tuple:
+    """
+    Performs advanced analysis on the given image, decoded straight from its bytes.
     
     This function analyzes both the image's histogram and its metadata (EXIF) to determine its authenticity.
     It checks for natural variations in the image and inspects metadata for any signs of modifications.
+    Large images are downscaled to IMAGE_MAX_SIDE pixels before the histogram is computed (JPEGs are
+    decoded at reduced size directly); the histogram is rescaled to the original pixel count, so the
+    score does not depend on the downscaling.
     
     Parameters:
-        image_path (str): The file path to the image.
+        data (bytes): The encoded image.
     
     Returns:
         tuple: A tuple containing:
@@ -19,20 +52,22 @@ def analyze_image(image_path: str) -> tuple:
             - report (str): A detailed analysis report.
     """
     try:
-        # Load the image using PIL and convert to RGB
-        image = Image.open(image_path).convert("RGB")
+        image = Image.open(io.BytesIO(data))
+        original_pixels = image.size[0] * image.size[1]
+        # Let the decoder produce a reduced image (JPEG DCT scaling) instead of decoding at full size
+        image.draft("RGB", (IMAGE_MAX_SIDE, IMAGE_MAX_SIDE))
+        # Convert to grayscale and downscale the remaining excess
+        gray_image = image.convert("L")
+        gray_image.thumbnail((IMAGE_MAX_SIDE, IMAGE_MAX_SIDE))
     except Exception as e:
         return 0.0, f"Error loading image: {str(e)}"
 
-    # Convert image to NumPy array for OpenCV processing
-    image_np = np.array(image)
-    
-    # Convert image to grayscale
-    gray = cv2.cvtColor(image_np, cv2.COLOR_RGB2GRAY)
+    gray = np.asarray(gray_image)
     
-    # Calculate the histogram of the grayscale image and compute its standard deviation
+    # Calculate the histogram of the grayscale image and compute its standard deviation,
+    # scaled back to the pixel count of the original image
     hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
-    hist_std = np.std(hist)
+    hist_std = np.std(hist) * (original_pixels / max(gray.size, 1))
     
     # Basic analysis using histogram standard deviation
     base_score = 0.9 if hist_std > 50 else 0.4
@@ -40,7 +75,7 @@ def analyze_image(image_path: str) -> tuple:
     
     # Attempt to extract EXIF data for extended analysis
     try:
-        exif_data = image._getexif()
+        exif_data = image._getexif() if hasattr(image, "_getexif") else None
         if exif_data:
             exif_report = "EXIF Data Found:\n"
             for tag, value in exif_data.items():
@@ -63,56 +98,308 @@ def analyze_image(image_path: str) -> tuple:
     
     return veracity_score, report
 
+def _histogram_stds(gray_frames: np.ndarray) -> np.ndarray:
+    """
+    Computes the standard deviation of the 256-bin intensity histogram of every frame in one
+    vectorized pass over the stacked grayscale frames.
+
+    Parameters:
+        gray_frames (np.ndarray): A (n, height, width) uint8 stack of grayscale frames.
+
+    Returns:
+        np.ndarray: n histogram standard deviations.
+    """
+    count = gray_frames.shape[0]
+    if count == 0:
+        return np.zeros(0, dtype=np.float64)
+    # Shift each frame's pixel values into its own block of 256 bins, then count all frames at once
+    offsets = (np.arange(count, dtype=np.int64) * 256)[:, None]
+    binned = gray_frames.reshape(count, -1).astype(np.int64) + offsets
+    histograms = np.bincount(binned.ravel(), minlength=count * 256).reshape(count, 256)
+    return histograms.std(axis=1)
+
+def _target_frames(frame_count: int, samples: int) -> list:
+    """
+    Returns the indices of the frames to sample: every (frame_count // samples)-th frame.
+    """
+    sample_rate = max(frame_count // samples, 1)
+    return list(range(0, frame_count, sample_rate))
+
+def _sample_frames(video_path: str, targets: list, stop_at: float = None) -> tuple:
+    """
+    Decodes only the target frames of a video: nearby targets are reached by grabbing
+    (skipping without color conversion), distant ones by seeking. Decoding stops early once
+    the wall-clock time `stop_at` (a `time.time()` value) has passed.
+
+    Returns:
+        tuple: (indices of the frames actually decoded, (n, height, width) uint8 grayscale stack)
+    """
+    cap = cv2.VideoCapture(video_path)
+    indices, frames = [], []
+    try:
+        if not cap.isOpened():
+            return indices, np.zeros((0, 0, 0), dtype=np.uint8)
+        position = 0
+        for target in targets:
+            if stop_at is not None and time.time() > stop_at:
+                break
+            if target != position and (target < position or target - position > VIDEO_SEEK_THRESHOLD):
+                cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+                position = target
+            while position < target:
+                if not cap.grab():
+                    break
+                position += 1
+            ok, frame = cap.read()
+            if not ok:
+                break
+            position += 1
+            indices.append(target)
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+    finally:
+        cap.release()
+    if not frames:
+        return indices, np.zeros((0, 0, 0), dtype=np.uint8)
+    return indices, np.stack(frames)
+
+def _analyze_segment(video_path: str, targets: list, stop_at: float = None, hash_targets: frozenset = frozenset()) -> tuple:
+    """
+    Samples the target frames of one video segment and computes their histogram statistics, and
+    the perceptual hashes of the frames in `hash_targets` (None for frames too uniform to hash).
+
+    Returns:
+        tuple: (list of sampled frame indices, list of histogram standard deviations,
+            list of (frame index, hash or None) for the sampled frames in `hash_targets`)
+    """
+    indices, gray_frames = _sample_frames(video_path, targets, stop_at)
+    hashes = [
+        (index, perceptual_hash(frame) if frame.std() >= MIN_FINGERPRINT_STD else None)
+        for index, frame in zip(indices, gray_frames) if index in hash_targets
+    ]
+    return indices, _histogram_stds(gray_frames).tolist(), hashes
+
+# Thread pool running video segments in parallel; created on first use
+_segment_executor = None
+
+_segment_lock = threading.Lock()
+
+def _get_segment_executor():
+    """
+    Returns the thread pool sampling video segments. OpenCV releases the GIL while decoding, so
+    threads decode in parallel; threads (rather than processes) also work inside CPU pool workers,
+    where video analysis normally runs, without starting a second level of processes.
+    """
+    global _segment_executor
+    with _segment_lock:
+        if _segment_executor is None:
+            _segment_executor = ThreadPoolExecutor(max_workers=VIDEO_SEGMENT_WORKERS, thread_name_prefix="video")
+        return _segment_executor
+
+def shutdown_segment_executor():
+    """
+    Shuts down the video segment threads.
+    """
+    global _segment_executor
+    with _segment_lock:
+        segment_executor, _segment_executor = _segment_executor, None
+    if segment_executor is not None:
+        segment_executor.shutdown(wait=False, cancel_futures=True)
+
+def _count_frames(video_path: str) -> tuple:
+    """
+    Returns (frame count, frames per second) of a video. When the container does not report
+    a frame count, frames are counted by grabbing them (no decoding to images).
+    """
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            return -1, 0.0
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        if frame_count <= 0:
+            frame_count = 0
+            while cap.grab():
+                frame_count += 1
+        return frame_count, fps
+    finally:
+        cap.release()
+
 def analyze_video(video_path: str) -> tuple:
+    """
+    Performs advanced analysis on the given video by sampling frames and analyzing each frame
+    (see `analyze_video_until`, without a time limit).
+
+    Parameters:
+        video_path (str): The file path to the video.
+
+    Returns:
+        tuple: (veracity_score (float), report (str))
+    """
+    score, report, _ = analyze_video_until(video_path)
+    return score, report
+
+def _sample_video(video_path: str, samples: int, hash_samples: int = 0, stop_at: float = None) -> dict:
+    """
+    Decodes, in one pass over the video, about `samples` evenly spaced frames for the analysis and
+    `hash_samples` for fingerprints (see `analyze_video_until`).
+
+    Returns:
+        dict: {"targets": analysis targets, "indices" and "hist_stds": of the analysis frames decoded,
+            "fingerprints": hashes of the fingerprint frames decoded, "complete": all targets decoded}
+
+    Raises:
+        IOError: If the video cannot be opened.
+    """
+    frame_count, fps = _count_frames(video_path)
+    if frame_count < 0:
+        raise IOError("Error opening video file.")
+    targets = _target_frames(frame_count, samples) if samples > 0 else []
+    hash_targets = frozenset(_target_frames(frame_count, hash_samples) if hash_samples > 0 else [])
+    all_targets = sorted(set(targets) | hash_targets)
+
+    segment_frames = int(VIDEO_SEGMENT_SECONDS * fps) if fps > 0 else 0
+    segment_count = 0
+    if segment_frames > 0 and VIDEO_SEGMENT_WORKERS > 1:
+        # One segment per VIDEO_SEGMENT_SECONDS, but never fewer than VIDEO_SEGMENT_MIN_FRAMES targets per segment
+        segment_count = min(-(-frame_count // segment_frames), len(all_targets) // max(VIDEO_SEGMENT_MIN_FRAMES, 1))
+    if segment_count > 1:
+        # Split the targets into consecutive segments and sample them in parallel
+        size = -(-len(all_targets) // segment_count)
+        executor = _get_segment_executor()
+        futures = [
+            executor.submit(_analyze_segment, video_path, all_targets[start:start + size], stop_at, hash_targets)
+            for start in range(0, len(all_targets), size)
+        ]
+        indices, hist_stds, hashes = [], [], []
+        for future in futures:
+            segment_indices, segment_stds, segment_hashes = future.result()
+            indices.extend(segment_indices)
+            hist_stds.extend(segment_stds)
+            hashes.extend(segment_hashes)
+    else:
+        indices, hist_stds, hashes = _analyze_segment(video_path, all_targets, stop_at, hash_targets)
+
+    analyzed = set(targets)
+    sampled = [(index, hist_std) for index, hist_std in zip(indices, hist_stds) if index in analyzed]
+    return {
+        "targets": targets,
+        "indices": [index for index, _ in sampled],
+        "hist_stds": [hist_std for _, hist_std in sampled],
+        "fingerprints": [fingerprint for _, fingerprint in hashes if fingerprint is not None],
+        "complete": len(indices) == len(all_targets) or stop_at is None or time.time() <= stop_at,
+    }
+
+def analyze_video_until(video_path: str, stop_at: float = None) -> tuple:
     """
     Performs advanced analysis on the given video by sampling frames and analyzing each frame.
     
-    The analysis includes histogram evaluation for each sampled frame and provides a detailed report.
+    Only the sampled frames (about VIDEO_SAMPLE_FRAMES of them) are decoded, by seeking or
+    grabbing directly to them. Videos longer than VIDEO_SEGMENT_SECONDS are split into segments
+    of at least VIDEO_SEGMENT_MIN_FRAMES sampled frames, which are sampled in parallel. The
+    histogram statistics of all sampled frames are computed in one vectorized operation, and the
+    analysis provides a detailed report.
+
+    Decoding stops once the wall-clock time `stop_at` (a `time.time()` value, so that it holds
+    in worker processes too) has passed, and the frames sampled by then are analyzed.
     
     Parameters:
         video_path (str): The file path to the video.
+        stop_at (float): When to stop decoding; no limit by default.
     
     Returns:
         tuple: A tuple containing:
             - veracity_score (float): Average confidence score for the video's authenticity.
             - report (str): A detailed analysis report.
+            - complete (bool): False if decoding was cut short before all target frames were sampled.
+    """
+    score, report, complete, _ = analyze_and_fingerprint_video(video_path, stop_at, fingerprint_samples=0)
+    return score, report, complete
+
+def analyze_and_fingerprint_video(video_path: str, stop_at: float = None,
+                                  fingerprint_samples: int = MEDIA_HASH_VIDEO_FRAMES) -> tuple:
+    """
+    Analyzes a video like `analyze_video_until` and fingerprints it like `video_fingerprints`, in
+    a single decoding pass: the frames of both are sampled together, so the video is opened and
+    decoded once.
+
+    Returns:
+        tuple: (veracity_score (float), report (str), complete (bool), fingerprints (list))
     """
     try:
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            return 0.0, "Error opening video file."
+        sampled = _sample_video(video_path, VIDEO_SAMPLE_FRAMES, fingerprint_samples, stop_at)
+    except IOError as e:
+        return 0.0, str(e), True, []
     except Exception as e:
-        return 0.0, f"Error loading video: {str(e)}"
-    
-    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    sample_rate = max(frame_count // 10, 1)  # Sample approximately 10 frames
+        return 0.0, f"Error loading video: {str(e)}", True, []
+
+    indices, hist_stds, complete = sampled["indices"], sampled["hist_stds"], sampled["complete"]
+    fingerprints = sampled["fingerprints"]
+    if not indices:
+        if not complete:
+            return 0.0, "No frames were decoded from the video within the time budget.", False, fingerprints
+        return 0.0, "No frames were analyzed from the video.", True, fingerprints
+
     scores = []
-    analyzed_frames = 0
-    current_frame = 0
     frame_reports = ""
-    
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        if current_frame % sample_rate == 0:
-            # Convert frame to grayscale and compute histogram standard deviation
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
-            hist_std = np.std(hist)
-            frame_score = 0.9 if hist_std > 50 else 0.4
-            scores.append(frame_score)
-            analyzed_frames += 1
-            frame_reports += f"Frame {current_frame}: histogram std = {hist_std:.2f}, score = {frame_score:.2f}\n"
-        current_frame += 1
-    cap.release()
-    
-    if analyzed_frames == 0:
-        return 0.0, "No frames were analyzed from the video."
-    
+    for index, hist_std in zip(indices, hist_stds):
+        frame_score = 0.9 if hist_std > 50 else 0.4
+        scores.append(frame_score)
+        frame_reports += f"Frame {index}: histogram std = {hist_std:.2f}, score = {frame_score:.2f}\n"
+
     average_score = sum(scores) / len(scores)
-    report = f"Analyzed {analyzed_frames} frames from video. Average score: {average_score:.2f}.\n"
+    report = f"Analyzed {len(indices)} frames from video. Average score: {average_score:.2f}.\n"
+    if not complete:
+        report += f"Decoding was cut short by the time budget after {len(indices)} of {len(sampled['targets'])} frames.\n"
     report += frame_reports
     report += "\nFinal verdict: " + ("Video appears authentic." if average_score > 0.5 else "Video may be manipulated.")
     
-    return average_score, report
+    return average_score, report, complete, fingerprints
+
+def perceptual_hash(gray: np.ndarray, algorithm: str = MEDIA_HASH_ALGORITHM) -> int:
+    """
+    Computes a 64-bit perceptual hash of a grayscale image, stable under re-compression,
+    rescaling and small edits.
+
+    Parameters:
+        gray (np.ndarray): A (height, width) uint8 grayscale image.
+        algorithm (str): "phash" (signs of the low-frequency DCT coefficients against their median)
+            or "dhash" (signs of horizontal gradients on a 9x8 thumbnail).
+
+    Returns:
+        int: The hash, as an unsigned 64-bit integer.
+    """
+    if algorithm == "phash":
+        small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+        low_frequencies = cv2.dct(small)[:8, :8]
+        bits = low_frequencies > np.median(low_frequencies)
+    elif algorithm == "dhash":
+        small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA).astype(np.int16)
+        bits = small[:, 1:] > small[:, :-1]
+    else:
+        raise ValueError(f"Unknown perceptual hash algorithm '{algorithm}'.")
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+def image_fingerprints(data: bytes) -> list:
+    """
+    Returns the perceptual hash of an encoded image as a one-element list, or an empty list if
+    the image cannot be decoded or is too uniform to be recognized.
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.draft("L", (256, 256))
+        gray = np.asarray(image.convert("L"))
+    except Exception:
+        return []
+    if gray.size == 0 or gray.std() < MIN_FINGERPRINT_STD:
+        return []
+    return [perceptual_hash(gray)]
+
+def video_fingerprints(video_path: str, samples: int = MEDIA_HASH_VIDEO_FRAMES) -> list:
+    """
+    Returns the perceptual hashes of about `samples` evenly spaced frames of a video (uniform
+    frames, such as black transitions, are skipped).
+    """
+    try:
+        return _sample_video(video_path, 0, samples)["fingerprints"]
+    except Exception:
+        return []
@@ -0,0 +1,281 @@
+import os
+import threading
+import logging
+from app.config import (
+    NLP_MODEL_NAME, NLP_INFERENCE_THREADS, NLP_INTEROP_THREADS, NLP_ONNX_CACHE_DIR, CPU_POOL_SIZE
+)
+
+logger = logging.getLogger(__name__)
+
+# Loaded pipelines keyed by model name
+_models = {}
+
+# Per-model load locks, so concurrent first requests trigger a single load
+_load_locks = {}
+
+# Last load error per model name, reported by the readiness endpoint
+_errors = {}
+
+# Guards the dictionaries above and the active model name
+_lock = threading.Lock()
+
+# Name of the model used by the NLP service; can be swapped at runtime
+_active_model_name = NLP_MODEL_NAME
+
+# Inference backends, selected by a suffix of the model name (e.g. "facebook/bart-large-mnli@int8"):
+# - "torch": the fp32 PyTorch pipeline (the default),
+# - "int8": the PyTorch pipeline with its linear layers dynamically quantized to int8 (CPU only),
+# - "onnx": the model exported to ONNX and run by ONNX Runtime (requires optimum[onnxruntime]).
+BACKENDS = ["torch", "int8", "onnx"]
+
+# ONNX Runtime model classes per pipeline task
+_ONNX_MODEL_CLASSES = {
+    "zero-shot-classification": "ORTModelForSequenceClassification",
+    "feature-extraction": "ORTModelForFeatureExtraction",
+}
+
+# Whether the torch thread counts have been set in this process
+_threads_configured = False
+
+# Serving worker processes sharing this node's cores (the pre-fork server of app/serve.py sets it in each worker)
+_serving_workers = 1
+
+def split_model_name(name: str) -> tuple:
+    """
+    Splits a model name into the model id and its inference backend ("torch" without a suffix).
+
+    Raises:
+        ValueError: If the backend suffix is unknown.
+    """
+    model_id, separator, backend = name.rpartition("@")
+    if not separator:
+        return name, "torch"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}'; expected one of {', '.join(BACKENDS)}.")
+    return model_id, backend
+
+def inference_threads() -> int:
+    """
+    Returns the number of threads one inference may use: NLP_INFERENCE_THREADS, or by default
+    the cores divided between the serving workers and the CPU pool's worker processes, so they
+    do not oversubscribe the CPU.
+    """
+    if NLP_INFERENCE_THREADS > 0:
+        return NLP_INFERENCE_THREADS
+    return max(1, (os.cpu_count() or 1) // max(1, CPU_POOL_SIZE) // _serving_workers)
+
+def configure_threads(threads: int = None):
+    """
+    Sets the torch thread counts of this process: the intra-op count to `threads`, or once
+    to `inference_threads()` by default. The inter-op count can only be set once per process.
+    """
+    global _threads_configured
+    if _threads_configured and threads is None:
+        return
+    import torch
+    torch.set_num_threads(threads or inference_threads())
+    if NLP_INTEROP_THREADS > 0 and not _threads_configured:
+        try:
+            torch.set_num_interop_threads(NLP_INTEROP_THREADS)
+        except RuntimeError as e:
+            # Only possible before the first parallel operation of the process
+            logger.warning(f"Could not set the inter-op thread count: {e}")
+    _threads_configured = True
+
+def set_serving_workers(count: int):
+    """
+    Divides the inference threads between `count` serving worker processes. Called in each
+    worker forked by the pre-fork server, before its first inference.
+    """
+    global _serving_workers
+    _serving_workers = max(1, count)
+    if _threads_configured:
+        configure_threads(inference_threads())
+
+def _load_onnx_pipeline(model_id: str, task: str):
+    try:
+        import onnxruntime
+        import optimum.onnxruntime
+    except ImportError as e:
+        raise RuntimeError("The onnx backend requires the optimum[onnxruntime] package.") from e
+    from transformers import AutoTokenizer, pipeline
+
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = inference_threads()
+    options.inter_op_num_threads = max(1, NLP_INTEROP_THREADS)
+    model_class = getattr(optimum.onnxruntime, _ONNX_MODEL_CLASSES[task])
+
+    # The export is slow, so the exported graph is kept and reused by later loads and other processes
+    export_dir = os.path.join(NLP_ONNX_CACHE_DIR, model_id.strip("/").replace("/", "--"))
+    if os.path.exists(os.path.join(export_dir, "model.onnx")):
+        model = model_class.from_pretrained(export_dir, session_options=options, provider="CPUExecutionProvider")
+        tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    else:
+        logger.info(f"Exporting '{model_id}' to ONNX in {export_dir}")
+        model = model_class.from_pretrained(model_id, export=True, session_options=options,
+                                            provider="CPUExecutionProvider")
+        tokenizer = AutoTokenizer.from_pretrained(model_id)
+        model.save_pretrained(export_dir)
+        tokenizer.save_pretrained(export_dir)
+    return pipeline(task, model=model, tokenizer=tokenizer)
+
+def _load_pipeline(name: str, task: str = "zero-shot-classification"):
+    """
+    Builds the transformers pipeline for the given model name (with its backend suffix) and task.
+
+    torch and transformers are imported here rather than at module level, so that importing
+    the application does not pay for them until a model is actually needed.
+    """
+    import torch
+    from transformers import pipeline
+
+    model_id, backend = split_model_name(name)
+    configure_threads()
+    if backend == "onnx":
+        return _load_onnx_pipeline(model_id, task)
+    if backend == "int8":
+        # Dynamic quantization: int8 weights, activations quantized on the fly; CPU only
+        classifier = pipeline(task, model=model_id, device=-1)
+        classifier.model = torch.ao.quantization.quantize_dynamic(classifier.model, {torch.nn.Linear}, dtype=torch.qint8)
+        return classifier
+
+    # Determine the device: use GPU if available, otherwise CPU
+    device = 0 if torch.cuda.is_available() else -1
+    return pipeline(task, model=model_id, device=device)
+
+def get_active_model_name() -> str:
+    """
+    Returns the name of the model currently used by the NLP service.
+    """
+    return _active_model_name
+
+def get_model(name: str = None, task: str = "zero-shot-classification"):
+    """
+    Returns the pipeline for the given model name, loading it on first use.
+
+    Parameters:
+        name (str): The model name; defaults to the active model.
+        task (str): The pipeline task used when the model has to be loaded.
+
+    Returns:
+        The loaded transformers pipeline.
+    """
+    name = name or _active_model_name
+    model = _models.get(name)
+    if model is not None:
+        return model
+    split_model_name(name)
+
+    with _lock:
+        load_lock = _load_locks.setdefault(name, threading.Lock())
+
+    with load_lock:
+        # Another caller may have finished loading while we waited for the lock
+        model = _models.get(name)
+        if model is not None:
+            return model
+        logger.info(f"Loading model '{name}'")
+        try:
+            model = _load_pipeline(name, task)
+        except Exception as e:
+            with _lock:
+                _errors[name] = str(e)
+            logger.error(f"Failed to load model '{name}': {e}")
+            raise
+        with _lock:
+            _models[name] = model
+            _errors.pop(name, None)
+        logger.info(f"Model '{name}' loaded")
+        return model
+
+def warm_up(name: str = None, background: bool = True):
+    """
+    Loads the given model ahead of the first request.
+
+    Parameters:
+        name (str): The model name; defaults to the active model.
+        background (bool): Load on a daemon thread instead of blocking the caller.
+
+    Returns:
+        threading.Thread or None: The loader thread when running in the background.
+    """
+    name = name or _active_model_name
+
+    def load():
+        try:
+            get_model(name)
+        except Exception:
+            # The error is recorded by get_model and reported through status()
+            pass
+
+    if not background:
+        load()
+        return None
+    thread = threading.Thread(target=load, name=f"warm-up:{name}", daemon=True)
+    thread.start()
+    return thread
+
+def is_loaded(name: str = None) -> bool:
+    """
+    Returns True if the given model (by default the active one) is loaded and ready to serve.
+    """
+    return (name or _active_model_name) in _models
+
+def unload(name: str) -> bool:
+    """
+    Drops a loaded model so its memory can be reclaimed.
+
+    Returns:
+        bool: True if the model was loaded.
+    """
+    with _lock:
+        model = _models.pop(name, None)
+        _errors.pop(name, None)
+    if model is None:
+        return False
+    del model
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+    logger.info(f"Model '{name}' unloaded")
+    return True
+
+def swap_model(name: str, unload_previous: bool = True) -> str:
+    """
+    Makes another model the active one without restarting the application.
+
+    The new model is loaded before it is activated, so requests keep being served by the
+    previous model until the switch.
+
+    Parameters:
+        name (str): The model name to activate.
+        unload_previous (bool): Unload the previously active model after the switch.
+
+    Returns:
+        str: The name of the previously active model.
+    """
+    global _active_model_name
+    get_model(name)
+    with _lock:
+        previous = _active_model_name
+        _active_model_name = name
+    if unload_previous and previous != name:
+        unload(previous)
+    return previous
+
+def status() -> dict:
+    """
+    Returns the registry state: active model, readiness, loaded models and load errors.
+    """
+    with _lock:
+        loading = [name for name, lock in _load_locks.items() if lock.locked()]
+        return {
+            "active_model": _active_model_name,
+            "ready": _active_model_name in _models,
+            "loaded": sorted(_models),
+            "loading": sorted(loading),
+            "errors": dict(_errors),
+        }
@@ -0,0 +1,180 @@
+import json
+import base64
+from datetime import datetime
+from sqlalchemy import inspect, tuple_, or_, and_, text as sql_text
+from fastapi import HTTPException
+
+from app.database import SessionLocal, engine
+from app.models import News
+from app.services import report_store
+
+# Columns verdicts can be sorted by; pagination is keyed on (sort column, id)
+SORT_COLUMNS = {"published_date": News.published_date, "veracity_score": News.veracity_score}
+
+# Maximum page size
+MAX_LIMIT = 500
+
+# Whether the news_fts full-text index exists (checked once)
+_fts_available = None
+
+def _has_fts() -> bool:
+    global _fts_available
+    if _fts_available is None:
+        _fts_available = engine.dialect.name == "sqlite" and inspect(engine).has_table("news_fts")
+    return _fts_available
+
+def encode_cursor(sort: str, value, news_id: int) -> str:
+    """
+    Encodes the position after a row as an opaque pagination cursor.
+    """
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps({"s": sort, "v": value, "id": news_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, sort: str) -> tuple:
+    """
+    Decodes a pagination cursor into (sort value, id).
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed or was issued for another sort order.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if payload["s"] != sort:
+            raise ValueError("cursor was issued for another sort order")
+        value = payload["v"]
+        if sort == "published_date" and value is not None:
+            value = datetime.fromisoformat(value)
+        return value, int(payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+def _fts_query(text: str) -> str:
+    terms = [term for term in "".join(c if c.isalnum() else " " for c in text.lower()).split() if term]
+    return " AND ".join(f'"{term}"' for term in terms)
+
+def summarize(news: News) -> dict:
+    """
+    Returns the listing fields of a verdict (without its analysis report).
+    """
+    return {
+        "id": news.id,
+        "title": news.title,
+        "source": news.source,
+        "published_date": news.published_date.isoformat() if news.published_date else None,
+        "veracity_score": news.veracity_score,
+        "is_fake": news.is_fake,
+    }
+
+def list_verdicts(start: datetime = None, end: datetime = None, is_fake: bool = None, min_score: float = None,
+                  max_score: float = None, source: str = None, q: str = None, sort: str = "published_date",
+                  order: str = "desc", limit: int = 50, cursor: str = None) -> dict:
+    """
+    Lists stored verdicts matching the filters, one page at a time.
+
+    Pages are read with keyset pagination: the cursor holds the (sort value, id) of the last row
+    of the previous page and the next page starts strictly after it, so each page costs an
+    index range scan whatever its depth (no OFFSET). Rows without a sort value (NULL) come
+    last in either order, by id.
+
+    Parameters:
+        start, end (datetime): Published-date range (inclusive start, exclusive end).
+        is_fake (bool): Only fake (or only authentic) verdicts.
+        min_score, max_score (float): Veracity score range (inclusive).
+        source (str): Exact source.
+        q (str): Full-text search over titles and contents; all words must match.
+        sort (str): "published_date" or "veracity_score".
+        order (str): "desc" or "asc".
+        limit (int): Page size, at most MAX_LIMIT.
+        cursor (str): The `next_cursor` of the previous page.
+
+    Returns:
+        dict: {"items": [verdict summaries], "next_cursor": cursor of the next page or None}
+    """
+    if sort not in SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(SORT_COLUMNS)}.")
+    if order not in ["asc", "desc"]:
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'.")
+    limit = max(1, min(limit, MAX_LIMIT))
+    column = SORT_COLUMNS[sort]
+
+    db = SessionLocal()
+    try:
+        query = db.query(News)
+        if start is not None:
+            query = query.filter(News.published_date >= start)
+        if end is not None:
+            query = query.filter(News.published_date < end)
+        if is_fake is not None:
+            query = query.filter(News.is_fake == is_fake)
+        if min_score is not None:
+            query = query.filter(News.veracity_score >= min_score)
+        if max_score is not None:
+            query = query.filter(News.veracity_score <= max_score)
+        if source is not None:
+            query = query.filter(News.source == source)
+        if q:
+            if _has_fts():
+                match = _fts_query(q)
+                if not match:
+                    return {"items": [], "next_cursor": None}
+                query = query.filter(News.id.in_(
+                    sql_text("SELECT rowid FROM news_fts WHERE news_fts MATCH :match").bindparams(match=match)
+                ))
+            else:
+                query = query.filter(or_(News.title.ilike(f"%{q}%"), News.content.ilike(f"%{q}%")))
+        if cursor:
+            value, last_id = decode_cursor(cursor, sort)
+            after_id = News.id < last_id if order == "desc" else News.id > last_id
+            if value is None:
+                # Past the last non-NULL value: only the remaining NULL rows
+                query = query.filter(and_(column.is_(None), after_id))
+            elif order == "desc":
+                query = query.filter(or_(tuple_(column, News.id) < tuple_(value, last_id), column.is_(None)))
+            else:
+                query = query.filter(or_(tuple_(column, News.id) > tuple_(value, last_id), column.is_(None)))
+
+        # NULLs last in both orders, as the cursor predicate above assumes
+        if order == "desc":
+            query = query.order_by(column.desc().nulls_last(), News.id.desc())
+        else:
+            query = query.order_by(column.asc().nulls_last(), News.id.asc())
+        rows = query.limit(limit + 1).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(sort, getattr(last, sort), last.id)
+        return {"items": [summarize(row) for row in rows], "next_cursor": next_cursor}
+    finally:
+        db.close()
+
+def get_verdict(news_id: int, detail: str = "summary") -> dict:
+    """
+    Returns a stored verdict, or None if it does not exist.
+
+    Parameters:
+        news_id (int): The id of the verdict.
+        detail (str): "summary" for the scores and conclusion of the analysis report, or "full"
+            for the whole report (read from the side table only in that case).
+    """
+    if detail not in ["summary", "full"]:
+        raise HTTPException(status_code=400, detail="detail must be 'summary' or 'full'.")
+    db = SessionLocal()
+    try:
+        news = db.get(News, news_id)
+        if news is None:
+            return None
+        if detail == "full":
+            stored = news.report_details
+            if stored is not None:
+                report = report_store.decode_details(stored.codec, stored.payload)
+            else:
+                report = report_store.legacy_report(news.analysis_report)
+        else:
+            report = report_store.decode_summary(news.analysis_report)
+        return {**summarize(news), "content": news.content, "analysis_report": report}
+    finally:
+        db.close()
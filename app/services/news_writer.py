@@ -0,0 +1,257 @@
+import time
+import queue
+import logging
+import threading
+from sqlalchemy import select, update, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import (
+    NEWS_WRITE_BEHIND, NEWS_WRITE_BATCH_SIZE, NEWS_WRITE_FLUSH_MS, NEWS_ID_BLOCK_SIZE, NEWS_WRITE_RETRIES,
+    NEWS_WRITE_RETRY_MS
+)
+from app.database import SessionLocal, engine
+from app.models import News, IdSequence
+from app.services import instrumentation
+
+logger = logging.getLogger(__name__)
+
+# Range of News ids reserved by this process and not handed out yet: [next, end)
+_id_lock = threading.Lock()
+_id_next = 0
+_id_end = 0
+
+# Whether the sequence table has been created
+_table_ready = False
+
+def _ensure_table():
+    global _table_ready
+    if not _table_ready:
+        IdSequence.__table__.create(bind=engine, checkfirst=True)
+        _table_ready = True
+
+def _reserve_block(size: int) -> int:
+    """
+    Reserves `size` consecutive News ids in the database and returns the first one.
+
+    The reservation is a single conditional UPDATE, so concurrent processes never get
+    overlapping blocks. The sequence starts after the largest id already stored.
+    """
+    _ensure_table()
+    while True:
+        reserved = 0
+        with engine.begin() as connection:
+            current = connection.execute(select(IdSequence.next_value).where(IdSequence.name == "news")).scalar()
+            if current is not None:
+                reserved = connection.execute(
+                    update(IdSequence)
+                    .where(IdSequence.name == "news", IdSequence.next_value == current)
+                    .values(next_value=current + size)
+                ).rowcount
+        if current is None:
+            with engine.connect() as connection:
+                start = (connection.execute(select(func.max(News.id))).scalar() or 0) + 1
+            try:
+                with engine.begin() as connection:
+                    connection.execute(IdSequence.__table__.insert().values(name="news", next_value=start + size))
+                return start
+            except IntegrityError:
+                # Another process created the sequence first
+                continue
+        if reserved:
+            return current
+
+def allocate_id() -> int:
+    """
+    Returns a News id that no other caller (in this or another process) will receive.
+    Ids are reserved from the database in blocks of NEWS_ID_BLOCK_SIZE.
+    """
+    global _id_next, _id_end
+    with _id_lock:
+        if _id_next >= _id_end:
+            _id_next = _reserve_block(NEWS_ID_BLOCK_SIZE)
+            _id_end = _id_next + NEWS_ID_BLOCK_SIZE
+        news_id = _id_next
+        _id_next += 1
+        return news_id
+
+
+class WriteBehindWriter:
+    """
+    Queues News rows and inserts them on a background thread in bulk transactions.
+
+    A batch is flushed as soon as it holds `batch_size` rows, or once its oldest row has
+    waited `flush_ms` milliseconds. `shutdown()` flushes everything still queued.
+
+    A failed bulk insert is retried (for transient errors such as a locked database); if it
+    keeps failing, the rows are inserted one by one and only the rows that fail on their own
+    are dropped, each one logged.
+
+    Parameters:
+        batch_size (int): Maximum number of rows per transaction.
+        flush_ms (float): Maximum time a row waits before it is written.
+    """
+
+    def __init__(self, batch_size: int = NEWS_WRITE_BATCH_SIZE, flush_ms: float = NEWS_WRITE_FLUSH_MS):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.0, flush_ms) / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stats = {"queued": 0, "written": 0, "flushes": 0, "retries": 0, "failed": 0}
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="news-writer", daemon=True)
+                self._thread.start()
+
+    def enqueue(self, record: News):
+        self._ensure_started()
+        self.stats["queued"] += 1
+        self._queue.put(record)
+
+    def _insert(self, records: list) -> Exception:
+        # Inserts `records` in one transaction; returns the error if it failed
+        db = SessionLocal()
+        try:
+            db.add_all(records)
+            db.commit()
+            return None
+        except Exception as e:
+            db.rollback()
+            return e
+        finally:
+            db.close()
+
+    def _flush(self, batch: list):
+        error = self._insert(batch)
+        for attempt in range(NEWS_WRITE_RETRIES):
+            if error is None:
+                break
+            self.stats["retries"] += 1
+            logger.warning(f"Bulk insert of {len(batch)} News rows failed, retrying: {error}")
+            time.sleep(NEWS_WRITE_RETRY_MS / 1000.0 * 2 ** attempt)
+            error = self._insert(batch)
+        if error is None:
+            self.stats["written"] += len(batch)
+            self.stats["flushes"] += 1
+            return
+
+        logger.warning(f"Bulk insert of {len(batch)} News rows failed, inserting them one by one: {error}")
+        for record in batch:
+            error = self._insert([record])
+            if error is None:
+                self.stats["written"] += 1
+            else:
+                self.stats["failed"] += 1
+                logger.error(f"Could not write News row {record.id} ({record.title!r}): {error}")
+        self.stats["flushes"] += 1
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            record = self._queue.get()
+            if record is None:
+                break
+            batch = [record]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    record = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if record is None:
+                    stopping = True
+                    break
+                batch.append(record)
+            self._flush(batch)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def shutdown(self, timeout: float = 30.0):
+        """
+        Writes every queued row, then stops the writer thread.
+        """
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+
+
+# Shared writer; created on first use when write-behind is enabled
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_writer() -> WriteBehindWriter:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = WriteBehindWriter()
+        return _writer
+
+def save(record: News, db: Session = None) -> int:
+    """
+    Stores a News row and returns its id, which is allocated up front so it is stable even
+    before the row is written.
+
+    With NEWS_WRITE_BEHIND the row is queued for the next bulk insert; otherwise it is
+    committed right away through `db` (or a new session).
+
+    Returns:
+        int: The id of the row.
+    """
+    record.id = allocate_id()
+    if NEWS_WRITE_BEHIND:
+        get_writer().enqueue(record)
+        return record.id
+    return save_many([record], db)[0]
+
+@instrumentation.timed("news_writer.save_many")
+def save_many(records: list, db: Session = None) -> list:
+    """
+    Stores several News rows in one transaction (or queues them, with NEWS_WRITE_BEHIND).
+
+    Returns:
+        list: The ids of the rows, in order.
+    """
+    for record in records:
+        if record.id is None:
+            record.id = allocate_id()
+    if NEWS_WRITE_BEHIND:
+        writer = get_writer()
+        for record in records:
+            writer.enqueue(record)
+        return [record.id for record in records]
+    ids = [record.id for record in records]
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        db.add_all(records)
+        db.commit()
+        return ids
+    finally:
+        if own_session:
+            db.close()
+
+def shutdown():
+    """
+    Drains the write-behind queue at shutdown.
+    """
+    if _writer is not None:
+        _writer.shutdown()
+
+def get_stats() -> dict:
+    """
+    Returns the write-behind counters.
+    """
+    stats = {"write_behind": NEWS_WRITE_BEHIND}
+    if _writer is not None:
+        stats.update(_writer.stats, pending=_writer.pending())
+    return stats
@@ -1,54 +1,289 @@
-import torch
-from transformers import pipeline
-
-# Determine the device: use GPU if available, otherwise CPU
-device = 0 if torch.cuda.is_available() else -1
-
-# Initialize a zero-shot classification pipeline using a state-of-the-art model.
-# This model is used to classify the text into candidate labels "fake" and "real".
-classifier = pipeline(
-    "zero-shot-classification",
-    model="facebook/bart-large-mnli",
-    device=device
+import math
+import queue
+import asyncio
+from app.config import (
+    NLP_BATCHING_ENABLED, NLP_BATCH_MAX_SIZE, NLP_BATCH_MAX_WAIT_MS, NLP_BATCH_MAX_QUEUE, SIMILARITY_ENABLED,
+    NLP_CHUNKING_ENABLED, NLP_CHUNK_TOKENS, NLP_CHUNK_OVERLAP, NLP_MAX_CHUNKS, NLP_CHUNK_AGGREGATION,
+    NLP_MAX_INFERENCE_BATCH, NLP_CASCADE_ENABLED, NLP_CASCADE_LOW, NLP_CASCADE_HIGH
 )
+from app.services import executor, cascade, instrumentation
+from app.services.batching import MicroBatcher
+from app.services.model_registry import get_model, get_active_model_name
+from app.services.similarity_index import find_similar_headlines
+
+# Candidate labels used for zero-shot classification
+CANDIDATE_LABELS = ["fake", "real"]
+
+# Chunk aggregation strategies
+AGGREGATION_STRATEGIES = ["mean", "min", "attention"]
+
+# Softmax temperature of the "attention" aggregation: the lower, the closer it gets to "min"
+ATTENTION_TEMPERATURE = 0.1
+
+# Micro-batcher shared by all concurrent callers; created on first use
+_batcher = None
+
+def split_into_chunks(text: str, tokenizer, max_tokens: int = NLP_CHUNK_TOKENS, overlap: int = NLP_CHUNK_OVERLAP,
+                      max_chunks: int = NLP_MAX_CHUNKS) -> list:
+    """
+    Splits a text into overlapping windows of at most `max_tokens` tokens.
+
+    The text is tokenized once; with a fast tokenizer, windows are cut from the original text
+    at the token character offsets, otherwise the window tokens are decoded back to text.
+
+    Parameters:
+        text (str): The text to split.
+        tokenizer: The model's tokenizer.
+        max_tokens (int): Tokens per window.
+        overlap (int): Tokens shared by consecutive windows.
+        max_chunks (int): Maximum number of windows; the rest of the text is dropped.
+
+    Returns:
+        list: The window texts; a single element (the text itself) when it fits in one window.
+    """
+    try:
+        encoded = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        offsets = encoded["offset_mapping"]
+    except (NotImplementedError, KeyError, TypeError):
+        encoded = tokenizer(text, add_special_tokens=False)
+        offsets = None
+    token_ids = encoded["input_ids"]
+    if len(token_ids) <= max_tokens:
+        return [text]
+
+    step = max(max_tokens - overlap, 1)
+    chunks = []
+    for start in range(0, len(token_ids), step):
+        end = min(start + max_tokens, len(token_ids))
+        if offsets is not None:
+            chunks.append(text[offsets[start][0]:offsets[end - 1][1]])
+        else:
+            chunks.append(tokenizer.decode(token_ids[start:end]))
+        if end == len(token_ids) or len(chunks) >= max_chunks:
+            break
+    return chunks
+
+def aggregate_scores(scores: list, strategy: str = NLP_CHUNK_AGGREGATION) -> float:
+    """
+    Combines per-chunk veracity scores into one score.
+
+    Parameters:
+        scores (list): The per-chunk scores.
+        strategy (str): "mean", "min" (the least credible chunk decides) or "attention"
+            (a softmax weighting that gives most of the weight to the least credible chunks).
+
+    Returns:
+        float: The aggregated score.
+    """
+    if strategy == "min":
+        return min(scores)
+    if strategy == "attention":
+        weights = [math.exp(-score / ATTENTION_TEMPERATURE) for score in scores]
+        return sum(w * score for w, score in zip(weights, scores)) / sum(weights)
+    if strategy != "mean":
+        raise ValueError(f"Unknown chunk aggregation strategy '{strategy}'.")
+    return sum(scores) / len(scores)
+
+def _real_score(result: dict) -> float:
+    # Extract the confidence score for the "real" label
+    try:
+        return result["scores"][result["labels"].index("real")]
+    except ValueError:
+        return 0.0
+
+def _similarity_section(similar_headlines: list) -> str:
+    # Semantic similarity against trusted news headlines, to check if similar news was published
+    if not SIMILARITY_ENABLED:
+        return "\nNote: Semantic similarity analysis against trusted sources is disabled."
+    if similar_headlines:
+        section = "\nMost similar trusted headlines:\n"
+        for match in similar_headlines:
+            section += f"  {match['similarity']:.2f} - {match['source']}: {match['headline']}\n"
+        return section
+    return "\nNo similar headlines found among indexed trusted sources."
+
+def _build_report(results: list, similar_headlines: list, cascade_score: float = None) -> tuple:
+    """
+    Turns the zero-shot classification results of a text's chunks and the nearest trusted
+    headlines into a veracity score and a detailed report.
+    """
+    chunk_scores = [_real_score(result) for result in results]
+    veracity_score = aggregate_scores(chunk_scores, NLP_CHUNK_AGGREGATION) if len(results) > 1 else chunk_scores[0]
+
+    # Build a detailed report based on the model's output
+    report = "Advanced NLP Analysis Report:\n"
+    report += f"Text analyzed using zero-shot classification with candidate labels: {', '.join(CANDIDATE_LABELS)}.\n"
+    if len(results) == 1:
+        for label, score_value in zip(results[0]["labels"], results[0]["scores"]):
+            report += f"Label '{label}': confidence {score_value:.2f}\n"
+        report += f"\nDetermined veracity score (for 'real'): {veracity_score:.2f}\n"
+    else:
+        report += f"Text split into {len(results)} overlapping chunks of up to {NLP_CHUNK_TOKENS} tokens.\n"
+        for index, score_value in enumerate(chunk_scores, start=1):
+            report += f"Chunk {index}: confidence for 'real' {score_value:.2f}\n"
+        report += f"\nDetermined veracity score (for 'real', {NLP_CHUNK_AGGREGATION} over chunks): {veracity_score:.2f}\n"
+    if cascade_score is not None:
+        report += (f"Decided by: zero-shot classifier (first-pass score {cascade_score:.2f} inside the "
+                   f"uncertainty band [{NLP_CASCADE_LOW:.2f}, {NLP_CASCADE_HIGH:.2f}])\n")
+
+    report += _similarity_section(similar_headlines)
+    return veracity_score, report
+
+def _build_cascade_report(cascade_score: float, similar_headlines: list) -> tuple:
+    """
+    Builds the veracity score and report of a text decided by the first-pass cascade model.
+    """
+    report = "Advanced NLP Analysis Report:\n"
+    report += "Text scored by the first-pass classifier (hashed n-gram linear model).\n"
+    report += f"\nDetermined veracity score (for 'real'): {cascade_score:.2f}\n"
+    report += (f"Decided by: first-pass classifier (score outside the uncertainty band "
+               f"[{NLP_CASCADE_LOW:.2f}, {NLP_CASCADE_HIGH:.2f}])\n")
+    report += _similarity_section(similar_headlines)
+    return cascade_score, report
+
+def analyze_texts(texts: list, model_name: str = None) -> list:
+    """
+    Analyzes several texts with a single batched zero-shot classification pass.
+
+    With the cascade enabled, texts are first scored by the cheap first-pass model, and only
+    those whose score falls inside the uncertainty band go through the zero-shot classifier.
+
+    With chunking enabled, texts longer than the model's window are split into overlapping
+    chunks so that no part of them is truncated away; the chunks of all texts are classified
+    together, and each text's chunk scores are aggregated into its veracity score. Every
+    (chunk, label) pair is one forward pass of the model, so the pipeline batch size is set
+    to cover all of them at once.
+
+    Parameters:
+        texts (list): The texts to be analyzed.
+        model_name (str): The model to use; defaults to the active model of this process.
+
+    Returns:
+        list: One (veracity_score, report) tuple per text, in input order.
+    """
+    if not texts:
+        return []
+    # With the cascade, texts the cheap first-pass model is confident about are decided without the classifier
+    cascade_scores = [None] * len(texts)
+    escalate = [True] * len(texts)
+    cascade_model = cascade.get_model() if NLP_CASCADE_ENABLED else None
+    if cascade_model is not None:
+        cascade_scores = cascade_model.score(texts)
+        escalate = cascade.route(cascade_scores, NLP_CASCADE_LOW, NLP_CASCADE_HIGH)
+        cascade.count(escalate.count(False), escalate.count(True))
+    escalated = [text for text, needed in zip(texts, escalate) if needed]
+
+    chunks_per_text = []
+    results = []
+    if escalated:
+        # The zero-shot classification pipeline of the configured model (loaded on first use).
+        # It classifies each text into the candidate labels "fake" and "real".
+        classifier = get_model(model_name)
+        if NLP_CHUNKING_ENABLED:
+            chunks_per_text = [
+                split_into_chunks(text, classifier.tokenizer, NLP_CHUNK_TOKENS, NLP_CHUNK_OVERLAP, NLP_MAX_CHUNKS)
+                for text in escalated
+            ]
+        else:
+            chunks_per_text = [[text] for text in escalated]
+        chunks = [chunk for text_chunks in chunks_per_text for chunk in text_chunks]
+        batch_size = min(len(chunks) * len(CANDIDATE_LABELS), NLP_MAX_INFERENCE_BATCH)
+        results = classifier(chunks, CANDIDATE_LABELS, batch_size=batch_size)
+        # The pipeline returns a bare dict instead of a list for a single input
+        if isinstance(results, dict):
+            results = [results]
+    similar = find_similar_headlines(list(texts))
+
+    reports = []
+    position = 0
+    escalated_chunks = iter(chunks_per_text)
+    for needed, cascade_score, matches in zip(escalate, cascade_scores, similar):
+        if not needed:
+            reports.append(_build_cascade_report(cascade_score, matches))
+            continue
+        text_chunks = next(escalated_chunks)
+        reports.append(_build_report(results[position:position + len(text_chunks)], matches, cascade_score))
+        position += len(text_chunks)
+    return reports
+
+def _run_batch(texts: list) -> list:
+    """
+    Runs one batch of texts, in a pool worker process when the CPU pool uses processes.
+
+    The active model name is passed along so that workers follow runtime model swaps.
+    """
+    if executor.uses_processes():
+        return executor.submit(analyze_texts, list(texts), get_active_model_name()).result()
+    return analyze_texts(texts)
+
+def get_batcher() -> MicroBatcher:
+    """
+    Returns the shared micro-batcher placed in front of the classifier, creating it on first use.
+    """
+    global _batcher
+    if _batcher is None:
+        _batcher = MicroBatcher(
+            _run_batch,
+            max_batch_size=NLP_BATCH_MAX_SIZE,
+            max_wait_ms=NLP_BATCH_MAX_WAIT_MS,
+            max_queue=NLP_BATCH_MAX_QUEUE,
+            name="nlp-batcher"
+        )
+    return _batcher
+
+def get_batching_stats() -> dict:
+    """
+    Returns the micro-batcher's batch-size and queue-wait counters.
+    """
+    stats = get_batcher().stats() if _batcher is not None else {}
+    stats = {"enabled": NLP_BATCHING_ENABLED, **stats}
+    if NLP_CASCADE_ENABLED:
+        stats["cascade"] = cascade.get_stats()
+    return stats
 
 def analyze_text(text: str) -> tuple:
     """
     Performs advanced analysis of the input text to determine its veracity.
-    
+
     The function follows a two-step process:
     1. Uses zero-shot classification to evaluate the text against the candidate labels "fake" and "real".
-    2. (Placeholder) Indicates where semantic similarity analysis against trusted news headlines could be added 
-       to check for previous publication and timeline consistency.
-    
+    2. If enabled, looks up the most similar headlines from trusted sources in the similarity index
+       to check for previous publication.
+
+    When batching is enabled, the text is queued on the shared micro-batcher so that it is
+    classified together with texts submitted concurrently by other callers.
+
     Parameters:
         text (str): The text of the news article to be analyzed.
-    
+
     Returns:
         tuple: A tuple containing:
             - veracity_score (float): Confidence score for the text being real.
             - report (str): A detailed analysis report.
     """
-    candidate_labels = ["fake", "real"]
-    result = classifier(text, candidate_labels)
-    
-    # Extract the confidence score for the "real" label
+    if NLP_BATCHING_ENABLED:
+        return _submit(text).result()
+    return _run_batch([text])[0]
+
+def _submit(text: str):
     try:
-        real_index = result["labels"].index("real")
-        veracity_score = result["scores"][real_index]
-    except ValueError:
-        veracity_score = 0.0
+        return get_batcher().submit(text)
+    except queue.Full:
+        raise executor.PoolSaturatedError("NLP batch queue is full.")
 
-    # Build a detailed report based on the model's output
-    report = "Advanced NLP Analysis Report:\n"
-    report += f"Text analyzed using zero-shot classification with candidate labels: {', '.join(candidate_labels)}.\n"
-    for label, score_value in zip(result["labels"], result["scores"]):
-        report += f"Label '{label}': confidence {score_value:.2f}\n"
-    report += f"\nDetermined veracity score (for 'real'): {veracity_score:.2f}\n"
-    
-    # Placeholder for extended semantic similarity analysis:
-    # Here you could scrape trusted news headlines and compare semantic similarity
-    # to check if similar news exists, along with timeline details.
-    report += "\nNote: Extended semantic similarity analysis against trusted sources is not yet implemented."
-    
-    return veracity_score, report
+@instrumentation.timed("nlp_service.analyze_text")
+async def analyze_text_async(text: str) -> tuple:
+    """
+    Awaitable variant of `analyze_text` for request handlers.
+
+    The handler yields to the event loop while its text waits in the batch queue, which lets
+    texts from concurrent requests be collected into the same batch. Inference never runs on
+    the event loop: it runs on the batcher thread, or in the CPU pool when batching is disabled.
+
+    Raises:
+        PoolSaturatedError: If the batch queue or the CPU pool is full.
+    """
+    if NLP_BATCHING_ENABLED:
+        return await asyncio.wrap_future(_submit(text))
+    results = await executor.run_cpu_bound(analyze_texts, [text], get_active_model_name())
+    return results[0]
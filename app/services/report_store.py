@@ -0,0 +1,91 @@
+import ast
+import json
+import zlib
+from app.config import REPORT_COMPRESSION, REPORT_COMPRESS_MIN_BYTES
+
+# Version of the stored report format, recorded in every summary as "v"
+REPORT_FORMAT_VERSION = 1
+
+# zstd is used when requested and the zstandard package is installed; zlib otherwise
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+def summarize(final_report: dict) -> dict:
+    """
+    Extracts the compact summary stored with a verdict: scores, statuses and the conclusion,
+    without the analysis texts, headlines and social media posts.
+    """
+    primary = final_report.get("primary_analysis") or {}
+    return {
+        "v": REPORT_FORMAT_VERSION,
+        "input_type": final_report.get("input_type"),
+        "final_veracity_score": final_report.get("final_veracity_score"),
+        "conclusion": final_report.get("conclusion"),
+        "primary_score": primary.get("veracity_score"),
+        "social_scores": {
+            platform: {"score": result.get("score"), "status": result.get("status")}
+            for platform, result in (final_report.get("social_media_analysis") or {}).items()
+        },
+        "excluded_platforms": final_report.get("excluded_platforms", []),
+        "skipped": final_report.get("skipped", []),
+    }
+
+def encode_summary(final_report: dict) -> str:
+    """
+    Returns the summary of a report as the JSON stored in news.analysis_report.
+    """
+    return json.dumps(summarize(final_report), separators=(",", ":"), default=str)
+
+def decode_summary(stored: str) -> dict:
+    """
+    Parses a stored summary. Reports stored before the structured format (a Python repr of the
+    whole report) are parsed as literals, never evaluated, and summarized.
+    """
+    if not stored:
+        return None
+    if stored.startswith('{"v":'):
+        return json.loads(stored)
+    report = legacy_report(stored)
+    return summarize(report) if report is not None else {"v": 0, "unparsed": stored}
+
+def legacy_report(stored: str) -> dict:
+    """
+    Returns the full report of a row stored before the structured format, or None.
+    """
+    if not stored or stored.startswith('{"v":'):
+        return None
+    try:
+        report = ast.literal_eval(stored)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return None
+    return report if isinstance(report, dict) else None
+
+def encode_details(final_report: dict) -> tuple:
+    """
+    Serializes the full report for the side table, compressed when larger than REPORT_COMPRESS_MIN_BYTES.
+
+    Returns:
+        tuple: (codec name, payload bytes)
+    """
+    payload = json.dumps(final_report, separators=(",", ":"), default=str).encode("utf-8")
+    if REPORT_COMPRESSION == "none" or len(payload) < REPORT_COMPRESS_MIN_BYTES:
+        return "json", payload
+    if REPORT_COMPRESSION == "zstd" and zstandard is not None:
+        return "json+zstd", zstandard.ZstdCompressor(level=10).compress(payload)
+    return "json+zlib", zlib.compress(payload, 6)
+
+def decode_details(codec: str, payload: bytes) -> dict:
+    """
+    Restores a full report written by `encode_details`.
+    """
+    if codec == "json+zlib":
+        payload = zlib.decompress(payload)
+    elif codec == "json+zstd":
+        if zstandard is None:
+            raise RuntimeError("The zstandard package is required to read this report.")
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    elif codec != "json":
+        raise ValueError(f"Unknown report codec '{codec}'.")
+    return json.loads(payload)
@@ -0,0 +1,90 @@
+import time
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Runs a coroutine function on the event loop every `interval` seconds, in the background.
+
+    A failing run is logged and counted; the next run happens on schedule.
+
+    Parameters:
+        name (str): Name used in logs and statistics.
+        interval (float): Seconds between the start of two runs.
+        job (callable): Coroutine function taking no arguments.
+        initial_delay (float): Seconds to wait before the first run.
+    """
+
+    def __init__(self, name: str, interval: float, job, initial_delay: float = 0.0):
+        self.name = name
+        self.interval = interval
+        self.job = job
+        self.initial_delay = initial_delay
+        self._task = None
+        self.stats = {"runs": 0, "failures": 0, "last_run": None, "last_duration_s": None, "last_error": None}
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name=f"periodic:{self.name}")
+
+    async def _run(self):
+        await asyncio.sleep(self.initial_delay)
+        while True:
+            started = time.monotonic()
+            try:
+                await self.job()
+                self.stats["last_error"] = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["failures"] += 1
+                self.stats["last_error"] = str(e)
+                logger.error(f"Scheduled job '{self.name}' failed: {e}")
+            duration = time.monotonic() - started
+            self.stats["runs"] += 1
+            self.stats["last_run"] = time.time()
+            self.stats["last_duration_s"] = duration
+            await asyncio.sleep(max(0.0, self.interval - duration))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Tasks registered with the scheduler, by name
+_tasks = {}
+
+def add_task(name: str, interval: float, job, initial_delay: float = 0.0) -> PeriodicTask:
+    """
+    Registers a periodic job; it starts with `start()`.
+    """
+    _tasks[name] = PeriodicTask(name, interval, job, initial_delay)
+    return _tasks[name]
+
+def start():
+    """
+    Starts all registered jobs on the running event loop.
+    """
+    for task in _tasks.values():
+        task.start()
+
+async def stop():
+    """
+    Cancels all running jobs.
+    """
+    for task in _tasks.values():
+        await task.stop()
+
+def get_stats() -> dict:
+    """
+    Returns run counters of the registered jobs.
+    """
+    return {name: {"interval_s": task.interval, **task.stats} for name, task in _tasks.items()}
@@ -1,93 +1,306 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
 import logging
-from app.config import TRUSTED_SOURCES
+import threading
+from urllib.parse import quote_plus, urlsplit
+
+import httpx
+from bs4 import BeautifulSoup
+from app.config import (
+    TRUSTED_SOURCES, SCRAPER_MAX_CONNECTIONS, SCRAPER_MAX_PER_HOST,
+    SCRAPER_TIMEOUT, SCRAPER_MAX_BODY_BYTES, SCRAPER_VALIDATOR_CACHE_SIZE
+)
+from app.utils.lru_cache import LRUCache
+from app.services import headline_store, instrumentation
 
 # Set up logging configuration
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Source recorded for headlines found through Google News searches
+GOOGLE_NEWS_SOURCE = "https://news.google.com"
+
+# Browser-like User-Agent sent with every request
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 ' \
+             '(KHTML, like Gecko) Chrome/89.0.4389.82 Safari/537.36'
+
+def _parse_headlines(html: str) -> list:
+    """
+    Extracts text from header tags (h1, h2, h3) as potential news headlines.
+    """
+    headlines = []
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup.find_all(['h1', 'h2', 'h3']):
+        text = tag.get_text(strip=True)
+        if text:
+            headlines.append(text)
+    return headlines
+
+def _parse_google_news(html: str) -> list:
+    """
+    Extracts headlines from the anchor tags of a Google News results page.
+    """
+    headlines = []
+    soup = BeautifulSoup(html, 'html.parser')
+    # Extract headlines from anchor tags. This may need to be adjusted based on the current HTML structure.
+    for a in soup.find_all('a'):
+        text = a.get_text(strip=True)
+        if text and len(text) > 10:  # Simple filter to avoid very short texts
+            headlines.append(text)
+    return headlines
+
+
+class AsyncScraper:
+    """
+    Asynchronous scraping engine sharing one pooled HTTP client between all scrapes.
+
+    - Connections are reused through a connection pool of at most `max_connections`, with at
+      most `max_per_host` concurrent requests to the same host.
+    - Pages are revalidated with ETag / Last-Modified conditional requests; a 304 response
+      returns the headlines parsed from the previous response without re-downloading the page.
+    - Bodies are streamed and truncated at `max_body_bytes`.
+
+    Parameters:
+        max_connections (int): Size of the shared connection pool.
+        max_per_host (int): Maximum concurrent requests per host.
+        timeout (float): Request timeout in seconds.
+        max_body_bytes (int): Maximum number of body bytes read per page.
+        validator_cache_size (int): Number of pages whose validators and headlines are kept.
+    """
+
+    def __init__(self, max_connections: int = SCRAPER_MAX_CONNECTIONS, max_per_host: int = SCRAPER_MAX_PER_HOST,
+                 timeout: float = SCRAPER_TIMEOUT, max_body_bytes: int = SCRAPER_MAX_BODY_BYTES,
+                 validator_cache_size: int = SCRAPER_VALIDATOR_CACHE_SIZE):
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.max_body_bytes = max_body_bytes
+        self._client = None
+        self._host_semaphores = {}
+        # url -> {"etag", "last_modified", "headlines"} of the last successful response
+        self._validators = LRUCache(validator_cache_size)
+        self.stats = {"requests": 0, "not_modified": 0, "truncated": 0, "errors": 0}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers={'User-Agent': USER_AGENT},
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._client
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        return self._host_semaphores[host]
+
+    async def _fetch(self, url: str, parse) -> list:
+        """
+        Fetches a page (conditionally, if it was fetched before) and returns the parsed headlines.
+        Raises httpx.HTTPError on network or HTTP errors.
+        """
+        cached = self._validators.get(url)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        async with self._host_semaphore(url):
+            self.stats["requests"] += 1
+            async with self._get_client().stream("GET", url, headers=headers) as response:
+                if response.status_code == 304 and cached:
+                    self.stats["not_modified"] += 1
+                    return list(cached["headlines"])
+                response.raise_for_status()
+
+                # Stream the body, stopping at the size cap
+                chunks = []
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= self.max_body_bytes:
+                        self.stats["truncated"] += 1
+                        logger.info(f"Body of {url} truncated at {self.max_body_bytes} bytes")
+                        break
+                body = b"".join(chunks)[:self.max_body_bytes]
+                text = body.decode(response.encoding or "utf-8", errors="replace")
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+
+        headlines = parse(text)
+        if etag or last_modified:
+            self._validators.put(url, {"etag": etag, "last_modified": last_modified, "headlines": headlines})
+        return headlines
+
+    async def scrape_headlines(self, url: str) -> list:
+        """
+        Scrapes headlines from the given news website URL; returns an empty list on errors.
+        """
+        try:
+            return await self._fetch(url, _parse_headlines)
+        except httpx.HTTPError as e:
+            self.stats["errors"] += 1
+            logger.error(f"Error fetching URL {url}: {e}")
+            return []
+
+    async def update_trusted_sources(self, sources: list = None) -> dict:
+        """
+        Scrapes all trusted sources concurrently, so a full refresh takes about as long as the slowest source.
+        """
+        sources = sources if sources is not None else TRUSTED_SOURCES
+        for source in sources:
+            logger.info(f"Scraping headlines from {source}")
+        results = await asyncio.gather(*(self.scrape_headlines(source) for source in sources))
+        sources_data = {}
+        for source, headlines in zip(sources, results):
+            sources_data[source] = headlines
+            logger.info(f"Found {len(headlines)} headlines from {source}")
+        return sources_data
+
+    async def search_google_news(self, keyword: str) -> list:
+        """
+        Searches Google News for the given keyword; returns an empty list on errors.
+        """
+        url = f"https://news.google.com/search?q={quote_plus(keyword)}"
+        try:
+            return await self._fetch(url, _parse_google_news)
+        except httpx.HTTPError as e:
+            self.stats["errors"] += 1
+            logger.error(f"Error fetching Google News for keyword '{keyword}': {e}")
+            return []
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# The shared scraper runs on its own event loop thread, so that its connection pool is shared by
+# request handlers (whatever loop they run on) and by synchronous callers.
+_scraper = None
+_loop = None
+_loop_thread = None
+_loop_lock = threading.Lock()
+
+def get_scraper() -> AsyncScraper:
+    """
+    Returns the shared scraper, starting its event loop thread on first use.
+    """
+    global _scraper, _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="scraper-loop", daemon=True)
+            _loop_thread.start()
+            _scraper = AsyncScraper()
+        return _scraper
+
+def _submit(coroutine_function, *args):
+    scraper = get_scraper()
+    return asyncio.run_coroutine_threadsafe(coroutine_function(scraper, *args), _loop)
+
+def get_stats() -> dict:
+    """
+    Returns the shared scraper's request counters.
+    """
+    return dict(_scraper.stats) if _scraper is not None else {}
+
+def shutdown():
+    """
+    Closes the shared HTTP client and stops the scraper's event loop thread.
+    """
+    global _scraper, _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(_scraper.aclose(), _loop).result(timeout=5)
+        _loop.call_soon_threadsafe(_loop.stop)
+        _loop_thread.join(timeout=5)
+        _loop.close()
+        _scraper, _loop, _loop_thread = None, None, None
+
+@instrumentation.timed("scraper.scrape_headlines")
+async def scrape_headlines_async(url: str) -> list:
+    """
+    Awaitable variant of `scrape_headlines` for request handlers.
+    """
+    return await asyncio.wrap_future(_submit(AsyncScraper.scrape_headlines, url))
+
+async def update_trusted_sources_async() -> dict:
+    """
+    Awaitable variant of `update_trusted_sources`.
+    """
+    return await asyncio.wrap_future(_submit(AsyncScraper.update_trusted_sources))
+
+@instrumentation.timed("scraper.search_google_news")
+async def search_google_news_async(keyword: str) -> list:
+    """
+    Awaitable variant of `search_google_news`.
+    """
+    local = await asyncio.to_thread(_search_local, keyword)
+    if local:
+        return local
+    headlines = await asyncio.wrap_future(_submit(AsyncScraper.search_google_news, keyword))
+    await asyncio.to_thread(headline_store.store_headlines, headlines, GOOGLE_NEWS_SOURCE)
+    return headlines
+
+def _search_local(keyword: str) -> list:
+    return [match["headline"] for match in headline_store.search(keyword, limit=50)]
+
 def scrape_headlines(url: str) -> list:
     """
     Scrapes headlines from the given news website URL.
-    
+
     This function uses BeautifulSoup to extract text from header tags (h1, h2, h3)
-    to gather potential news headlines.
-    
+    to gather potential news headlines. The page is fetched through the shared pooled
+    scraper, conditionally if it was fetched before.
+
     Parameters:
         url (str): The URL of the news website.
-    
+
     Returns:
         list: A list of headline strings extracted from the page.
     """
-    headlines = []
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 ' \
-                      '(KHTML, like Gecko) Chrome/89.0.4389.82 Safari/537.36'
-    }
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-    except requests.RequestException as e:
-        logger.error(f"Error fetching URL {url}: {e}")
-        return headlines
-
-    soup = BeautifulSoup(response.text, 'html.parser')
-    for tag in soup.find_all(['h1', 'h2', 'h3']):
-        text = tag.get_text(strip=True)
-        if text:
-            headlines.append(text)
-    return headlines
+    return _submit(AsyncScraper.scrape_headlines, url).result()
 
 def update_trusted_sources() -> dict:
     """
     Scrapes headlines from all trusted news sources defined in the configuration.
-    
-    This function iterates through the list of trusted sources (e.g., BBC, CNN, Reuters, etc.),
-    scrapes their headlines, and logs the number of headlines found for each source.
-    
+
+    This function scrapes the trusted sources (e.g., BBC, CNN, Reuters, etc.) concurrently
+    and logs the number of headlines found for each source.
+
     Returns:
         dict: A dictionary where keys are source URLs and values are lists of headlines.
     """
-    sources_data = {}
-    for source in TRUSTED_SOURCES:
-        logger.info(f"Scraping headlines from {source}")
-        headlines = scrape_headlines(source)
-        sources_data[source] = headlines
-        logger.info(f"Found {len(headlines)} headlines from {source}")
-    return sources_data
+    return _submit(AsyncScraper.update_trusted_sources).result()
 
 def search_google_news(keyword: str) -> list:
     """
     Searches Google News for the given keyword and extracts headlines from the search results.
-    
-    This function builds a Google News search URL based on the keyword, fetches the page,
-    and uses BeautifulSoup to extract headlines. Note that the structure of the Google News
-    results page may change over time, so adjustments might be needed.
-    
+
+    Matching headlines already in the local headline store are returned without any network
+    request. Otherwise, this function builds a Google News search URL based on the keyword,
+    fetches the page, uses BeautifulSoup to extract headlines and stores them locally. Note that
+    the structure of the Google News results page may change over time, so adjustments might be needed.
+
     Parameters:
         keyword (str): The search keyword to look for in Google News.
-    
+
     Returns:
-        list: A list of headlines retrieved from the Google News search results.
+        list: A list of headlines retrieved from the local store or the Google News search results.
     """
-    headlines = []
-    url = f"https://news.google.com/search?q={keyword}"
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 ' \
-                      '(KHTML, like Gecko) Chrome/89.0.4389.82 Safari/537.36'
-    }
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-    except requests.RequestException as e:
-        logger.error(f"Error fetching Google News for keyword '{keyword}': {e}")
-        return headlines
-    
-    soup = BeautifulSoup(response.text, 'html.parser')
-    # Extract headlines from anchor tags. This may need to be adjusted based on the current HTML structure.
-    for a in soup.find_all('a'):
-        text = a.get_text(strip=True)
-        if text and len(text) > 10:  # Simple filter to avoid very short texts
-            headlines.append(text)
+    local = _search_local(keyword)
+    if local:
+        return local
+    headlines = _submit(AsyncScraper.search_google_news, keyword).result()
+    headline_store.store_headlines(headlines, GOOGLE_NEWS_SOURCE)
     return headlines
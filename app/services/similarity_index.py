@@ -0,0 +1,294 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+import numpy as np
+
+from app.config import (
+    SIMILARITY_ENABLED, SIMILARITY_INDEX_DIR, SIMILARITY_MODEL_NAME,
+    SIMILARITY_TOP_K, SIMILARITY_MAX_AGE_DAYS
+)
+from app.services import model_registry
+
+logger = logging.getLogger(__name__)
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    Scales each row to unit length, so that dot products are cosine similarities.
+    """
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+def embed_texts(texts: list, batch_size: int = 64) -> np.ndarray:
+    """
+    Embeds texts with the configured sentence-embedding model (mean pooling over tokens).
+
+    Parameters:
+        texts (list): The texts to embed.
+        batch_size (int): Number of texts per forward pass.
+
+    Returns:
+        np.ndarray: A (len(texts), dim) float32 matrix of unit-length embeddings.
+    """
+    import torch
+
+    extractor = model_registry.get_model(SIMILARITY_MODEL_NAME, task="feature-extraction")
+    tokenizer, model = extractor.tokenizer, extractor.model
+    vectors = []
+    with torch.inference_mode():
+        for start in range(0, len(texts), batch_size):
+            encoded = tokenizer(
+                list(texts[start:start + batch_size]), padding=True, truncation=True, return_tensors="pt"
+            ).to(model.device)
+            hidden = model(**encoded).last_hidden_state
+            mask = encoded["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            vectors.append(pooled.float().cpu().numpy())
+    return _normalize_rows(np.concatenate(vectors, axis=0))
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(" ".join(text.lower().split()).encode("utf-8")).hexdigest()
+
+
+class SimilarityIndex:
+    """
+    Cosine-similarity index over trusted-source headlines.
+
+    Headline embeddings are stored once, in a contiguous float32 matrix memory-mapped from
+    `<directory>/vectors.npy`; the headline texts, sources and timestamps are kept in
+    `<directory>/meta.json`. Lookups only embed the query texts: they are scored against the
+    whole matrix with one matrix product and the top-k rows are selected per query.
+
+    Parameters:
+        directory (str): Directory holding the index files.
+        embed (callable): Function mapping a list of texts to a (n, dim) float32 matrix of unit vectors.
+    """
+
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, directory: str, embed=embed_texts):
+        self.directory = directory
+        self.embed = embed
+        self._lock = threading.RLock()
+        self._vectors = None
+        self._entries = []
+        self._positions = {}
+        self._meta_mtime = None
+        self._load()
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.directory, "vectors.npy")
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.directory, "meta.json")
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _load(self):
+        """
+        Opens the index files if they exist (the matrix is memory-mapped, not read).
+        """
+        if not os.path.exists(self._meta_path) or not os.path.exists(self._vectors_path):
+            return
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self._entries = meta["entries"]
+        self._positions = {entry["hash"]: i for i, entry in enumerate(self._entries)}
+        self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+        self._meta_mtime = os.path.getmtime(self._meta_path)
+
+    def _reload_if_changed(self):
+        """
+        Picks up changes written by another process (e.g. the refresh job) since the last load.
+        """
+        if os.path.exists(self._meta_path) and os.path.getmtime(self._meta_path) != self._meta_mtime:
+            self._load()
+
+    def _save(self):
+        if self._vectors is not None:
+            self._vectors.flush()
+        tmp_path = self._meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"count": len(self._entries), "entries": self._entries}, f)
+        os.replace(tmp_path, self._meta_path)
+        self._meta_mtime = os.path.getmtime(self._meta_path)
+
+    def _replace_vectors(self, capacity: int, dim: int, rows):
+        """
+        Writes a new matrix of `capacity` rows holding the current rows selected by `rows` (a slice
+        or an index array) to a temporary file, then swaps it in with `os.replace`. Readers that
+        mapped the old file keep a consistent view of it, and a crash never leaves a half-written matrix.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self._vectors_path + ".tmp"
+        replacement = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(capacity, dim))
+        if self._vectors is not None:
+            selected = self._vectors[rows]
+            replacement[:len(selected)] = selected
+        replacement.flush()
+        del replacement
+        self._vectors = None
+        os.replace(tmp_path, self._vectors_path)
+        self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+
+    def _ensure_capacity(self, rows: int, dim: int):
+        """
+        Grows the memory-mapped matrix (doubling its capacity) so that it can hold `rows` rows.
+        """
+        if self._vectors is not None and self._vectors.shape[0] >= rows:
+            return
+        capacity = max(self.INITIAL_CAPACITY, 2 * (self._vectors.shape[0] if self._vectors is not None else 0), rows)
+        self._replace_vectors(capacity, dim, slice(0, len(self._entries)))
+
+    def add(self, headlines: list, source: str) -> int:
+        """
+        Adds new headlines to the index; headlines already indexed only get their last-seen time refreshed.
+
+        Parameters:
+            headlines (list): Headline texts.
+            source (str): The trusted source they come from.
+
+        Returns:
+            int: The number of newly indexed headlines.
+        """
+        now = time.time()
+        with self._lock:
+            self._reload_if_changed()
+            new_texts = []
+            seen = set()
+            for headline in headlines:
+                key = _text_hash(headline)
+                if key in self._positions:
+                    self._entries[self._positions[key]]["last_seen"] = now
+                elif key not in seen:
+                    seen.add(key)
+                    new_texts.append((key, headline))
+
+            if new_texts:
+                # Only the new headlines are embedded; the rest of the corpus is never re-embedded
+                vectors = self.embed([text for _, text in new_texts])
+                start = len(self._entries)
+                self._ensure_capacity(start + len(new_texts), vectors.shape[1])
+                self._vectors[start:start + len(new_texts)] = vectors
+                for offset, (key, text) in enumerate(new_texts):
+                    self._positions[key] = start + offset
+                    self._entries.append({
+                        "hash": key, "text": text, "source": source, "first_seen": now, "last_seen": now
+                    })
+            self._save()
+            return len(new_texts)
+
+    def evict_older_than(self, max_age_seconds: float) -> int:
+        """
+        Removes headlines not seen for more than `max_age_seconds`. The kept rows are compacted into a
+        new matrix file that replaces the old one, so the live matrix is never rewritten in place.
+
+        Returns:
+            int: The number of evicted headlines.
+        """
+        cutoff = time.time() - max_age_seconds
+        with self._lock:
+            self._reload_if_changed()
+            keep = [i for i, entry in enumerate(self._entries) if entry["last_seen"] >= cutoff]
+            evicted = len(self._entries) - len(keep)
+            if evicted == 0:
+                return 0
+            self._replace_vectors(self._vectors.shape[0], self._vectors.shape[1], np.asarray(keep, dtype=np.intp))
+            self._entries = [self._entries[i] for i in keep]
+            self._positions = {entry["hash"]: i for i, entry in enumerate(self._entries)}
+            self._save()
+            return evicted
+
+    def search(self, texts: list, k: int = SIMILARITY_TOP_K) -> list:
+        """
+        Finds the k most similar trusted headlines for each text (batched cosine search).
+
+        Parameters:
+            texts (list): The query texts.
+            k (int): Number of neighbours per text.
+
+        Returns:
+            list: For each text, a list of {"headline", "source", "similarity"} dicts, most similar first.
+        """
+        with self._lock:
+            self._reload_if_changed()
+            count = len(self._entries)
+            if count == 0 or not texts:
+                return [[] for _ in texts]
+            queries = self.embed(list(texts))
+            # (queries x dim) @ (dim x count): one product scores every query against every headline
+            scores = queries @ self._vectors[:count].T
+            k = min(k, count)
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            results = []
+            for row, candidates in enumerate(top):
+                ordered = candidates[np.argsort(-scores[row, candidates])]
+                results.append([
+                    {
+                        "headline": self._entries[i]["text"],
+                        "source": self._entries[i]["source"],
+                        "similarity": float(scores[row, i])
+                    }
+                    for i in ordered
+                ])
+            return results
+
+
+# Shared index; opened on first use
+_index = None
+_index_lock = threading.Lock()
+
+def get_index() -> SimilarityIndex:
+    """
+    Returns the shared similarity index, opening it on first use.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SimilarityIndex(SIMILARITY_INDEX_DIR)
+        return _index
+
+def find_similar_headlines(texts: list, k: int = SIMILARITY_TOP_K) -> list:
+    """
+    Returns the nearest trusted headlines for each text, or empty lists when the index is
+    disabled, empty, or the lookup fails.
+    """
+    if not SIMILARITY_ENABLED:
+        return [[] for _ in texts]
+    try:
+        return get_index().search(texts, k)
+    except Exception as e:
+        logger.error(f"Similarity lookup failed: {e}")
+        return [[] for _ in texts]
+
+def update_index(sources_data: dict) -> int:
+    """
+    Adds freshly scraped headlines to the index and evicts those older than SIMILARITY_MAX_AGE_DAYS.
+
+    Parameters:
+        sources_data (dict): Source URL -> list of headlines, as returned by `scraper.update_trusted_sources`.
+
+    Returns:
+        int: The number of newly indexed headlines.
+    """
+    index = get_index()
+    added = sum(index.add(headlines, source) for source, headlines in sources_data.items() if headlines)
+    evicted = index.evict_older_than(SIMILARITY_MAX_AGE_DAYS * 86400)
+    logger.info(f"Similarity index: {added} headlines added, {evicted} evicted, {len(index)} indexed")
+    return added
+
+def refresh_from_trusted_sources() -> int:
+    """
+    Scrapes the trusted sources and adds their new headlines to the index.
+
+    Returns:
+        int: The number of newly indexed headlines.
+    """
+    from app.services.scraper import update_trusted_sources
+    return update_index(update_trusted_sources())
@@ -1,7 +1,92 @@
 import os
+import time
+import asyncio
+import logging
+import threading
 import tweepy
 import instaloader
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from app.config import (
+    SOCIAL_MAX_WORKERS, SOCIAL_TIMEOUT_TWITTER, SOCIAL_TIMEOUT_FACEBOOK, SOCIAL_TIMEOUT_INSTAGRAM,
+    SOCIAL_CACHE_ENABLED, SOCIAL_CACHE_MAX_ENTRIES, SOCIAL_CACHE_TTL_TWITTER, SOCIAL_CACHE_TTL_FACEBOOK,
+    SOCIAL_CACHE_TTL_INSTAGRAM, SOCIAL_STALE_TTL, SOCIAL_RATE_LIMIT_TWITTER, SOCIAL_RATE_LIMIT_FACEBOOK,
+    SOCIAL_RATE_LIMIT_INSTAGRAM
+)
+from app.utils.lru_cache import LRUCache
+from app.utils.rate_limit import TokenBucket
+from app.services import instrumentation
+
+logger = logging.getLogger(__name__)
+
+# Bounded thread pool running the blocking platform analyzers; created on first use
+_executor = None
+
+
+class InstagramClient:
+    """
+    Thin wrapper around a shared Instaloader session, so the session is created once and
+    tests can substitute a local fake exposing the same `hashtag_posts` method.
+    """
+
+    def __init__(self, loader: instaloader.Instaloader):
+        self.loader = loader
+
+    def hashtag_posts(self, hashtag: str, limit: int, max_seconds: float = None) -> list:
+        """
+        Returns up to `limit` recent posts of a hashtag. Each page of posts is a request to
+        Instagram, so pagination stops after `max_seconds` with the posts fetched so far.
+        """
+        posts = []
+        started = time.monotonic()
+        for post in instaloader.Hashtag.from_name(self.loader.context, hashtag).get_posts():
+            posts.append(post)
+            if len(posts) >= limit or (max_seconds is not None and time.monotonic() - started > max_seconds):
+                break
+        return posts
+
+def _create_twitter_client():
+    # Retrieve Twitter API credentials from environment variables
+    credentials = [os.getenv(name) for name in [
+        "TWITTER_API_KEY", "TWITTER_API_SECRET", "TWITTER_ACCESS_TOKEN", "TWITTER_ACCESS_TOKEN_SECRET"
+    ]]
+    if not all(credentials):
+        return None
+    # Authenticate with Twitter API using OAuth1
+    return tweepy.API(tweepy.OAuth1UserHandler(*credentials))
+
+def _create_facebook_client():
+    # Placeholder: in a real scenario, a facebook-sdk GraphAPI client authenticated with this key
+    return os.getenv("FACEBOOK_API_KEY") or None
+
+def _create_instagram_client():
+    return InstagramClient(instaloader.Instaloader())
+
+# Factories of the authenticated platform clients; each client is created once and shared by all requests.
+# A factory returns None when the platform's credentials are not configured.
+CLIENT_FACTORIES = {
+    "twitter": _create_twitter_client,
+    "facebook": _create_facebook_client,
+    "instagram": _create_instagram_client
+}
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_client(platform: str):
+    """
+    Returns the shared client of a platform, creating it on first use, or None without credentials.
+    """
+    with _clients_lock:
+        if _clients.get(platform) is None:
+            _clients[platform] = CLIENT_FACTORIES[platform]()
+        return _clients[platform]
+
+def reset_clients():
+    """
+    Drops the shared clients, e.g. after rotating credentials; they are re-created on next use.
+    """
+    with _clients_lock:
+        _clients.clear()
 
 def analyze_twitter(keyword: str) -> tuple:
     """
@@ -12,24 +97,16 @@ def analyze_twitter(keyword: str) -> tuple:
     
     Returns:
         tuple: (veracity_score (float), report (str))
+
+    Raises:
+        RuntimeError: If the tweets cannot be fetched or analyzed, so the failure is reported
+            (or served from a stale result) rather than cached and scored as 0.0.
     """
-    # Retrieve Twitter API credentials from environment variables
-    twitter_api_key = os.getenv("TWITTER_API_KEY")
-    twitter_api_secret = os.getenv("TWITTER_API_SECRET")
-    twitter_access_token = os.getenv("TWITTER_ACCESS_TOKEN")
-    twitter_access_token_secret = os.getenv("TWITTER_ACCESS_TOKEN_SECRET")
-    
-    if not all([twitter_api_key, twitter_api_secret, twitter_access_token, twitter_access_token_secret]):
+    api = get_client("twitter")
+    if api is None:
         return 0.0, "Twitter API credentials not provided."
-    
+
     try:
-        # Authenticate with Twitter API using OAuth1
-        auth = tweepy.OAuth1UserHandler(
-            twitter_api_key, twitter_api_secret,
-            twitter_access_token, twitter_access_token_secret
-        )
-        api = tweepy.API(auth)
-        
         # Fetch recent tweets containing the keyword (up to 100 tweets)
         tweets = api.search_tweets(q=keyword, lang="en", count=100, tweet_mode="extended")
         total_tweets = len(tweets)
@@ -52,7 +129,8 @@ def analyze_twitter(keyword: str) -> tuple:
             report += f"{event['date']} - {event['username']}: {event['text']}\n"
         return score, report
     except Exception as e:
-        return 0.0, f"Twitter analysis error: {str(e)}"
+        # Raised so the failure is reported (and left out of the social score) instead of being cached
+        raise RuntimeError(f"Twitter analysis error: {str(e)}") from e
 
 def analyze_facebook(keyword: str) -> tuple:
     """
@@ -63,8 +141,12 @@ def analyze_facebook(keyword: str) -> tuple:
     
     Returns:
         tuple: (veracity_score (float), report (str))
+
+    Raises:
+        RuntimeError: If the posts cannot be fetched or analyzed, so the failure is reported
+            (or served from a stale result) rather than cached and scored as 0.0.
     """
-    facebook_api_key = os.getenv("FACEBOOK_API_KEY")
+    facebook_api_key = get_client("facebook")
     if not facebook_api_key:
         return 0.0, "Facebook API credentials not provided."
     
@@ -83,7 +165,7 @@ def analyze_facebook(keyword: str) -> tuple:
         report += f"Calculated veracity score: {score:.2f}."
         return score, report
     except Exception as e:
-        return 0.0, f"Facebook analysis error: {str(e)}"
+        raise RuntimeError(f"Facebook analysis error: {str(e)}") from e
 
 def analyze_instagram(keyword: str) -> tuple:
     """
@@ -94,22 +176,22 @@ def analyze_instagram(keyword: str) -> tuple:
     
     Returns:
         tuple: (veracity_score (float), report (str))
+
+    Raises:
+        RuntimeError: If the posts cannot be fetched or analyzed, so the failure is reported
+            (or served from a stale result) rather than cached and scored as 0.0.
     """
     try:
-        loader = instaloader.Instaloader()
-        hashtag = instaloader.Hashtag.from_name(loader.context, keyword)
-        posts = hashtag.get_posts()
+        # Pagination stops at the platform timeout: later posts could not be used anyway
+        posts = get_client("instagram").hashtag_posts(keyword, 20, SOCIAL_TIMEOUT_INSTAGRAM)
         timeline = []
-        count = 0
         for post in posts:
             timeline.append({
                 "username": post.owner_username,
                 "date": post.date_utc.isoformat(),
                 "caption": post.caption if post.caption else ""
             })
-            count += 1
-            if count >= 20:
-                break
+        count = len(timeline)
         # Dummy logic: Higher number of posts suggests wider discussion and thus a moderately higher score.
         score = 0.65 if count > 10 else 0.45
         report = f"Instagram analysis: Analyzed {count} posts for hashtag '{keyword}'.\nTimeline:\n"
@@ -118,4 +200,211 @@ def analyze_instagram(keyword: str) -> tuple:
         report += f"Calculated veracity score: {score:.2f}."
         return score, report
     except Exception as e:
-        return 0.0, f"Instagram analysis error: {str(e)}"
+        raise RuntimeError(f"Instagram analysis error: {str(e)}") from e
+
+# Platform analyzers run by the social media fan-out, with their timeouts in seconds
+PLATFORM_ANALYZERS = {
+    "twitter": analyze_twitter,
+    "facebook": analyze_facebook,
+    "instagram": analyze_instagram
+}
+PLATFORM_TIMEOUTS = {
+    "twitter": SOCIAL_TIMEOUT_TWITTER,
+    "facebook": SOCIAL_TIMEOUT_FACEBOOK,
+    "instagram": SOCIAL_TIMEOUT_INSTAGRAM
+}
+
+# Seconds a platform result is served from the cache, and the token buckets matching each platform's quota
+PLATFORM_CACHE_TTLS = {
+    "twitter": SOCIAL_CACHE_TTL_TWITTER,
+    "facebook": SOCIAL_CACHE_TTL_FACEBOOK,
+    "instagram": SOCIAL_CACHE_TTL_INSTAGRAM
+}
+PLATFORM_RATE_LIMITS = {
+    "twitter": TokenBucket.from_quota(SOCIAL_RATE_LIMIT_TWITTER),
+    "facebook": TokenBucket.from_quota(SOCIAL_RATE_LIMIT_FACEBOOK),
+    "instagram": TokenBucket.from_quota(SOCIAL_RATE_LIMIT_INSTAGRAM)
+}
+
+# (platform, keyword) -> (time fetched, result); expired entries are kept as fallbacks until SOCIAL_STALE_TTL
+_cache = LRUCache(SOCIAL_CACHE_MAX_ENTRIES)
+
+# Platform calls in progress, shared by concurrent requests for the same (platform, keyword)
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+# Counters since startup, per platform
+_counters = {}
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Returns the bounded thread pool used for the blocking platform analyzers.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=SOCIAL_MAX_WORKERS, thread_name_prefix="social")
+    return _executor
+
+def shutdown_executor():
+    """
+    Shuts the platform thread pool down without waiting for analyzers that are still running.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+def _count(platform: str, counter: str):
+    counts = _counters.setdefault(platform, {"calls": 0, "hits": 0, "stale": 0, "rate_limited": 0, "shared": 0})
+    counts[counter] += 1
+
+def _cache_key(platform: str, keyword: str) -> tuple:
+    return platform, " ".join(keyword.lower().split())
+
+def _fetch(platform: str, keyword: str, key: tuple) -> dict:
+    """
+    Calls a platform analyzer on the thread pool and caches the result, even if every waiting
+    request has timed out by then.
+    """
+    try:
+        score, report = PLATFORM_ANALYZERS[platform](keyword)
+        result = {"score": score, "report": report, "status": "ok"}
+        if SOCIAL_CACHE_ENABLED:
+            _cache.put(key, (time.time(), result))
+        return result
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+def _stale(platform: str, cached: tuple) -> dict:
+    if cached is None or time.time() - cached[0] > SOCIAL_STALE_TTL:
+        return None
+    _count(platform, "stale")
+    return {**cached[1], "status": "stale", "cached": True}
+
+async def _run_platform(platform: str, keyword: str, use_cache: bool = True, timeout: float = None) -> dict:
+    key = _cache_key(platform, keyword)
+    cached = _cache.get(key) if SOCIAL_CACHE_ENABLED else None
+    if use_cache and cached is not None and time.time() - cached[0] < PLATFORM_CACHE_TTLS.get(platform, 0):
+        _count(platform, "hits")
+        return {**cached[1], "cached": True}
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is not None:
+            _count(platform, "shared")
+        else:
+            bucket = PLATFORM_RATE_LIMITS.get(platform)
+            if bucket is None or bucket.try_acquire():
+                _count(platform, "calls")
+                future = get_executor().submit(_fetch, platform, keyword, key)
+                _inflight[key] = future
+    if future is None:
+        # Out of quota: never wait for a token, answer with the last known result if there is one
+        _count(platform, "rate_limited")
+        logger.warning(f"{platform} rate limit reached")
+        return _stale(platform, cached) or {
+            "score": None, "report": f"{platform.capitalize()} rate limit reached.", "status": "rate_limited"
+        }
+
+    # The platform's own timeout, or less if the request has less time left
+    timeout = min([limit for limit in [PLATFORM_TIMEOUTS.get(platform), timeout] if limit is not None], default=None)
+    try:
+        # Shielded, so a request timing out does not cancel the call shared with other requests
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=timeout)
+    except asyncio.TimeoutError:
+        # The worker thread cannot be interrupted; it finishes in the background and caches its result
+        logger.warning(f"{platform} analysis timed out after {timeout:.1f}s")
+        return _stale(platform, cached) or {
+            "score": None, "report": f"{platform.capitalize()} analysis timed out after {timeout:.1f}s.", "status": "timeout"
+        }
+    except Exception as e:
+        logger.error(f"{platform} analysis failed: {e}")
+        return _stale(platform, cached) or {
+            "score": None, "report": f"{platform.capitalize()} analysis error: {str(e)}", "status": "error"
+        }
+
+async def _timed_platform(platform: str, keyword: str, use_cache: bool, timeout: float = None) -> dict:
+    started = time.perf_counter()
+    result = await _run_platform(platform, keyword, use_cache, timeout)
+    status = "cache_hit" if result.get("cached") and result["status"] == "ok" else result["status"]
+    instrumentation.observe_social(platform, status, time.perf_counter() - started)
+    return result
+
+async def iter_social_media(keyword: str, platforms: list = None, use_cache: bool = True, timeout: float = None):
+    """
+    Runs the social media analyzers concurrently like `analyze_social_media`, yielding each
+    platform's result as soon as it is ready. With `timeout`, no platform waits longer than
+    that (nor than its own timeout).
+
+    Yields:
+        tuple: (platform, result), in completion order.
+    """
+    platforms = platforms or list(PLATFORM_ANALYZERS)
+    tasks = {
+        asyncio.create_task(_timed_platform(platform, keyword, use_cache, timeout)): platform for platform in platforms
+    }
+    try:
+        while tasks:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield tasks.pop(task), task.result()
+    finally:
+        # The consumer stopped early; shared platform calls are shielded and keep running
+        for task in tasks:
+            task.cancel()
+
+async def analyze_social_media(keyword: str, platforms: list = None, use_cache: bool = True) -> dict:
+    """
+    Runs the social media analyzers concurrently for a given keyword.
+
+    Each platform analyzer runs on the bounded thread pool with its own timeout, so the total
+    latency is that of the slowest platform (capped by its timeout) rather than their sum, and
+    the event loop is never blocked by the platforms' network I/O.
+
+    Results are cached per (platform, keyword) with per-platform TTLs, and concurrent requests
+    for the same keyword share one platform call. Calls are rate limited by per-platform token
+    buckets: when a platform is out of quota, timed out or failed, its last known result is
+    returned as "stale" if it is recent enough.
+
+    Parameters:
+        keyword (str): The keyword or hashtag to search for.
+        platforms (list): The platforms to query; defaults to all of them.
+        use_cache (bool): Ignore fresh cached results (stale ones may still be used as fallbacks).
+
+    Returns:
+        dict: Per platform, a dict with 'score' (None if the platform did not complete),
+              'report' and 'status' ("ok", "stale", "rate_limited", "timeout" or "error");
+              results served from the cache have 'cached' set.
+    """
+    platforms = platforms or list(PLATFORM_ANALYZERS)
+    results = {platform: result async for platform, result in iter_social_media(keyword, platforms, use_cache)}
+    return {platform: results[platform] for platform in platforms}
+
+def social_average(social_media: dict):
+    """
+    Averages the scores of the platforms that completed.
+
+    Returns:
+        float or None: The average score, or None if no platform completed.
+    """
+    scores = [result["score"] for result in social_media.values() if result.get("score") is not None]
+    return sum(scores) / len(scores) if scores else None
+
+def clear_cache():
+    """
+    Empties the social signal cache.
+    """
+    _cache.clear()
+
+def get_stats() -> dict:
+    """
+    Returns the per-platform call, cache and rate-limit counters and the tokens left in each bucket.
+    """
+    return {
+        "cache_entries": len(_cache),
+        "platforms": {
+            platform: {**_counters.get(platform, {}), "tokens": round(bucket.available(), 2)}
+            for platform, bucket in PLATFORM_RATE_LIMITS.items()
+        }
+    }
@@ -0,0 +1,250 @@
+import os
+import asyncio
+import hashlib
+import tempfile
+from fastapi import HTTPException, Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+from python_multipart.exceptions import FormParserError
+from app.config import IMAGE_MAX_UPLOAD_BYTES, VIDEO_MAX_UPLOAD_BYTES, UPLOAD_SPOOL_DIR
+
+# Largest upload accepted per input type
+UPLOAD_LIMITS = {"image": IMAGE_MAX_UPLOAD_BYTES, "video": VIDEO_MAX_UPLOAD_BYTES}
+
+# Form field holding the uploaded file, and the limits on the other (text) fields of a form
+FILE_FIELD = "file"
+MAX_FIELD_BYTES = 1024 * 1024
+MAX_FIELDS = 16
+
+
+class Upload:
+    """
+    An uploaded media file received in chunks: images are kept in memory (`data`), videos are
+    spooled to a unique temporary file (`path`). `digest` is the SHA-256 of the file's bytes.
+    """
+
+    def __init__(self, digest: str, size: int, data: bytes = None, path: str = None):
+        self.digest = digest
+        self.size = size
+        self.data = data
+        self.path = path
+
+    def cleanup(self):
+        """
+        Removes the spooled file, if any.
+        """
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Uploaded file exceeds the limit of {max_bytes} bytes.")
+
+
+class _Spool:
+    """
+    Receives the bytes of an uploaded file, hashing them as they arrive: they are kept in memory up
+    to `memory_bytes`, then written to a unique file in `directory`. That file becomes the upload's
+    file, so a spooled upload is written to disk once and never copied.
+    """
+
+    def __init__(self, filename: str, memory_bytes: int, directory: str = None):
+        self.suffix = os.path.splitext(filename or "")[1][:16]
+        self.memory_bytes = memory_bytes
+        self.directory = directory
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.buffer = bytearray()
+        self.file = None
+        self.path = None
+
+    async def write(self, data: bytes):
+        self.digest.update(data)
+        self.size += len(data)
+        if self.file is None and len(self.buffer) + len(data) <= self.memory_bytes:
+            self.buffer += data
+            return
+        if self.file is None:
+            await asyncio.to_thread(self._open)
+            data, self.buffer = bytes(self.buffer) + data, bytearray()
+        await asyncio.to_thread(self.file.write, data)
+
+    def _open(self):
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix="upload_", suffix=self.suffix, dir=self.directory)
+        self.file = os.fdopen(fd, "wb")
+
+    async def finish(self, in_memory: bool) -> Upload:
+        """
+        Returns the received file as an Upload: in memory (if it was not spooled) or in its file.
+        """
+        if in_memory and self.file is None:
+            return Upload(self.digest.hexdigest(), self.size, data=bytes(self.buffer))
+        if self.file is None:
+            await asyncio.to_thread(self._open)
+            await asyncio.to_thread(self.file.write, bytes(self.buffer))
+            self.buffer = bytearray()
+        await asyncio.to_thread(self.file.close)
+        return Upload(self.digest.hexdigest(), self.size, path=self.path)
+
+    def discard(self):
+        if self.file is not None:
+            self.file.close()
+            Upload(None, 0, path=self.path).cleanup()
+        self.buffer = bytearray()
+
+
+class _FormReceiver:
+    """
+    Callbacks of the streaming multipart parser: collects the text fields and spools the file part.
+    """
+
+    def __init__(self, directory: str, memory_bytes: int):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.fields = {}
+        self.spool = None
+        # File data to write once the parser has handled the current chunk (writes are awaited)
+        self.pending = []
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._name = None
+        self._data = None
+        self._in_file = False
+
+    def limit(self) -> int:
+        # The exact limit once the input type is known, the largest one before
+        kind = self.fields.get("input_type", "").lower()
+        return UPLOAD_LIMITS.get(kind, max(UPLOAD_LIMITS.values()))
+
+    def on_part_begin(self):
+        self._disposition = b""
+        self._name = None
+        self._data = bytearray()
+        self._in_file = False
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        if b"name" not in options:
+            raise HTTPException(status_code=400, detail='Form parts need a Content-Disposition "name".')
+        self._name = options[b"name"].decode("utf-8", errors="replace")
+        if b"filename" not in options:
+            if len(self.fields) >= MAX_FIELDS:
+                raise HTTPException(status_code=400, detail=f"A form holds at most {MAX_FIELDS} fields.")
+            return
+        if self._name != FILE_FIELD or self.spool is not None:
+            raise HTTPException(status_code=400, detail=f"Only one file is accepted, in the '{FILE_FIELD}' field.")
+        kind = self.fields.get("input_type", "").lower()
+        # Images are kept in memory; videos (or files of a type not known yet, past the image limit) are spooled
+        memory_bytes = 0 if kind == "video" else self.memory_bytes
+        self.spool = _Spool(options[b"filename"].decode("utf-8", errors="replace"), memory_bytes, self.directory)
+        self._in_file = True
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_file:
+            self.pending.append(data[start:end])
+            return
+        if len(self._data) + end - start > MAX_FIELD_BYTES:
+            raise HTTPException(status_code=413, detail=f"Form fields are limited to {MAX_FIELD_BYTES} bytes.")
+        self._data += data[start:end]
+
+    def on_part_end(self):
+        if not self._in_file:
+            self.fields[self._name] = self._data.decode("utf-8", errors="replace")
+
+
+async def receive_form(request: Request, directory: str = UPLOAD_SPOOL_DIR, images_in_memory: bool = True) -> tuple:
+    """
+    Receives a verification form straight from the request stream, before anything else reads it:
+    the text fields, and the file in the "file" field.
+
+    The size limit of the input type (UPLOAD_LIMITS) is enforced while the body arrives: a request
+    whose Content-Length is over it is rejected before its body is read, and any other as soon as its
+    file exceeds the limit, so an oversized upload is never fully received or stored. The file is
+    hashed as it arrives; images are kept in memory, videos are written once, to a unique file in
+    `directory` (the system temporary directory by default) that the caller removes with `cleanup`.
+
+    Parameters:
+        request (Request): The request, whose body has not been read.
+        directory (str): Where uploaded files are spooled.
+        images_in_memory (bool): Keep images in memory; otherwise they are spooled like videos.
+
+    Returns:
+        tuple: (dict of text fields, Upload of the image or video input, or None)
+
+    Raises:
+        HTTPException: 413 if the upload exceeds its limit, 400 if the form is malformed.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    max_bytes = max(UPLOAD_LIMITS.values())
+    # The largest file plus the text fields
+    max_body_bytes = max_bytes + MAX_FIELDS * MAX_FIELD_BYTES
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_body_bytes:
+        raise _too_large(max_bytes)
+
+    if content_type != b"multipart/form-data":
+        # No file in a URL-encoded form; Starlette bounds each field
+        form = await request.form()
+        return {name: value for name, value in form.items() if isinstance(value, str)}, None
+    if b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Missing boundary in multipart form.")
+
+    receiver = _FormReceiver(directory, IMAGE_MAX_UPLOAD_BYTES)
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": receiver.on_part_begin,
+        "on_part_data": receiver.on_part_data,
+        "on_part_end": receiver.on_part_end,
+        "on_header_field": receiver.on_header_field,
+        "on_header_value": receiver.on_header_value,
+        "on_header_end": receiver.on_header_end,
+        "on_headers_finished": receiver.on_headers_finished,
+    })
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_body_bytes:
+                raise _too_large(max_bytes)
+            parser.write(chunk)
+            for data in receiver.pending:
+                await receiver.spool.write(data)
+                if receiver.spool.size > receiver.limit():
+                    raise _too_large(receiver.limit())
+            receiver.pending.clear()
+        parser.finalize()
+
+        spool = receiver.spool
+        kind = receiver.fields.get("input_type", "").lower()
+        if spool is None or kind not in UPLOAD_LIMITS:
+            if spool is not None:
+                spool.discard()
+            return receiver.fields, None
+        if spool.size > UPLOAD_LIMITS[kind]:
+            raise _too_large(UPLOAD_LIMITS[kind])
+        return receiver.fields, await spool.finish(in_memory=kind == "image" and images_in_memory)
+    except FormParserError as e:
+        if receiver.spool is not None:
+            receiver.spool.discard()
+        raise HTTPException(status_code=400, detail=f"Invalid multipart form: {e}")
+    except BaseException:
+        if receiver.spool is not None:
+            receiver.spool.discard()
+        raise
@@ -0,0 +1,212 @@
+import json
+import time
+import hashlib
+import logging
+import threading
+import unicodedata
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, urlunsplit
+
+from app.config import (
+    VERDICT_CACHE_ENABLED, VERDICT_CACHE_PERSISTENT, VERDICT_CACHE_MAX_ENTRIES,
+    VERDICT_CACHE_TTL_PRIMARY, VERDICT_CACHE_TTL_SOCIAL, VERDICT_CACHE_TTL_VERDICT
+)
+from app.database import SessionLocal, engine
+from app.models import VerdictCacheEntry
+from app.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Time-to-live in seconds of each cached component
+COMPONENT_TTLS = {
+    "primary": VERDICT_CACHE_TTL_PRIMARY,
+    "social": VERDICT_CACHE_TTL_SOCIAL,
+    "verdict": VERDICT_CACHE_TTL_VERDICT,
+}
+
+# In-process tier: (key, component) -> (stored_at epoch seconds, JSON payload).
+# Payloads are kept serialized so callers never share mutable cached objects.
+_memory = LRUCache(VERDICT_CACHE_MAX_ENTRIES)
+
+# Hit and miss counters per component
+_stats = {}
+_stats_lock = threading.Lock()
+
+# Whether the persistent table has been created
+_table_ready = False
+
+def _count(component: str, counter: str):
+    with _stats_lock:
+        counters = _stats.setdefault(component, {"memory_hits": 0, "persistent_hits": 0, "misses": 0, "stores": 0})
+        counters[counter] += 1
+
+def _ensure_table():
+    global _table_ready
+    if not _table_ready:
+        VerdictCacheEntry.__table__.create(bind=engine, checkfirst=True)
+        _table_ready = True
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes text for cache keying: Unicode NFKC form, trimmed, with runs of whitespace collapsed.
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+def normalize_url(url: str) -> str:
+    """
+    Normalizes a URL for cache keying: lowercase scheme and host, no fragment and no trailing slash.
+    """
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+def make_key(input_type: str, input_data: str = None, content: bytes = None, content_digest: str = None) -> str:
+    """
+    Builds the content-addressed cache key of a verification request.
+
+    Parameters:
+        input_type (str): "text", "link", "image" or "video".
+        input_data (str): The text or URL, for text and link input.
+        content (bytes): The uploaded file bytes, for image and video input.
+        content_digest (str): The SHA-256 hex digest of the uploaded file, when it was hashed while streaming.
+
+    Returns:
+        str: A SHA-256 hex digest identifying the normalized input.
+    """
+    digest = hashlib.sha256()
+    input_type = input_type.lower()
+    digest.update(input_type.encode("utf-8") + b"\0")
+    if content is not None:
+        content_digest = hashlib.sha256(content).hexdigest()
+    if content_digest is not None:
+        digest.update(content_digest.encode("ascii"))
+    elif input_type == "link":
+        digest.update(normalize_url(input_data or "").encode("utf-8"))
+    else:
+        digest.update(normalize_text(input_data or "").encode("utf-8"))
+    return digest.hexdigest()
+
+def get(key: str, component: str):
+    """
+    Looks up a cached component, first in memory, then in the persistent tier.
+
+    Returns:
+        The cached value, or None if it is missing or older than the component's TTL.
+    """
+    if not VERDICT_CACHE_ENABLED:
+        return None
+    ttl = COMPONENT_TTLS.get(component, VERDICT_CACHE_TTL_VERDICT)
+
+    entry = _memory.get((key, component))
+    if entry is not None:
+        stored_at, payload = entry
+        if time.time() - stored_at <= ttl:
+            _count(component, "memory_hits")
+            return json.loads(payload)
+        _memory.pop((key, component))
+
+    if VERDICT_CACHE_PERSISTENT:
+        try:
+            value = _get_persistent(key, component, ttl)
+        except Exception as e:
+            logger.error(f"Verdict cache lookup failed: {e}")
+            value = None
+        if value is not None:
+            _count(component, "persistent_hits")
+            return value
+
+    _count(component, "misses")
+    return None
+
+def _get_persistent(key: str, component: str, ttl: int):
+    _ensure_table()
+    db = SessionLocal()
+    try:
+        row = db.get(VerdictCacheEntry, (key, component))
+        if row is None:
+            return None
+        if row.stored_at < datetime.utcnow() - timedelta(seconds=ttl):
+            db.delete(row)
+            db.commit()
+            return None
+        # Promote to the in-memory tier, keeping the original storage time
+        stored_at = time.time() - (datetime.utcnow() - row.stored_at).total_seconds()
+        _memory.put((key, component), (stored_at, row.payload))
+        return json.loads(row.payload)
+    finally:
+        db.close()
+
+def put(key: str, component: str, value):
+    """
+    Stores a component result in both cache tiers.
+    """
+    if not VERDICT_CACHE_ENABLED:
+        return
+    payload = json.dumps(value, default=str)
+    _memory.put((key, component), (time.time(), payload))
+    _count(component, "stores")
+    if not VERDICT_CACHE_PERSISTENT:
+        return
+    try:
+        _ensure_table()
+        db = SessionLocal()
+        try:
+            db.merge(VerdictCacheEntry(
+                key=key,
+                component=component,
+                payload=payload,
+                stored_at=datetime.utcnow()
+            ))
+            db.commit()
+        finally:
+            db.close()
+    except Exception as e:
+        logger.error(f"Verdict cache store failed: {e}")
+
+def purge_expired() -> int:
+    """
+    Deletes expired rows from the persistent tier.
+
+    Returns:
+        int: The number of deleted rows.
+    """
+    _ensure_table()
+    db = SessionLocal()
+    try:
+        deleted = 0
+        for component, ttl in COMPONENT_TTLS.items():
+            cutoff = datetime.utcnow() - timedelta(seconds=ttl)
+            deleted += db.query(VerdictCacheEntry).filter(
+                VerdictCacheEntry.component == component,
+                VerdictCacheEntry.stored_at < cutoff
+            ).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+    finally:
+        db.close()
+
+def clear():
+    """
+    Empties the in-memory tier and resets the counters (the persistent tier is kept).
+    """
+    _memory.clear()
+    with _stats_lock:
+        _stats.clear()
+
+def get_stats() -> dict:
+    """
+    Returns cache configuration, the in-memory tier size and hit/miss counters per component.
+    """
+    with _stats_lock:
+        components = {name: dict(counters) for name, counters in _stats.items()}
+    for counters in components.values():
+        lookups = counters["memory_hits"] + counters["persistent_hits"] + counters["misses"]
+        counters["hit_ratio"] = (lookups - counters["misses"]) / lookups if lookups else 0.0
+    return {
+        "enabled": VERDICT_CACHE_ENABLED,
+        "persistent": VERDICT_CACHE_PERSISTENT,
+        "memory_entries": len(_memory),
+        "max_memory_entries": _memory.max_entries,
+        "ttl_seconds": dict(COMPONENT_TTLS),
+        "components": components,
+    }
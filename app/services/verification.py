@@ -0,0 +1,424 @@
+import time
+import asyncio
+import logging
+import datetime
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from app.models import News, NewsReportDetail
+
+# Import advanced analysis functions from services
+from app.services.nlp_service import analyze_text_async
+from app.services.media_service import analyze_image_bytes, analyze_and_fingerprint_video, image_fingerprints
+from app.services.social_service import iter_social_media, social_average
+from app.services import (
+    verdict_cache, executor, scraper, headline_store, news_writer, report_store, media_index, instrumentation
+)
+from app.services.uploads import Upload
+from app.utils.deadline import Deadline
+from app.config import (
+    HEADLINE_MATCH_LIMIT, HEADLINE_MATCH_MAX_AGE_DAYS, MEDIA_HASH_ENABLED, MEDIA_HASH_VIDEO_FRAMES,
+    VERIFY_BUDGET_SECONDS, VERIFY_BUDGET_MAX_SECONDS, VERIFY_BUDGET_RESERVE_SECONDS, VERIFY_SHARE_SCRAPE,
+    VERIFY_SHARE_NLP, VERIFY_SHARE_MEDIA, VERIFY_SHARE_SOCIAL
+)
+
+logger = logging.getLogger(__name__)
+
+async def trusted_source_matches(text: str, timeout: float = None) -> list:
+    """
+    Looks up stored trusted-source headlines sharing keywords with the text (local full-text index, no network).
+    No matches are listed if the lookup takes longer than `timeout` seconds.
+    """
+    try:
+        with instrumentation.call("headline_store.search"):
+            return await asyncio.wait_for(asyncio.to_thread(
+                headline_store.search, text, HEADLINE_MATCH_LIMIT, True, 12, HEADLINE_MATCH_MAX_AGE_DAYS
+            ), timeout)
+    except asyncio.TimeoutError:
+        logger.warning("Headline lookup skipped: out of time budget")
+        return []
+    except Exception as e:
+        logger.error(f"Headline lookup failed: {e}")
+        return []
+
+def check_input(input_type: str, input_data: str, upload: Upload = None):
+    """
+    Checks that the input type is known and that its input was provided.
+
+    Raises:
+        HTTPException: 400 if the input is missing or invalid.
+    """
+    kind = input_type.lower()
+    if kind == "text" and not input_data:
+        raise HTTPException(status_code=400, detail="Text content is required for text input.")
+    if kind == "link" and not input_data:
+        raise HTTPException(status_code=400, detail="URL is required for link input.")
+    if kind in ["image", "video"] and upload is None:
+        raise HTTPException(status_code=400, detail=f"{kind.capitalize()} file is required for {kind} input.")
+    if kind not in ["text", "link", "image", "video"]:
+        raise HTTPException(status_code=400, detail="Invalid input type provided.")
+
+def request_budget(budget_seconds: float = None) -> float:
+    """
+    Returns the time budget of a request: the budget it asked for (at most VERIFY_BUDGET_MAX_SECONDS),
+    or VERIFY_BUDGET_SECONDS by default; None if verifications have no budget.
+
+    Raises:
+        HTTPException: 400 if the requested budget is not positive.
+    """
+    if budget_seconds is None:
+        return VERIFY_BUDGET_SECONDS if VERIFY_BUDGET_SECONDS > 0 else None
+    if budget_seconds <= 0:
+        raise HTTPException(status_code=400, detail="The time budget must be positive.")
+    return min(budget_seconds, VERIFY_BUDGET_MAX_SECONDS) if VERIFY_BUDGET_MAX_SECONDS > 0 else budget_seconds
+
+async def primary_analysis(input_type: str, input_data: str, upload: Upload = None, deadline: Deadline = None) -> dict:
+    """
+    Runs the primary analysis for the given input type (text analysis, scraping and text analysis
+    for links, or media analysis) and returns its report.
+
+    Each step gets its share of the request's `deadline` (no limit by default): scraping and text
+    analysis are cancelled when they overrun it, and video decoding is cut short, in which case
+    the report has 'complete' set to False.
+
+    Raises:
+        HTTPException: 400 if the input is missing or invalid.
+        asyncio.TimeoutError: If a step overran its share of the deadline.
+    """
+    check_input(input_type, input_data, upload)
+    deadline = deadline or Deadline()
+    if input_type.lower() == "text":
+        score, report = await asyncio.wait_for(analyze_text_async(input_data), deadline.timeout(VERIFY_SHARE_NLP))
+        return {
+            "veracity_score": score,
+            "analysis_report": report,
+            "trusted_source_matches": await trusted_source_matches(input_data, deadline.timeout())
+        }
+
+    if input_type.lower() == "link":
+        # Scrape the link to extract headlines (as a proxy for article content); cancelling the scrape
+        # cancels its HTTP request
+        headlines = await asyncio.wait_for(
+            scraper.scrape_headlines_async(input_data), deadline.timeout(VERIFY_SHARE_SCRAPE)
+        )
+        if not headlines:
+            raise HTTPException(status_code=400, detail="Could not extract content from the provided URL.")
+        combined_text = " ".join(headlines)
+        score, report = await asyncio.wait_for(analyze_text_async(combined_text), deadline.timeout(VERIFY_SHARE_NLP))
+        return {
+            "veracity_score": score,
+            "analysis_report": report,
+            "extracted_headlines": headlines,
+            "trusted_source_matches": await trusted_source_matches(combined_text, deadline.timeout())
+        }
+
+    if input_type.lower() == "image":
+        # Decoded straight from the in-memory upload; nothing is written to disk
+        with instrumentation.call("media_service.analyze_image_bytes"):
+            score, report = await asyncio.wait_for(
+                executor.run_cpu_bound(analyze_image_bytes, upload.data), deadline.timeout(VERIFY_SHARE_MEDIA)
+            )
+        return {"veracity_score": score, "analysis_report": report}
+
+    report, _ = await analyze_video(upload, deadline)
+    return report
+
+async def analyze_video(upload: Upload, deadline: Deadline, fingerprint_samples: int = 0) -> tuple:
+    """
+    Analyzes a video from the temporary file holding the upload and, with `fingerprint_samples`,
+    fingerprints it in the same decoding pass.
+
+    Decoding stops at the end of the media share of the `deadline` (a wall-clock time, as it may run
+    in another process) and the frames sampled by then are analyzed; the rest of the budget is the
+    hard limit.
+
+    Returns:
+        tuple: (primary analysis report, list of fingerprints)
+
+    Raises:
+        asyncio.TimeoutError: If the analysis overran the deadline.
+    """
+    media_timeout = deadline.timeout(VERIFY_SHARE_MEDIA)
+    stop_at = time.time() + media_timeout if media_timeout is not None else None
+    with instrumentation.call("media_service.analyze_video"):
+        score, report, complete, fingerprints = await asyncio.wait_for(
+            executor.run_cpu_bound(analyze_and_fingerprint_video, upload.path, stop_at, fingerprint_samples),
+            deadline.timeout()
+        )
+    result = {"veracity_score": score, "analysis_report": report}
+    if not complete:
+        result["complete"] = False
+    return result, fingerprints
+
+def _primary_timed_out(input_type: str) -> dict:
+    logger.warning(f"Primary analysis of {input_type} input skipped: out of time budget")
+    return {
+        "veracity_score": None,
+        "analysis_report": "The primary analysis did not complete within the time budget.",
+        "status": "timeout"
+    }
+
+def build_news_record(input_type: str, input_data: str, final_report: dict) -> News:
+    """
+    Builds the News row recording the verdict of a text or link input (not yet added to a session):
+    a compact summary on the row itself and the full report in its side-table row.
+    """
+    final_score = final_report["final_veracity_score"]
+    codec, payload = report_store.encode_details(final_report)
+    return News(
+        title=input_data if input_data else "Media Analysis",
+        content=input_data if input_data else "Media file analysis",
+        source=input_data if input_type.lower() == "link" else "User Submitted",
+        published_date=datetime.datetime.utcnow(),
+        veracity_score=final_score,
+        is_fake=(final_score < 0.5),
+        analysis_report=report_store.encode_summary(final_report),
+        report_details=NewsReportDetail(codec=codec, payload=payload)
+    )
+
+async def verify_events(input_type: str, input_data: str = None, upload: Upload = None, no_cache: bool = False,
+                        db: Session = None, store_record: bool = True, budget_seconds: float = None):
+    """
+    Runs the full verification pipeline of one input and yields its results as they become ready:
+    the primary analysis, each social media platform, then the final verdict. The primary and
+    social media analyses run concurrently, and each is served from the verdict cache when possible.
+
+    With a time budget, every stage gets its share of it (see `primary_analysis`) and the verdict
+    is computed from the components that completed in time. Components that were skipped are
+    listed in the report's 'skipped' and 'partial' is set; such verdicts are not cached.
+
+    Each stage is timed by `instrumentation.stage` (exposed by GET /metrics).
+
+    Parameters:
+        input_type (str): "text", "link", "image" or "video".
+        input_data (str): The text or URL, for text and link input.
+        upload (Upload): The received file, for image and video input.
+        no_cache (bool): Ignore cached results.
+        db (Session): Session used to store the News row (a new session by default).
+        store_record (bool): Store the News row of a text or link verdict (or queue it, with write-behind)
+            and add its id to the report; otherwise the row is returned for the caller to store.
+        budget_seconds (float): Time budget of the verification (see `request_budget`); no limit by default.
+
+    Yields:
+        tuple: ("primary", primary report), then ("social", {"platform": name, **result}) per platform,
+        then ("final", (final report, News row not yet stored or None)).
+
+    Raises:
+        HTTPException: 400 if the input is missing or invalid.
+    """
+    check_input(input_type, input_data, upload)
+    # Part of the budget is kept for aggregating and storing the verdict
+    if budget_seconds:
+        deadline = Deadline(budget_seconds - min(VERIFY_BUDGET_RESERVE_SECONDS, budget_seconds / 2))
+    else:
+        deadline = Deadline()
+    # Uploaded media is keyed by its bytes, text and links by their normalized value
+    cache_key = verdict_cache.make_key(input_type, input_data, content_digest=upload.digest if upload else None)
+
+    if not no_cache:
+        cached_verdict = verdict_cache.get(cache_key, "verdict")
+        if cached_verdict is not None:
+            cached_verdict["cache"] = {"verdict": "hit"}
+            for event in _replay(cached_verdict):
+                yield event
+            return
+
+    cache_status = {}
+    social_media = None if no_cache else verdict_cache.get(cache_key, "social")
+    cache_status["social"] = "bypass" if no_cache else ("hit" if social_media is not None else "miss")
+
+    # The analyses still to run report to this queue: their results, then ("done", task)
+    events = asyncio.Queue()
+    tasks = []
+
+    async def run_social() -> dict:
+        # Social media analysis integration:
+        # Use a snippet from the input_data (if available) or default keyword for social media search.
+        social_keyword = input_data.split()[0] if input_data else "news"
+        results = {}
+        with instrumentation.stage("social", input_type):
+            async for platform, result in iter_social_media(
+                social_keyword, use_cache=not no_cache, timeout=deadline.timeout(VERIFY_SHARE_SOCIAL)
+            ):
+                results[platform] = result
+                events.put_nowait(("social", {"platform": platform, **result}))
+        # Only complete, fresh results are cached, so a platform that timed out or was rate limited is retried
+        # on the next request
+        if all(platform["status"] == "ok" for platform in results.values()):
+            verdict_cache.put(cache_key, "social", results)
+        return results
+
+    def start(coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coroutine)
+        task.add_done_callback(lambda done: events.put_nowait(("done", done)))
+        tasks.append(task)
+        return task
+
+    # A video's primary analysis starts with its fingerprints (below), so its social media analysis starts first
+    social_task = None
+    if social_media is None and input_type.lower() == "video":
+        social_task = start(run_social())
+
+    # Recycled media: a near-duplicate of an image or video analyzed before gets the earlier verdict.
+    # A video is analyzed and fingerprinted in one decoding pass, and that analysis is its primary report.
+    fingerprints = []
+    video_report = None
+    try:
+        if MEDIA_HASH_ENABLED and upload is not None and input_type.lower() in ["image", "video"]:
+            try:
+                # Timed as the primary analysis for a video, which is most of the work
+                with instrumentation.stage("fingerprint" if input_type.lower() == "image" else "primary", input_type):
+                    if input_type.lower() == "image":
+                        fingerprints = await asyncio.wait_for(
+                            executor.run_cpu_bound(image_fingerprints, upload.data),
+                            deadline.timeout(VERIFY_SHARE_MEDIA)
+                        )
+                    else:
+                        video_report, fingerprints = await analyze_video(upload, deadline, MEDIA_HASH_VIDEO_FRAMES)
+            except asyncio.TimeoutError:
+                if input_type.lower() == "video":
+                    video_report = _primary_timed_out(input_type)
+                else:
+                    # Not worth the rest of the budget: the media is analyzed, and not registered
+                    logger.warning("Media fingerprinting skipped: out of time budget")
+            if fingerprints and not no_cache:
+                with instrumentation.stage("media_lookup", input_type):
+                    match = await asyncio.to_thread(media_index.find_match, input_type.lower(), fingerprints)
+                if match is not None:
+                    for task in tasks:
+                        task.cancel()
+                    final_report = match.pop("final_report")
+                    final_report["reused_media"] = match
+                    final_report["cache"] = {"media_fingerprint": "hit"}
+                    for event in _replay(final_report):
+                        yield event
+                    return
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    primary_report = None if no_cache else verdict_cache.get(cache_key, "primary")
+    cache_status["primary"] = "bypass" if no_cache else ("hit" if primary_report is not None else "miss")
+
+    async def run_primary() -> dict:
+        if video_report is not None:
+            report = video_report
+            if report.get("status") == "timeout":
+                return report
+        else:
+            try:
+                with instrumentation.stage("primary", input_type):
+                    report = await primary_analysis(input_type, input_data, upload, deadline)
+            except asyncio.TimeoutError:
+                return _primary_timed_out(input_type)
+        # A video analysis cut short is completed by the next request
+        if report.get("complete", True):
+            verdict_cache.put(cache_key, "primary", report)
+        return report
+
+    primary_task = start(run_primary()) if primary_report is None else None
+    if social_media is None and social_task is None:
+        social_task = start(run_social())
+    try:
+        if primary_report is not None:
+            yield "primary", primary_report
+        if social_media is not None:
+            for platform, result in social_media.items():
+                yield "social", {"platform": platform, **result}
+        remaining = len(tasks)
+        while remaining:
+            event, data = await events.get()
+            if event != "done":
+                yield event, data
+                continue
+            remaining -= 1
+            # Raises the error of a failed analysis (the other one is then cancelled)
+            result = data.result()
+            if data is primary_task:
+                primary_report = result
+                yield "primary", primary_report
+            elif data is social_task:
+                social_media = result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    # Calculate a weighted final veracity score over the components that completed:
+    # Primary analysis weight: 60%, Social media analysis weight: 40%.
+    # Platforms that timed out or failed are left out of the social average; if none completed,
+    # the primary analysis score is used on its own, and the social average if the primary analysis
+    # did not complete in time.
+    primary_score = primary_report.get("veracity_score")
+    social_avg = social_average(social_media)
+    if primary_score is None:
+        final_score = social_avg
+    elif social_avg is None:
+        final_score = primary_score
+    else:
+        final_score = 0.6 * primary_score + 0.4 * social_avg
+
+    # Components that ran out of time: skipped altogether, or cut short (a partially decoded video)
+    skipped = ["primary"] if primary_report.get("status") == "timeout" else []
+    skipped += [f"social.{name}" for name, result in social_media.items() if result["status"] == "timeout"]
+    partial = bool(skipped) or primary_report.get("complete") is False
+
+    # Prepare the final integrated report
+    if final_score is None:
+        conclusion = "Inconclusive: no analysis completed within the time budget."
+    else:
+        conclusion = "News is likely authentic." if final_score > 0.5 else "News is likely fake."
+    final_report = {
+        "input_type": input_type,
+        "primary_analysis": primary_report,
+        "social_media_analysis": social_media,
+        "excluded_platforms": [name for name, result in social_media.items() if result.get("score") is None],
+        "final_veracity_score": final_score,
+        "conclusion": conclusion,
+        "skipped": skipped,
+        "partial": partial,
+        "budget_seconds": budget_seconds
+    }
+
+    # Record the verdict in the database for text and link inputs. The record id is allocated
+    # up front, so it is final even when the row is written behind.
+    news_record = None
+    if input_type.lower() in ["text", "link"] and final_score is not None:
+        news_record = build_news_record(input_type, input_data, final_report)
+        if store_record:
+            with instrumentation.stage("store", input_type):
+                final_report["news_record_id"] = await asyncio.to_thread(news_writer.save, news_record, db)
+            news_record = None
+
+    # A verdict missing some platforms (or using stale ones) or cut short by the budget is not cached, so it is
+    # completed by the next request
+    if not partial and all(platform["status"] == "ok" for platform in social_media.values()):
+        verdict_cache.put(cache_key, "verdict", final_report)
+        if fingerprints:
+            with instrumentation.stage("media_register", input_type):
+                await asyncio.to_thread(media_index.register, input_type.lower(), upload.digest, fingerprints, final_report)
+    final_report["cache"] = cache_status
+    yield "final", (final_report, news_record)
+
+def _replay(final_report: dict):
+    # The events of a verdict that is already complete (cached or reused)
+    yield "primary", final_report["primary_analysis"]
+    for platform, result in final_report["social_media_analysis"].items():
+        yield "social", {"platform": platform, **result}
+    yield "final", (final_report, None)
+
+async def verify(input_type: str, input_data: str = None, upload: Upload = None, no_cache: bool = False,
+                 db: Session = None, store_record: bool = True, budget_seconds: float = None) -> tuple:
+    """
+    Runs the full verification pipeline of one input (see `verify_events`) and returns its final verdict.
+
+    Returns:
+        tuple: (final report, News row not yet stored or None)
+
+    Raises:
+        HTTPException: 400 if the input is missing or invalid.
+    """
+    result = None
+    async for event, data in verify_events(input_type, input_data, upload, no_cache, db, store_record, budget_seconds):
+        if event == "final":
+            result = data
+    return result
@@ -0,0 +1,60 @@
+import threading
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """
+    A thread-safe BK-tree over integer hashes for nearest-neighbour search by Hamming distance.
+
+    Each node keeps the children at each distance from it, so a search within `radius` only
+    descends into children whose distance lies in [d - radius, d + radius] (triangle inequality).
+    Items added with an identical key share a node.
+    """
+
+    def __init__(self):
+        # Nodes are [key, items, {distance: child node}]
+        self._root = None
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def add(self, key: int, item):
+        with self._lock:
+            self._size += 1
+            if self._root is None:
+                self._root = [key, [item], {}]
+                return
+            node = self._root
+            while True:
+                distance = hamming(key, node[0])
+                if distance == 0:
+                    node[1].append(item)
+                    return
+                child = node[2].get(distance)
+                if child is None:
+                    node[2][distance] = [key, [item], {}]
+                    return
+                node = child
+
+    def search(self, key: int, radius: int) -> list:
+        """
+        Returns (distance, item) pairs of every item whose key is within `radius` of `key`, nearest first.
+        """
+        matches = []
+        with self._lock:
+            stack = [self._root] if self._root is not None else []
+            while stack:
+                node = stack.pop()
+                distance = hamming(key, node[0])
+                if distance <= radius:
+                    matches.extend((distance, item) for item in node[1])
+                for child_distance, child in node[2].items():
+                    if distance - radius <= child_distance <= distance + radius:
+                        stack.append(child)
+        matches.sort(key=lambda match: match[0])
+        return matches
+
+    def __len__(self):
+        return self._size
@@ -0,0 +1,38 @@
+import time
+
+
+class Deadline:
+    """
+    The time budget of one request: `seconds` from its creation (no limit if `seconds` is None or 0).
+
+    Each stage asks for its timeout with `timeout(share)`: its share of the whole budget, capped by
+    what is left of it, so a stage that starts late cannot push the request past its deadline.
+    """
+
+    def __init__(self, seconds: float = None):
+        self.seconds = seconds if seconds and seconds > 0 else None
+        self.started = time.monotonic()
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        """
+        Returns the seconds left (never negative), or None without a limit.
+        """
+        if self.seconds is None:
+            return None
+        return max(0.0, self.seconds - self.elapsed())
+
+    def expired(self) -> bool:
+        return self.seconds is not None and self.remaining() <= 0
+
+    def timeout(self, share: float = 1.0, cap: float = None) -> float:
+        """
+        Returns the timeout of a stage entitled to `share` of the budget, capped by the time left
+        and by the stage's own timeout `cap`, or None if neither limits it.
+        """
+        limits = [limit for limit in [cap, self.remaining()] if limit is not None]
+        if self.seconds is not None:
+            limits.append(self.seconds * share)
+        return min(limits) if limits else None
@@ -0,0 +1,45 @@
+import time
+import threading
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket: holds at most `capacity` tokens and regains `rate` tokens per second.
+
+    `try_acquire` never blocks, so callers can fall back to a cached or degraded result
+    when the bucket is empty instead of waiting for a token.
+    """
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = max(1.0, float(capacity))
+        self.rate = max(0.0, float(rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    @classmethod
+    def from_quota(cls, quota: str) -> "TokenBucket":
+        """
+        Builds a bucket from a quota of the form "<requests>/<seconds>", e.g. "180/900"
+        for 180 requests per 15-minute window.
+        """
+        requests, seconds = quota.split("/")
+        return cls(capacity=float(requests), rate=float(requests) / float(seconds))
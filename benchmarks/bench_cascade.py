@@ -0,0 +1,67 @@
+"""
+Measures the confidence cascade on the held-out News rows (see train_cascade.py): for several
+uncertainty bands, the share of texts escalated to the zero-shot classifier, the agreement of the
+cascade's verdicts with the classifier's verdicts on every text, and the resulting throughput.
+
+    python -m benchmarks.bench_cascade --limit 500 --bands 0.1-0.9,0.2-0.8,0.3-0.7,0.4-0.6
+"""
+import sys
+import time
+import argparse
+
+from app.config import NLP_CASCADE_MODEL_PATH
+from app.services import cascade
+from app.services.model_registry import get_model
+from app.services.nlp_service import CANDIDATE_LABELS, _real_score
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=NLP_CASCADE_MODEL_PATH, help="cascade model file")
+    parser.add_argument("--limit", type=int, default=500, help="held-out rows evaluated")
+    parser.add_argument("--bands", default="0.1-0.9,0.2-0.8,0.3-0.7,0.4-0.6")
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    texts, labels = cascade.labeled_news(held_out=True, limit=args.limit)
+    if not texts:
+        print("No held-out News rows.")
+        return 1
+    model = cascade.CascadeModel.load(args.model)
+
+    started = time.perf_counter()
+    cheap_scores = model.score(texts)
+    cheap_seconds = (time.perf_counter() - started) / len(texts)
+
+    # Reference: the zero-shot classifier on every text
+    classifier = get_model()
+    started = time.perf_counter()
+    full_scores = []
+    for start in range(0, len(texts), args.batch_size):
+        batch = texts[start:start + args.batch_size]
+        results = classifier(batch, CANDIDATE_LABELS, batch_size=len(batch) * len(CANDIDATE_LABELS))
+        full_scores.extend(_real_score(result) for result in ([results] if isinstance(results, dict) else results))
+    full_seconds = (time.perf_counter() - started) / len(texts)
+
+    full_verdicts = [score > 0.5 for score in full_scores]
+    print(f"{len(texts)} held-out texts; first pass {cheap_seconds * 1000:.2f} ms/text, "
+          f"zero-shot {full_seconds * 1000:.1f} ms/text")
+    print(f"zero-shot agreement with stored labels: "
+          f"{sum(v == bool(l) for v, l in zip(full_verdicts, labels)) / len(texts):.3f}\n")
+    print(f"{'band':<12}{'escalated':>10}{'agreement':>11}{'decided ok':>12}{'texts/s':>10}{'speedup':>9}")
+    for band in args.bands.split(","):
+        low, high = (float(bound) for bound in band.split("-"))
+        escalate = cascade.route(cheap_scores, low, high)
+        verdicts = [full if needed else cheap > 0.5
+                    for needed, cheap, full in zip(escalate, cheap_scores, full_verdicts)]
+        agreement = sum(v == f for v, f in zip(verdicts, full_verdicts)) / len(texts)
+        decided = [(cheap > 0.5) == full for needed, cheap, full in zip(escalate, cheap_scores, full_verdicts)
+                   if not needed]
+        escalation_rate = sum(escalate) / len(texts)
+        seconds = cheap_seconds + escalation_rate * full_seconds
+        print(f"{band:<12}{escalation_rate:>10.1%}{agreement:>11.1%}"
+              f"{(sum(decided) / len(decided) if decided else 1.0):>12.1%}"
+              f"{1 / seconds:>10.1f}{full_seconds / seconds:>8.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Measures the memory of pre-fork workers (app/serve.py) with the NLP model loaded by each worker
+versus preloaded once in the parent and shared copy-on-write.
+
+Workers are forked exactly as by the server (`serve.preload` and `serve.fork_worker`); each runs a
+few inferences, then the parent reads every worker's memory from /proc/<pid>/smaps_rollup (Linux):
+RSS counts shared pages in full, USS (private pages) is what each worker really adds, and PSS splits
+shared pages between the processes sharing them.
+
+    python -m benchmarks.bench_prefork --workers 4
+    python -m benchmarks.bench_prefork --workers 4 --real-model   # NLP_MODEL_NAME instead of the stand-in
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+
+def read_memory(pid) -> dict:
+    """
+    Returns the RSS, PSS and USS of a process in megabytes.
+    """
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss_mb": fields["Rss"],
+        "pss_mb": fields["Pss"],
+        "uss_mb": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+def _worker(ready_write: int, preloaded: bool, workers: int, inferences: int):
+    from app.services import model_registry, nlp_service
+    from benchmarks import stand_ins
+
+    model_registry.set_serving_workers(workers)
+    if not preloaded:
+        model_registry.get_model()
+    nlp_service.analyze_texts(stand_ins.news_texts(inferences, seed=os.getpid()))
+    os.write(ready_write, b"1")
+    # Stay alive until the parent has read the memory
+    time.sleep(3600)
+
+def _measure(preload: bool, workers: int, inferences: int, results):
+    import signal
+    from app import serve
+
+    preloaded = serve.preload() if preload else False
+    ready_read, ready_write = os.pipe()
+    pids = [serve.fork_worker(_worker, ready_write, preloaded, workers, inferences) for _ in range(workers)]
+    try:
+        received = 0
+        while received < workers:
+            received += len(os.read(ready_read, workers))
+        results.put({
+            "parent": read_memory(os.getpid()),
+            "workers": [read_memory(pid) for pid in pids],
+        })
+    finally:
+        for pid in pids:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+
+def measure(preload: bool, workers: int, inferences: int) -> dict:
+    """
+    Runs one measurement in a fresh process, so the modes do not share any loaded state.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_measure, args=(preload, workers, inferences, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--inferences", type=int, default=8, help="texts analyzed by each worker before measuring")
+    parser.add_argument("--hidden-size", type=int, default=1024, help="size of the stand-in model")
+    parser.add_argument("--layers", type=int, default=8, help="layers of the stand-in model")
+    parser.add_argument("--real-model", action="store_true", help="use NLP_MODEL_NAME instead of the stand-in model")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    # Inherited by the measurement processes: a throwaway database and the model to load
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    os.environ["NLP_CASCADE_ENABLED"] = "False"
+    if not args.real_model:
+        from benchmarks import stand_ins
+        path = stand_ins.build_nli_model(os.path.join(workdir, "nli-stand-in"), args.hidden_size, args.layers)
+        os.environ["NLP_MODEL_NAME"] = path
+        size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+        print(f"Stand-in model: {size / (1024 * 1024):.0f} MB")
+
+    print(f"{'mode':<22}{'worker RSS':>12}{'worker USS':>12}{'worker PSS':>12}{'total PSS':>12}  (MB, mean per worker)")
+    for preload in [False, True]:
+        result = measure(preload, args.workers, args.inferences)
+        workers = result["workers"]
+        mean = {key: sum(worker[key] for worker in workers) / len(workers) for key in workers[0]}
+        total_pss = result["parent"]["pss_mb"] + sum(worker["pss_mb"] for worker in workers)
+        mode = "preloaded, shared" if preload else "loaded per worker"
+        print(f"{mode:<22}{mean['rss_mb']:>12.0f}{mean['uss_mb']:>12.0f}{mean['pss_mb']:>12.0f}{total_pss:>12.0f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Benchmark of the verdict query API (`news_query.list_verdicts`) on a large synthetic news table.
+
+The table is generated in a temporary SQLite database (set DATABASE_URL to use another one):
+
+    python -m benchmarks.bench_queries --rows 2000000
+"""
+import os
+import sys
+import time
+import random
+import itertools
+import argparse
+import tempfile
+import datetime
+
+def populate(database_path: str, rows: int):
+    import sqlite3
+    topics = ["election", "vaccine", "flood", "market", "football", "climate", "bank", "court", "storm", "health"]
+    # A realistic vocabulary: a few topic words among thousands of other words
+    words = topics + [f"word{i}" for i in range(5000)]
+    cumulative_weights = list(itertools.accumulate([50] * len(topics) + [1] * 5000))
+    sources = ["User Submitted", "https://www.bbc.com", "https://www.reuters.com", "https://apnews.com"]
+    start = datetime.datetime(2020, 1, 1)
+    rng = random.Random(0)
+    connection = sqlite3.connect(database_path)
+    connection.execute(
+        "CREATE TABLE news (id INTEGER PRIMARY KEY, title VARCHAR(256) NOT NULL, content TEXT NOT NULL, "
+        "source VARCHAR(256), published_date DATETIME, veracity_score FLOAT, is_fake BOOLEAN, analysis_report TEXT)"
+    )
+
+    def generate():
+        for i in range(rows):
+            title = " ".join(rng.choices(words, cum_weights=cumulative_weights, k=8))
+            score = rng.random()
+            published = start + datetime.timedelta(seconds=rng.randrange(5 * 365 * 86400))
+            yield (title, title, rng.choice(sources), published.strftime("%Y-%m-%d %H:%M:%S.%f"), score, score < 0.5, "{}")
+
+    connection.executemany(
+        "INSERT INTO news (title, content, source, published_date, veracity_score, is_fake, analysis_report) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)", generate()
+    )
+    connection.commit()
+    connection.close()
+
+def timed(label: str, fn, repeat: int = 5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<55} {best * 1000:8.2f} ms  ({len(result['items'])} rows)")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--pages", type=int, default=100, help="pages walked for the deep-page measurement")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    database_path = os.path.join(directory, "bench.db")
+    if "DATABASE_URL" not in os.environ:
+        started = time.perf_counter()
+        populate(database_path, args.rows)
+        print(f"Generated {args.rows} rows in {time.perf_counter() - started:.1f}s")
+        os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+
+    from app.migrations import migrate
+    from app.services import news_query
+
+    started = time.perf_counter()
+    migrate()
+    print(f"Migrated (indexes and full-text index) in {time.perf_counter() - started:.1f}s\n")
+
+    first = timed("first page, newest first", lambda: news_query.list_verdicts(limit=50))
+    cursor = first["next_cursor"]
+    for _ in range(args.pages):
+        cursor = news_query.list_verdicts(limit=50, cursor=cursor)["next_cursor"]
+    timed(f"page {args.pages + 2}, newest first (keyset)", lambda: news_query.list_verdicts(limit=50, cursor=cursor))
+    timed("is_fake=true, newest first", lambda: news_query.list_verdicts(is_fake=True, limit=50))
+    timed("score in [0.9, 1.0], by score", lambda: news_query.list_verdicts(
+        min_score=0.9, max_score=1.0, sort="veracity_score", limit=50))
+    timed("one month, newest first", lambda: news_query.list_verdicts(
+        start=datetime.datetime(2022, 3, 1), end=datetime.datetime(2022, 4, 1), limit=50))
+    timed("source filter, newest first", lambda: news_query.list_verdicts(source="https://apnews.com", limit=50))
+    timed("full-text 'flood storm', newest first", lambda: news_query.list_verdicts(q="flood storm", limit=50))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Benchmark of `media_service.analyze_video`: wall time per minute of video for the previous
+full-decode implementation and for the seek-based, segmented sampler.
+
+Synthetic clips are generated with OpenCV, so no sample media is needed:
+
+    python -m benchmarks.bench_video --minutes 1 5 --width 1280 --height 720
+"""
+import os
+import time
+import argparse
+import tempfile
+import cv2
+import numpy as np
+
+from app.services import media_service
+
+def write_clip(path: str, minutes: float, fps: int, width: int, height: int):
+    """
+    Writes a synthetic clip: a moving gradient with noise, so every frame differs.
+    """
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    rng = np.random.default_rng(0)
+    gradient = np.tile(np.linspace(0, 255, width, dtype=np.uint8), (height, 1))
+    for i in range(int(minutes * 60 * fps)):
+        frame = np.roll(gradient, i * 4, axis=1)
+        noise = rng.integers(0, 32, size=(height // 8, width // 8), dtype=np.uint8)
+        frame = cv2.add(frame, cv2.resize(noise, (width, height), interpolation=cv2.INTER_NEAREST))
+        writer.write(cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR))
+    writer.release()
+
+def analyze_video_full_decode(video_path: str) -> tuple:
+    """
+    The previous implementation: decodes every frame and keeps about ten of them.
+    """
+    cap = cv2.VideoCapture(video_path)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    sample_rate = max(frame_count // 10, 1)
+    scores = []
+    current_frame = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if current_frame % sample_rate == 0:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
+            scores.append(0.9 if np.std(hist) > 50 else 0.4)
+        current_frame += 1
+    cap.release()
+    return sum(scores) / len(scores), ""
+
+def time_call(fn, path: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1.0, 3.0])
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'minutes':>8} {'full decode s/min':>18} {'sampled s/min':>14} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for minutes in args.minutes:
+            path = os.path.join(directory, f"clip_{minutes}.mp4")
+            write_clip(path, minutes, args.fps, args.width, args.height)
+            # Start the segment workers before timing
+            media_service.analyze_video(path)
+            before = time_call(analyze_video_full_decode, path, args.repeat) / minutes
+            after = time_call(media_service.analyze_video, path, args.repeat) / minutes
+            print(f"{minutes:>8.1f} {before:>18.3f} {after:>14.3f} {before / after:>7.1f}x")
+    media_service.shutdown_segment_executor()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Local stand-ins used by the benchmark suite, so that it runs offline: a small randomly initialized
+NLI model, generated images and clips, a local HTTP server for recorded pages and fake social
+media analyzers.
+"""
+import os
+import io
+import threading
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import numpy as np
+
+# Recorded news pages served by the local HTTP server
+PAGES_DIR = os.path.join(os.path.dirname(__file__), "pages")
+
+# Words known to the stand-in tokenizer; other words map to [UNK]
+VOCABULARY = (
+    "the a of to in on and is this example fake real central bank raises rates again election results announced "
+    "storm hits coast parliament approves budget court rejects appeal vaccine trial stock markets fall rise"
+).split()
+
+def build_nli_model(directory: str, hidden_size: int = 128, layers: int = 2) -> str:
+    """
+    Saves a small randomly initialized BERT NLI model and a word-level tokenizer to `directory`.
+    It goes through the same zero-shot pipeline code as the real model, at a fraction of the compute;
+    `hidden_size` and `layers` scale its size (about 8 * hidden_size**2 parameters per layer).
+
+    Returns:
+        str: The model path, usable as a model name.
+    """
+    import torch
+    from tokenizers import Tokenizer, models, pre_tokenizers, processors
+    from transformers import BertConfig, BertForSequenceClassification, PreTrainedTokenizerFast
+
+    vocab = {token: i for i, token in enumerate(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "."] + VOCABULARY)}
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]", pair="[CLS] $A [SEP] $B:1 [SEP]:1",
+        special_tokens=[("[CLS]", vocab["[CLS]"]), ("[SEP]", vocab["[SEP]"])]
+    )
+    PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer, unk_token="[UNK]", pad_token="[PAD]", cls_token="[CLS]", sep_token="[SEP]",
+        model_max_length=512
+    ).save_pretrained(directory)
+
+    torch.manual_seed(0)
+    config = BertConfig(
+        vocab_size=len(vocab), hidden_size=hidden_size, num_hidden_layers=layers, num_attention_heads=4,
+        intermediate_size=2 * hidden_size,
+        num_labels=3, id2label={0: "contradiction", 1: "neutral", 2: "entailment"},
+        label2id={"contradiction": 0, "neutral": 1, "entailment": 2}
+    )
+    BertForSequenceClassification(config).save_pretrained(directory)
+    return directory
+
+def news_texts(count: int, words: int = 60, seed: int = 0) -> list:
+    """
+    Returns `count` distinct texts of about `words` words.
+    """
+    rng = np.random.default_rng(seed)
+    return [" ".join(rng.choice(VOCABULARY, size=words)) + f" {i}" for i in range(count)]
+
+def jpeg_image(width: int, height: int, seed: int = 0, quality: int = 90) -> bytes:
+    """
+    Returns a JPEG of a smooth random pattern with noise, compressing like a photograph.
+    """
+    from PIL import Image
+    rng = np.random.default_rng(seed)
+    base = Image.fromarray(rng.integers(0, 256, size=(12, 16, 3), dtype=np.uint8)).resize((width, height), Image.BICUBIC)
+    noisy = np.asarray(base, dtype=np.int16) + rng.integers(-12, 12, size=(height, width, 3))
+    buffer = io.BytesIO()
+    Image.fromarray(np.clip(noisy, 0, 255).astype(np.uint8)).save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+def write_clip(path: str, seconds: float, fps: int, width: int, height: int):
+    """
+    Writes a synthetic clip: a moving gradient with noise, so every frame differs.
+    """
+    import cv2
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    rng = np.random.default_rng(0)
+    gradient = np.tile(np.linspace(0, 255, width, dtype=np.uint8), (height, 1))
+    for i in range(int(seconds * fps)):
+        frame = np.roll(gradient, i * 4, axis=1)
+        noise = rng.integers(0, 32, size=(height // 8, width // 8), dtype=np.uint8)
+        frame = cv2.add(frame, cv2.resize(noise, (width, height), interpolation=cv2.INTER_NEAREST))
+        writer.write(cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR))
+    writer.release()
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+def serve_pages() -> tuple:
+    """
+    Serves the recorded pages on a local port, with Last-Modified validators like a real site.
+
+    Returns:
+        tuple: (base URL, server); call `server.shutdown()` when done.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_QuietHandler, directory=PAGES_DIR))
+    threading.Thread(target=server.serve_forever, name="pages-server", daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}", server
+
+def recorded_pages() -> list:
+    return sorted(name for name in os.listdir(PAGES_DIR) if name.endswith(".html"))
+
+def fake_social_analyzers() -> dict:
+    """
+    Social media analyzers answering instantly with fixed scores.
+    """
+    return {
+        "twitter": lambda keyword: (0.6, f"Twitter stand-in for '{keyword}'."),
+        "facebook": lambda keyword: (0.75, f"Facebook stand-in for '{keyword}'."),
+        "instagram": lambda keyword: (0.45, f"Instagram stand-in for '{keyword}'."),
+    }
@@ -0,0 +1,287 @@
+"""
+Offline benchmark suite of the verification pipeline.
+
+Each scenario runs in its own process (so its peak RSS is its own) against local stand-ins: a small
+NLI model (or the configured one with --real-model), generated images and clips, recorded pages on a
+local HTTP server and fake social media analyzers. For each scenario, throughput, p50/p95/p99
+latency and peak RSS are printed and saved as JSON; pass a previous run with --compare to flag
+regressions:
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --output after.json --compare baseline.json --tolerance 0.15
+
+The exit status is 1 when a regression is flagged.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import asyncio
+import platform
+import resource
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+# Scenario name -> description; each is implemented by the function of the same name below
+SCENARIOS = {
+    "analyze_text": "nlp_service.analyze_text, concurrent callers (micro-batched)",
+    "analyze_image_640x480": "media_service.analyze_image_bytes, 640x480 JPEG",
+    "analyze_image_1920x1080": "media_service.analyze_image_bytes, 1920x1080 JPEG",
+    "analyze_image_4032x3024": "media_service.analyze_image_bytes, 4032x3024 JPEG",
+    "analyze_video_360p_10s": "media_service.analyze_video, 640x360, 10 s",
+    "analyze_video_720p_60s": "media_service.analyze_video, 1280x720, 60 s",
+    "scrape_headlines": "scraper.scrape_headlines, recorded pages, first fetch",
+    "scrape_headlines_revalidated": "scraper.scrape_headlines, recorded pages, conditional refetch",
+    "verify_news_text": "POST /news/verify (text) through the ASGI app, fake social media",
+}
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    # Nearest-rank percentile
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(fraction * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def measure(fn, inputs: list, concurrency: int = 1) -> tuple:
+    """
+    Calls `fn` on every input from `concurrency` threads.
+
+    Returns:
+        tuple: (list of per-call latencies in seconds, wall time in seconds)
+    """
+    def timed(value):
+        started = time.perf_counter()
+        fn(value)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    if concurrency <= 1:
+        latencies = [timed(value) for value in inputs]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(timed, inputs))
+    return latencies, time.perf_counter() - started
+
+def _use_nlp_model(args, workdir: str):
+    from benchmarks import stand_ins
+    from app.services import model_registry
+    if not args.real_model:
+        path = stand_ins.build_nli_model(os.path.join(workdir, "nli-stand-in"))
+        model_registry.swap_model(path, unload_previous=False)
+    model_registry.get_model()
+
+def analyze_text(args, workdir: str) -> tuple:
+    from benchmarks import stand_ins
+    from app.services import nlp_service
+    _use_nlp_model(args, workdir)
+    # Warm up the pipeline and the batcher
+    nlp_service.analyze_text(stand_ins.news_texts(1, seed=99)[0])
+    return measure(nlp_service.analyze_text, stand_ins.news_texts(args.requests), args.concurrency)
+
+def _analyze_image(width: int, height: int):
+    def scenario(args, workdir: str) -> tuple:
+        from benchmarks import stand_ins
+        from app.services import media_service
+        images = [stand_ins.jpeg_image(width, height, seed) for seed in range(min(args.requests, 20))]
+        media_service.analyze_image_bytes(images[0])
+        return measure(media_service.analyze_image_bytes, [images[i % len(images)] for i in range(args.requests)])
+    return scenario
+
+def _analyze_video(width: int, height: int, seconds: float):
+    def scenario(args, workdir: str) -> tuple:
+        from benchmarks import stand_ins
+        from app.services import media_service
+        path = os.path.join(workdir, f"clip_{width}x{height}_{seconds}.mp4")
+        stand_ins.write_clip(path, seconds, 30, width, height)
+        try:
+            # Starts the segment workers before timing
+            media_service.analyze_video(path)
+            return measure(media_service.analyze_video, [path] * max(1, args.requests // 10))
+        finally:
+            media_service.shutdown_segment_executor()
+    return scenario
+
+def _scrape(revalidated: bool):
+    def scenario(args, workdir: str) -> tuple:
+        from benchmarks import stand_ins
+        from app.services import scraper
+        base_url, server = stand_ins.serve_pages()
+        try:
+            # Distinct query strings, so each URL is a first fetch unless revalidation is measured
+            urls = [f"{base_url}/{page}?v={i}" for i in range(args.requests) for page in stand_ins.recorded_pages()]
+            if revalidated:
+                measure(scraper.scrape_headlines, urls, args.concurrency)
+            return measure(scraper.scrape_headlines, urls, args.concurrency)
+        finally:
+            scraper.shutdown()
+            server.shutdown()
+    return scenario
+
+def verify_news_text(args, workdir: str) -> tuple:
+    import httpx
+    from benchmarks import stand_ins
+    from app.main import app
+    from app.migrations import migrate
+    from app.services import social_service
+
+    migrate()
+    _use_nlp_model(args, workdir)
+    social_service.PLATFORM_ANALYZERS = stand_ins.fake_social_analyzers()
+    texts = stand_ins.news_texts(args.requests + 1, seed=1)
+
+    async def run() -> tuple:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def post(text: str) -> float:
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.post("/news/verify", data={"input_type": "text", "input_data": text})
+                    response.raise_for_status()
+                    return time.perf_counter() - started
+
+            await post(texts[-1])
+            started = time.perf_counter()
+            latencies = await asyncio.gather(*(post(text) for text in texts[:-1]))
+            return list(latencies), time.perf_counter() - started
+
+    return asyncio.run(run())
+
+_IMPLEMENTATIONS = {
+    "analyze_text": analyze_text,
+    "analyze_image_640x480": _analyze_image(640, 480),
+    "analyze_image_1920x1080": _analyze_image(1920, 1080),
+    "analyze_image_4032x3024": _analyze_image(4032, 3024),
+    "analyze_video_360p_10s": _analyze_video(640, 360, 10),
+    "analyze_video_720p_60s": _analyze_video(1280, 720, 60),
+    "scrape_headlines": _scrape(revalidated=False),
+    "scrape_headlines_revalidated": _scrape(revalidated=True),
+    "verify_news_text": verify_news_text,
+}
+
+def _run_in_child(name: str, args, results):
+    # Per-request logging would be measured too
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            latencies, wall = _IMPLEMENTATIONS[name](args, workdir)
+        except Exception as e:
+            results.put({"error": f"{type(e).__name__}: {e}"})
+            return
+    latencies = sorted(latencies)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+    results.put({
+        "operations": len(latencies),
+        "wall_seconds": round(wall, 4),
+        "throughput_per_second": round(len(latencies) / wall, 3) if wall else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "peak_rss_mb": round(peak_rss_mb, 1),
+    })
+
+def run_scenario(name: str, args) -> dict:
+    """
+    Runs one scenario in a fresh process and returns its metrics.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_run_in_child, args=(name, args, results), name=f"bench:{name}")
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Returns the regressions of `current` against `baseline`: lower throughput, or higher p95
+    latency or peak RSS, by more than `tolerance` (a fraction).
+    """
+    regressions = []
+    for name, result in current.items():
+        before = baseline.get(name)
+        if not before or "error" in result or "error" in before:
+            continue
+        if result["throughput_per_second"] < before["throughput_per_second"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['throughput_per_second']} -> {result['throughput_per_second']}/s")
+        if result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']} -> {result['p95_ms']} ms")
+        if result["peak_rss_mb"] > before["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {before['peak_rss_mb']} -> {result['peak_rss_mb']} MB")
+    return regressions
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=100, help="operations per scenario (videos: a tenth)")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent callers where the API is concurrent")
+    parser.add_argument("--real-model", action="store_true", help="use NLP_MODEL_NAME instead of the stand-in model")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="a previous results file to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="relative change flagged as a regression")
+    args = parser.parse_args()
+
+    # Children inherit this environment: a throwaway database and no background work
+    database = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{database}")
+    os.environ.setdefault("NLP_WARMUP_ON_STARTUP", "False")
+    os.environ.setdefault("HEADLINE_REFRESH_ENABLED", "False")
+    os.environ.setdefault("VERDICT_CACHE_PERSISTENT", "False")
+
+    results = {}
+    print(f"{'scenario':<30}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'RSS MB':>9}")
+    for name in args.scenarios:
+        result = run_scenario(name, args)
+        results[name] = result
+        if "error" in result:
+            print(f"{name:<30} failed: {result['error']}")
+            continue
+        print(f"{name:<30}{result['throughput_per_second']:>10.1f}{result['p50_ms']:>10.2f}"
+              f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['peak_rss_mb']:>9.0f}")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "model": "real" if args.real_model else "stand-in",
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline.get("results", {}), args.tolerance)
+        if regressions:
+            print(f"\nRegressions against {args.compare} (tolerance {args.tolerance:.0%}):")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"\nNo regressions against {args.compare} (tolerance {args.tolerance:.0%}).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,8 @@
-from app.database import engine
-from app.models import Base
+from app.migrations import migrate
 
-# Create all tables defined in the models
-Base.metadata.create_all(bind=engine)
+# Create all tables defined in the models and apply pending schema migrations
+# (also upgrades databases created by earlier versions of this script)
+applied = migrate()
 print("Database tables created successfully.")
+if applied:
+    print(f"Applied migrations: {', '.join(str(version) for version in applied)}")
@@ -0,0 +1,40 @@
+import os
+import tempfile
+import pytest
+
+# Point the application at a throwaway SQLite database before any app module is imported,
+# so tests never write to the project's news.db.
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test_news.db')}")
+os.environ.setdefault("NLP_WARMUP_ON_STARTUP", "False")
+
+
+class StandInClassifier:
+    """
+    Stand-in for the zero-shot pipeline, so tests run offline: texts containing "hoax" are scored
+    0.2 for "real", every other text 0.8. Records the size of every call, and runs `before_call`
+    (if set) at the start of each one.
+    """
+
+    def __init__(self):
+        self.tokenizer = lambda text, **kwargs: {"input_ids": text.split(), "offset_mapping": []}
+        self.call_sizes = []
+        self.before_call = None
+
+    def __call__(self, texts, labels, batch_size=1):
+        if self.before_call is not None:
+            self.before_call()
+        self.call_sizes.append(len(texts))
+        return [
+            {"labels": ["real", "fake"], "scores": [0.2, 0.8] if "hoax" in text else [0.8, 0.2]}
+            for text in texts
+        ]
+
+@pytest.fixture
+def stand_in_classifier(monkeypatch):
+    """
+    Installs a StandInClassifier as the active NLP model and returns it.
+    """
+    from app.services import model_registry
+    classifier = StandInClassifier()
+    monkeypatch.setattr(model_registry, "_models", {model_registry.get_active_model_name(): classifier})
+    return classifier
@@ -0,0 +1,52 @@
+import json
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import engine, SessionLocal
+from app.models import Base, News
+from app.services import social_service, verdict_cache, nlp_service
+
+Base.metadata.create_all(bind=engine)
+
+
+def test_batch_streams_results_and_stores_rows_in_bulk(stand_in_classifier, monkeypatch):
+    """
+    This test sends a batch with a duplicate and an invalid item and checks that:
+    - every item gets a result line (the duplicate points at the first occurrence),
+    - identical items are classified once and the texts share classifier calls,
+    - the News rows are written at the end and reported in the summary line.
+    """
+    monkeypatch.setattr(social_service, "PLATFORM_ANALYZERS", {"twitter": lambda keyword: (0.5, "stand-in")})
+    monkeypatch.setattr(nlp_service, "NLP_BATCH_MAX_WAIT_MS", 50)
+    monkeypatch.setattr(nlp_service, "_batcher", None)
+    verdict_cache.clear()
+
+    items = [
+        {"id": "a", "input_type": "text", "input_data": "Aliens built the pyramids hoax"},
+        {"id": "b", "input_type": "text", "input_data": "Parliament passed the budget"},
+        {"id": "c", "input_type": "text", "input_data": "Aliens  built the pyramids hoax"},
+        {"id": "d", "input_type": "image", "input_data": "x"},
+        {"id": "e", "input_type": "text", "input_data": "The central bank kept rates unchanged"},
+    ]
+    body = "\n".join(json.dumps(item) for item in items)
+    rows_before = SessionLocal().query(News).count()
+
+    client = TestClient(app)
+    response = client.post("/news/verify/batch", content=body, headers={"Content-Type": "application/x-ndjson"})
+    nlp_service.get_batcher().shutdown()
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    results = {line["index"]: line for line in lines if line["type"] == "result"}
+    assert sorted(results) == [0, 1, 2, 3, 4]
+    assert results[3]["status"] == "error"
+    assert results[2]["duplicate_of"] == 0
+    assert results[0]["result"]["final_veracity_score"] < 0.5 < results[1]["result"]["final_veracity_score"]
+    assert sum(stand_in_classifier.call_sizes) == 3, "Duplicates should be classified once"
+    assert len(stand_in_classifier.call_sizes) < 3, "Concurrent items should share classifier calls"
+
+    summary = lines[-1]
+    assert summary["type"] == "summary"
+    assert (summary["items"], summary["unique"], summary["errors"]) == (5, 3, 1)
+    assert summary["news_record_ids"]["0"] == summary["news_record_ids"]["2"]
+    assert SessionLocal().query(News).count() == rows_before + 3
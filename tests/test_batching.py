@@ -0,0 +1,83 @@
+import time
+import threading
+from app.services.batching import MicroBatcher
+
+def test_micro_batcher_groups_concurrent_calls():
+    """
+    This test submits texts from several threads at once and checks that:
+    - every caller gets back the result for its own item,
+    - the items were processed in fewer calls than there were items,
+    - the batch-size counters add up to the number of submitted items.
+    """
+    calls = []
+
+    def process(items):
+        calls.append(list(items))
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=200, name="test-batcher")
+    results = {}
+    start = threading.Barrier(8)
+
+    def worker(i):
+        start.wait()
+        results[i] = batcher.submit(f"text {i}").result(timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.shutdown()
+
+    assert results == {i: f"TEXT {i}" for i in range(8)}
+    assert all(len(batch) <= 4 for batch in calls)
+    assert len(calls) < 8, "Concurrent submissions should share batches"
+
+    stats = batcher.stats()
+    assert stats["items_total"] == 8
+    assert stats["batches_total"] == len(calls)
+    assert sum(size * count for size, count in stats["batch_size_counts"].items()) == 8
+    assert stats["queue_wait_ms"]["max"] >= stats["queue_wait_ms"]["p50"]
+
+def test_micro_batcher_propagates_batch_errors():
+    """
+    This test checks that an exception raised by the batch function is delivered to the caller.
+    """
+    def process(items):
+        raise ValueError("model failure")
+
+    batcher = MicroBatcher(process, max_batch_size=2, max_wait_ms=1, name="failing-batcher")
+    future = batcher.submit("text")
+    try:
+        future.result(timeout=5)
+        assert False, "Expected the batch error to be raised"
+    except ValueError as e:
+        assert "model failure" in str(e)
+    batcher.shutdown()
+    assert batcher.stats()["errors_total"] == 1
+
+def test_micro_batcher_drops_cancelled_items():
+    """
+    This test cancels an item while it waits behind a running batch and checks that it is never
+    processed, while the items around it are.
+    """
+    calls = []
+    release = threading.Event()
+
+    def process(items):
+        calls.append(list(items))
+        release.wait(timeout=5)
+        return items
+
+    batcher = MicroBatcher(process, max_batch_size=1, max_wait_ms=0, name="test-batcher")
+    first = batcher.submit("first")
+    while not calls:
+        time.sleep(0.01)
+    cancelled = batcher.submit("cancelled")
+    last = batcher.submit("last")
+    assert cancelled.cancel()
+    release.set()
+    assert first.result(timeout=5) == "first" and last.result(timeout=5) == "last"
+    batcher.shutdown()
+    assert calls == [["first"], ["last"]]
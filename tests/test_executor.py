@@ -0,0 +1,92 @@
+import time
+import threading
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import executor, nlp_service, social_service, verdict_cache
+
+client = TestClient(app)
+
+@pytest.fixture
+def saturated_pool(monkeypatch):
+    """
+    A fresh thread pool accepting two pending jobs, both taken by jobs that block until released.
+    Yields the event releasing them and their futures.
+    """
+    monkeypatch.setattr(executor, "CPU_POOL_SIZE", 0)
+    monkeypatch.setattr(executor, "CPU_POOL_MAX_PENDING", 2)
+    monkeypatch.setattr(executor, "_pool", None)
+    release = threading.Event()
+    futures = [executor.submit(release.wait) for _ in range(2)]
+    try:
+        yield release, futures
+    finally:
+        release.set()
+        for future in futures:
+            future.result(timeout=5)
+        executor.shutdown()
+
+def test_full_pool_rejects_submissions_until_work_finishes(saturated_pool):
+    """
+    This test checks that a submission to a pool with `max_pending()` jobs pending raises
+    PoolSaturatedError and is counted as rejected, and that the pending count drops back once the
+    work finishes, so new submissions are accepted again.
+    """
+    release, futures = saturated_pool
+    rejected = executor.get_stats()["rejected"]
+    assert executor.get_stats()["in_flight"] == 2
+    with pytest.raises(executor.PoolSaturatedError):
+        executor.submit(release.wait)
+    assert executor.get_stats()["rejected"] == rejected + 1
+
+    release.set()
+    for future in futures:
+        assert future.result(timeout=5) is True
+    # The pending count is released by the futures' done callbacks, right after their results are set
+    deadline = time.monotonic() + 5
+    while executor.get_stats()["in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert executor.get_stats()["in_flight"] == 0
+    assert executor.submit(len, "abc").result(timeout=5) == 3
+
+def test_verify_returns_429_with_retry_after_when_the_pool_is_full(saturated_pool, monkeypatch):
+    """
+    This test checks that /news/verify answers 429 with a Retry-After header while the CPU pool is full.
+    """
+    monkeypatch.setattr(nlp_service, "NLP_BATCHING_ENABLED", False)
+    monkeypatch.setattr(social_service, "PLATFORM_ANALYZERS", {"twitter": lambda keyword: (0.5, "stand-in")})
+    verdict_cache.clear()
+    response = client.post("/news/verify", data={"input_type": "text", "input_data": "A story for a full pool. " * 10})
+    assert response.status_code == 429 and "saturated" in response.json()["detail"]
+    assert response.headers["Retry-After"] == "1"
+
+def test_warm_up_counts_each_worker_once(monkeypatch):
+    """
+    This test runs the warm-up jobs of a two-worker pool on threads of one process, and checks that
+    the ready count is per worker pid (one here, however many jobs reported), that the jobs go through
+    the pending-job accounting, and that the retries for the missing worker are bounded.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from app.services import model_registry
+    monkeypatch.setattr(executor, "CPU_POOL_SIZE", 2)
+    monkeypatch.setattr(executor, "CPU_POOL_MAX_PENDING", 0)
+    monkeypatch.setattr(executor, "WARMUP_RETRY_DELAY_SECONDS", 0)
+    monkeypatch.setattr(executor, "_pool", ThreadPoolExecutor(max_workers=2))
+    monkeypatch.setattr(model_registry, "is_loaded", lambda: True)
+    submitted = executor.get_stats()["submitted"]
+
+    executor.start()
+    expected = executor.WARMUP_MAX_JOBS_PER_WORKER * 2
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        stats = executor.get_stats()
+        if stats["submitted"] - submitted >= expected and not stats["in_flight"]:
+            break
+        time.sleep(0.01)
+    time.sleep(0.1)
+    stats = executor.get_stats()
+    executor.shutdown()
+
+    assert stats["workers_ready"] == 1 and stats["in_flight"] == 0
+    assert stats["submitted"] - submitted == expected
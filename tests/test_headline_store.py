@@ -0,0 +1,21 @@
+from app.services import headline_store
+
+def test_headlines_are_deduplicated_and_searchable():
+    """
+    This test stores headlines from two sources and checks that:
+    - headlines differing only in case or spacing are stored once,
+    - keyword searches (all terms or any term) are served from the local index.
+    """
+    counts = headline_store.store_sources({
+        "https://www.bbc.com": ["Storm hits the northern coast", "Parliament passes new budget"],
+        "https://www.cnn.com": ["storm hits the  northern coast", "Election results announced"]
+    })
+    assert counts == {"inserted": 3, "refreshed": 1}
+
+    matches = headline_store.search("northern storm")
+    assert [match["headline"] for match in matches] == ["Storm hits the northern coast"]
+    assert matches[0]["source"] == "https://www.bbc.com"
+
+    any_matches = headline_store.search("budget election", match_any=True)
+    assert {match["headline"] for match in any_matches} == {"Parliament passes new budget", "Election results announced"}
+    assert headline_store.search("budget election") == []
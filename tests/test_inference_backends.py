@@ -0,0 +1,58 @@
+import pytest
+
+from app.services import model_registry, nlp_service
+
+def _tiny_nli_model(directory) -> str:
+    """
+    Saves a small randomly initialized NLI model and a word-level tokenizer to `directory`,
+    so that the backends can be compared without downloading a model.
+    """
+    import torch
+    from tokenizers import Tokenizer, models, pre_tokenizers, processors
+    from transformers import BertConfig, BertForSequenceClassification, PreTrainedTokenizerFast
+
+    words = "the a of central bank raises rates again election results announced storm hits coast".split()
+    vocab = {token: i for i, token in enumerate(["[PAD]", "[UNK]", "[CLS]", "[SEP]"] + words + ["fake", "real", "this", "is", "example", "."])}
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]", pair="[CLS] $A [SEP] $B:1 [SEP]:1",
+        special_tokens=[("[CLS]", vocab["[CLS]"]), ("[SEP]", vocab["[SEP]"])]
+    )
+    PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer, unk_token="[UNK]", pad_token="[PAD]", cls_token="[CLS]", sep_token="[SEP]"
+    ).save_pretrained(directory)
+
+    torch.manual_seed(0)
+    config = BertConfig(
+        vocab_size=len(vocab), hidden_size=64, num_hidden_layers=2, num_attention_heads=4, intermediate_size=128,
+        num_labels=3, id2label={0: "contradiction", 1: "neutral", 2: "entailment"},
+        label2id={"contradiction": 0, "neutral": 1, "entailment": 2}
+    )
+    BertForSequenceClassification(config).save_pretrained(directory)
+    return str(directory)
+
+@pytest.mark.parametrize("backend", ["int8", "onnx"])
+def test_backends_match_the_fp32_pipeline(tmp_path, monkeypatch, backend):
+    """
+    This test builds a small NLI model and checks that the veracity scores returned by
+    `analyze_texts` with the given backend stay within tolerance of the fp32 PyTorch pipeline.
+    """
+    pytest.importorskip("torch")
+    if backend == "onnx":
+        pytest.importorskip("optimum.onnxruntime")
+    monkeypatch.setattr(model_registry, "_models", {})
+    monkeypatch.setattr(model_registry, "NLP_ONNX_CACHE_DIR", str(tmp_path / "onnx"))
+    monkeypatch.setattr(nlp_service, "NLP_CASCADE_ENABLED", False)
+    model_path = _tiny_nli_model(tmp_path / "model")
+
+    texts = ["central bank raises rates again", "election results announced", "storm hits the coast"]
+    reference = [score for score, _ in nlp_service.analyze_texts(texts, model_name=model_path)]
+    scores = [score for score, _ in nlp_service.analyze_texts(texts, model_name=f"{model_path}@{backend}")]
+    assert scores == pytest.approx(reference, abs=0.02)
+
+def test_backend_suffix_is_validated():
+    assert model_registry.split_model_name("facebook/bart-large-mnli") == ("facebook/bart-large-mnli", "torch")
+    assert model_registry.split_model_name("facebook/bart-large-mnli@int8") == ("facebook/bart-large-mnli", "int8")
+    with pytest.raises(ValueError):
+        model_registry.split_model_name("facebook/bart-large-mnli@fp8")
@@ -0,0 +1,109 @@
+import asyncio
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy import update
+
+from app.database import SessionLocal
+from app.models import VerificationJob
+from app.services import job_queue, verification
+
+def _wait_for(job_id, statuses=("done", "failed"), timeout=5.0):
+    async def poll():
+        for _ in range(int(timeout / 0.02)):
+            state = job_queue.get(job_id)
+            if state["status"] in statuses:
+                return state
+            await asyncio.sleep(0.02)
+        raise AssertionError(f"Job {job_id} did not finish: {job_queue.get(job_id)}")
+    return poll()
+
+def test_jobs_run_in_the_background_by_priority(monkeypatch):
+    """
+    This test replaces the verification pipeline with a stand-in and checks that:
+    - jobs submitted before the workers start run by priority (text before video),
+    - finished jobs expose their report, failed jobs their error.
+    """
+    order = []
+
+    async def fake_verify(input_type, input_data, upload=None, no_cache=False, db=None):
+        order.append(input_data)
+        if input_data == "broken":
+            raise HTTPException(status_code=400, detail="Could not extract content from the provided URL.")
+        return {"final_veracity_score": 0.7, "input": input_data}, None
+
+    monkeypatch.setattr(verification, "verify", fake_verify)
+
+    async def scenario():
+        video_job = job_queue.submit("video", "slow video")
+        text_job = job_queue.submit("text", "quick text")
+        link_job = job_queue.submit("link", "broken")
+        assert job_queue.get(video_job)["position"] == 2
+        job_queue.start(workers=1)
+        try:
+            done = await _wait_for(video_job)
+            failed = await _wait_for(link_job)
+        finally:
+            await job_queue.stop()
+        return text_job, done, failed
+
+    text_job, done, failed = asyncio.run(scenario())
+    assert order == ["quick text", "broken", "slow video"]
+    assert done["status"] == "done" and done["result"] == {"final_veracity_score": 0.7, "input": "slow video"}
+    assert failed["status"] == "failed" and "Could not extract" in failed["error"]
+    assert job_queue.get("missing") is None
+
+def _expire_lease(job_id):
+    db = SessionLocal()
+    try:
+        db.execute(update(VerificationJob).where(VerificationJob.id == job_id).values(
+            lease_expires_at=datetime.utcnow() - timedelta(seconds=1)
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+def test_interrupted_jobs_are_requeued_on_start(monkeypatch):
+    """
+    This test simulates a job left running by a crash (its lease has expired) and checks that it runs
+    again after a restart.
+    """
+    async def fake_verify(input_type, input_data, upload=None, no_cache=False, db=None):
+        return {"final_veracity_score": 0.4}, None
+
+    monkeypatch.setattr(verification, "verify", fake_verify)
+    job_id = job_queue.submit("text", "interrupted")
+    assert job_queue._claim_next()["id"] == job_id
+    assert job_queue.get(job_id)["status"] == "running"
+    _expire_lease(job_id)
+
+    async def restart():
+        job_queue.start(workers=1)
+        try:
+            return await _wait_for(job_id)
+        finally:
+            await job_queue.stop()
+
+    assert asyncio.run(restart())["result"] == {"final_veracity_score": 0.4}
+
+def test_jobs_leased_by_a_live_process_are_not_requeued(monkeypatch):
+    """
+    This test checks that starting another process's workers (e.g. a pre-fork worker being replaced)
+    leaves a job leased by a live process running, and that a job whose runner lost its lease does not
+    record its outcome over the new runner's.
+    """
+    job_id = job_queue.submit("text", "leased elsewhere")
+    job = job_queue._claim_next()
+    assert job["id"] == job_id
+    assert job_queue._requeue_expired() == 0
+    assert job_queue.get(job_id)["status"] == "running"
+
+    assert job_queue._renew_lease(job)
+    _expire_lease(job_id)
+    assert job_queue._requeue_expired() == 1
+    assert not job_queue._renew_lease(job)
+    assert not job_queue._finish(job, "done", {"final_veracity_score": 0.1})
+    assert job_queue.get(job_id)["status"] == "queued"
+
+    # Cleans up: the job is run by the next claim
+    other = job_queue._claim_next()
+    assert other["id"] == job_id and job_queue._finish(other, "failed", None, "test")
@@ -1,27 +1,34 @@
 from fastapi.testclient import TestClient
 from app.main import app
+from app.migrations import migrate
+from app.services import social_service, verdict_cache
+
+migrate()
 
 # Create a TestClient for the FastAPI application
 client = TestClient(app)
 
-def test_verify_news():
+
+def test_verify_news(stand_in_classifier, monkeypatch):
     """
-    This test checks the /news/verify endpoint using a sample news payload.
+    This test checks the /news/verify endpoint using a sample text submission (form fields).
     It verifies that the response status is 200 and that the response JSON includes:
-    - 'id': the unique identifier for the news entry.
-    - 'veracity_score': the confidence score from the analysis.
-    - 'is_fake': a boolean indicating whether the news is fake.
-    - 'analysis_report': a detailed report of the analysis.
+    - 'news_record_id': the unique identifier of the stored news entry.
+    - 'final_veracity_score': the combined confidence score of the analyses.
+    - 'primary_analysis': the text analysis, with its detailed 'analysis_report'.
+    - 'social_media_analysis' and 'conclusion'.
     """
+    monkeypatch.setattr(social_service, "PLATFORM_ANALYZERS", {"twitter": lambda keyword: (0.5, "stand-in")})
+    verdict_cache.clear()
     payload = {
-        "title": "Test News Article",
-        "content": "This is a sample test news content. " * 15,  # Multiply to ensure enough content length
-        "source": "Test Source"
+        "input_type": "text",
+        "input_data": "This is a sample test news content. " * 15,  # Multiply to ensure enough content length
     }
-    response = client.post("/news/verify", json=payload)
+    response = client.post("/news/verify", data=payload)
     assert response.status_code == 200, f"Expected status code 200, got {response.status_code}"
     data = response.json()
-    assert "id" in data, "Response should contain 'id'"
-    assert "veracity_score" in data, "Response should contain 'veracity_score'"
-    assert "is_fake" in data, "Response should contain 'is_fake'"
-    assert "analysis_report" in data, "Response should contain 'analysis_report'"
+    assert "news_record_id" in data, "Response should contain 'news_record_id'"
+    assert "final_veracity_score" in data, "Response should contain 'final_veracity_score'"
+    assert "analysis_report" in data["primary_analysis"], "Response should contain the 'analysis_report'"
+    assert "social_media_analysis" in data and "conclusion" in data
+    assert abs(data["final_veracity_score"] - (0.6 * 0.8 + 0.4 * 0.5)) < 1e-9
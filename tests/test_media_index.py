@@ -0,0 +1,99 @@
+import io
+import random
+import asyncio
+import numpy as np
+from PIL import Image
+
+from app.services import media_service, media_index, social_service, verification
+from app.services.uploads import Upload
+from app.utils.bk_tree import BKTree, hamming
+
+def _photo(seed: int, size=(320, 240)) -> Image.Image:
+    # A smooth random pattern with some structure, like a downscaled photograph
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 256, size=(6, 8, 3), dtype=np.uint8)
+    return Image.fromarray(small).resize(size, Image.BICUBIC)
+
+def _encode(image: Image.Image, quality: int = 90) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+def test_bk_tree_search_matches_brute_force():
+    """
+    This test checks BK-tree radius searches against a linear scan of random 64-bit hashes.
+    """
+    rng = random.Random(0)
+    keys = [rng.getrandbits(64) for _ in range(2000)]
+    # Near-duplicates of a few keys
+    keys += [key ^ (1 << rng.randrange(64)) for key in keys[:50]]
+    tree = BKTree()
+    for position, key in enumerate(keys):
+        tree.add(key, position)
+    for query in keys[:20] + [rng.getrandbits(64) for _ in range(20)]:
+        expected = sorted(position for position, key in enumerate(keys) if hamming(query, key) <= 6)
+        assert sorted(position for _, position in tree.search(query, 6)) == expected
+
+def test_recycled_image_gets_the_earlier_verdict(monkeypatch):
+    """
+    This test verifies an image, then a re-compressed and resized copy of it, and checks that the
+    copy gets the earlier verdict with its first-seen date without a new analysis, while an
+    unrelated image is analyzed.
+    """
+    monkeypatch.setattr(social_service, "PLATFORM_ANALYZERS", {"twitter": lambda keyword: (0.5, "ok")})
+    social_service.clear_cache()
+    analyzed = []
+    original_analyze = media_service.analyze_image_bytes
+    monkeypatch.setattr(verification, "analyze_image_bytes", lambda data: analyzed.append(1) or original_analyze(data))
+
+    def verify(data: bytes) -> dict:
+        upload = Upload(f"{hash(data):x}", len(data), data=data)
+        return asyncio.run(verification.verify("image", None, upload))[0]
+
+    photo = _photo(1)
+    first = verify(_encode(photo))
+    assert "reused_media" not in first and len(analyzed) == 1
+
+    copy = verify(_encode(photo.resize((200, 150)), quality=40))
+    assert len(analyzed) == 1
+    assert copy["reused_media"]["media_id"] and copy["reused_media"]["first_seen"]
+    assert copy["final_veracity_score"] == first["final_veracity_score"]
+
+    other = verify(_encode(_photo(2)))
+    assert "reused_media" not in other and len(analyzed) == 2
+
+def test_video_fingerprints_skip_uniform_frames(tmp_path):
+    import cv2
+    path = tmp_path / "clip.mp4"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+    for i in range(40):
+        frame = np.zeros((48, 64), dtype=np.uint8) if i < 10 else np.asarray(_photo(i // 10, (64, 48)).convert("L"))
+        writer.write(cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR))
+    writer.release()
+    fingerprints = media_service.video_fingerprints(str(path), samples=8)
+    assert len(fingerprints) == 6
+    assert media_index.find_match("video", fingerprints) is None
+
+def test_video_is_decoded_once_and_recycled_copies_reuse_its_verdict(tmp_path, monkeypatch):
+    """
+    This test verifies a video and checks that the analysis and the fingerprints come from a single
+    decoding pass (the file is opened once to count its frames and once to decode them), and that
+    the same video uploaded again gets the earlier verdict.
+    """
+    import cv2
+    path = tmp_path / "clip.mp4"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+    for i in range(40):
+        writer.write(cv2.cvtColor(np.asarray(_photo(10 + i // 10, (64, 48)).convert("L")), cv2.COLOR_GRAY2BGR))
+    writer.release()
+    monkeypatch.setattr(social_service, "PLATFORM_ANALYZERS", {"twitter": lambda keyword: (0.5, "ok")})
+    social_service.clear_cache()
+    opened = []
+    video_capture = cv2.VideoCapture
+    monkeypatch.setattr(media_service.cv2, "VideoCapture", lambda video_path: opened.append(1) or video_capture(video_path))
+
+    first = asyncio.run(verification.verify("video", None, Upload("video-first", 0, path=str(path))))[0]
+    assert "reused_media" not in first and len(opened) == 2
+    again = asyncio.run(verification.verify("video", None, Upload("video-again", 0, path=str(path))))[0]
+    assert again["reused_media"]["media_id"]
+    assert again["final_veracity_score"] == first["final_veracity_score"]
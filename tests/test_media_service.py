@@ -0,0 +1,136 @@
+import time
+import cv2
+import numpy as np
+
+from app.services import media_service
+
+def _write_clip(path, frames, fps=10, size=(64, 48)):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    for i in range(frames):
+        # Alternate flat and contrasted frames so the two scores both appear
+        frame = np.full((size[1], size[0]), 128, dtype=np.uint8)
+        if i % 2:
+            frame = np.tile(np.linspace(0, 255, size[0], dtype=np.uint8), (size[1], 1))
+        writer.write(cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR))
+    writer.release()
+
+def test_histogram_stds_match_per_frame_histograms():
+    """
+    This test checks that the vectorized histogram statistics match OpenCV's per-frame histograms.
+    """
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 256, size=(5, 20, 30), dtype=np.uint8)
+    frames[0] = 7
+    expected = [np.std(cv2.calcHist([frame], [0], None, [256], [0, 256])) for frame in frames]
+    np.testing.assert_allclose(media_service._histogram_stds(frames), expected, rtol=1e-5)
+
+def test_sample_frames_decodes_the_target_frames(tmp_path):
+    """
+    This test checks that exactly the target frames are decoded, in the requested order.
+    """
+    path = tmp_path / "clip.mp4"
+    _write_clip(path, 40)
+    indices, gray = media_service._sample_frames(str(path), [0, 3, 30, 1])
+    assert indices == [0, 3, 30, 1]
+    assert gray.shape == (4, 48, 64)
+    # Odd frames are gradients, even frames are flat
+    stds = media_service._histogram_stds(gray)
+    assert stds[1] < stds[0] and stds[3] < stds[0]
+
+def test_analyze_video_segments_match_single_pass(tmp_path, monkeypatch):
+    """
+    This test checks that sampling a video in parallel segments gives the same result as a single pass.
+    """
+    path = tmp_path / "clip.mp4"
+    _write_clip(path, 100)
+    monkeypatch.setattr(media_service, "_segment_executor", None)
+    monkeypatch.setattr(media_service, "VIDEO_SEGMENT_SECONDS", 10_000)
+    single = media_service.analyze_video(str(path))
+    monkeypatch.setattr(media_service, "VIDEO_SEGMENT_SECONDS", 3)
+    segmented = media_service.analyze_video(str(path))
+    media_service.shutdown_segment_executor()
+    assert single == segmented
+    assert single[1].startswith("Analyzed 10 frames from video.")
+
+def test_segments_keep_a_minimum_number_of_frames(tmp_path, monkeypatch):
+    """
+    This test checks that a video is only split into segments holding at least VIDEO_SEGMENT_MIN_FRAMES
+    sampled frames, and that a clip too short for two such segments is sampled in one pass.
+    """
+    path = tmp_path / "clip.mp4"
+    _write_clip(path, 100)
+    segments = []
+    analyze_segment = media_service._analyze_segment
+
+    def record(video_path, targets, *args):
+        segments.append(list(targets))
+        return analyze_segment(video_path, targets, *args)
+
+    monkeypatch.setattr(media_service, "_analyze_segment", record)
+    monkeypatch.setattr(media_service, "_segment_executor", None)
+    monkeypatch.setattr(media_service, "VIDEO_SEGMENT_SECONDS", 1)
+    monkeypatch.setattr(media_service, "VIDEO_SEGMENT_MIN_FRAMES", 4)
+    media_service.analyze_video(str(path))
+    assert [len(segment) for segment in segments] == [5, 5]
+
+    segments.clear()
+    monkeypatch.setattr(media_service, "VIDEO_SEGMENT_MIN_FRAMES", 6)
+    media_service.analyze_video(str(path))
+    media_service.shutdown_segment_executor()
+    assert [len(segment) for segment in segments] == [10]
+
+def test_analysis_and_fingerprints_share_one_decoding_pass(tmp_path, monkeypatch):
+    """
+    This test checks that analyzing and fingerprinting a video together opens and decodes it once, with
+    the same verdict as the analysis alone and the same fingerprints as fingerprinting alone.
+    """
+    path = tmp_path / "clip.mp4"
+    _write_clip(path, 100)
+    expected = (*media_service.analyze_video_until(str(path)), media_service.video_fingerprints(str(path), 9))
+    assert expected[3], "Every other frame of the clip is flat; the others can be fingerprinted"
+    opened = []
+    video_capture = media_service.cv2.VideoCapture
+
+    def capture(video_path):
+        opened.append(video_path)
+        return video_capture(video_path)
+
+    monkeypatch.setattr(media_service.cv2, "VideoCapture", capture)
+    monkeypatch.setattr(media_service, "VIDEO_SEGMENT_SECONDS", 10_000)
+    assert media_service.analyze_and_fingerprint_video(str(path), fingerprint_samples=9) == expected
+    # Once to count the frames, once to decode them
+    assert len(opened) == 2
+
+def test_analyze_video_reports_unreadable_file(tmp_path):
+    """
+    This test checks that a video that cannot be opened gets a zero score and an error report.
+    """
+    path = tmp_path / "missing.mp4"
+    assert media_service.analyze_video(str(path)) == (0.0, "Error opening video file.")
+
+def test_analyze_video_until_stops_at_the_deadline(tmp_path):
+    """
+    This test checks that decoding stops at a passed deadline and reports the verdict as incomplete.
+    """
+    path = tmp_path / "clip.mp4"
+    _write_clip(path, 100)
+    score, report, complete = media_service.analyze_video_until(str(path), time.time() - 1)
+    assert (score, complete) == (0.0, False)
+    assert "time budget" in report
+    assert media_service.analyze_video_until(str(path), time.time() + 60) == (*media_service.analyze_video(str(path)), True)
+
+def test_analyze_image_bytes_downscaling_keeps_the_score(monkeypatch):
+    """
+    This test checks that downscaling a large image keeps its score, and that undecodable bytes score zero.
+    """
+    from PIL import Image
+    import io
+    gradient = np.tile(np.linspace(0, 255, 800, dtype=np.uint8), (600, 1))
+    buffer = io.BytesIO()
+    Image.fromarray(gradient).save(buffer, format="PNG")
+    monkeypatch.setattr(media_service, "IMAGE_MAX_SIDE", 4096)
+    full_score, full_report = media_service.analyze_image_bytes(buffer.getvalue())
+    monkeypatch.setattr(media_service, "IMAGE_MAX_SIDE", 200)
+    small_score, small_report = media_service.analyze_image_bytes(buffer.getvalue())
+    assert full_score == small_score
+    assert media_service.analyze_image_bytes(b"not an image")[0] == 0.0
@@ -0,0 +1,82 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.main import app
+from app.migrations import migrate
+from app.services import instrumentation, social_service, verdict_cache
+from app.utils.metrics import Registry
+
+def test_prometheus_text_format():
+    """
+    This test checks that counters, gauges and histograms render in the Prometheus text format,
+    with cumulative buckets, escaped label values and the _total suffix on counters.
+    """
+    registry = Registry()
+    errors = registry.counter("demo_errors", "Errors.", ("stage",))
+    in_flight = registry.gauge("demo_in_flight", "In flight.")
+    latency = registry.histogram("demo_seconds", "Latency.", ("stage",), (0.1, 1))
+    errors.inc(stage='say "hi"')
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+    for value in [0.05, 0.5, 0.5, 3]:
+        latency.observe(value, stage="nlp")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE demo_errors counter" in lines
+    assert 'demo_errors_total{stage="say \\"hi\\""} 1' in lines
+    assert "demo_in_flight 1" in lines
+    assert 'demo_seconds_bucket{stage="nlp",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{stage="nlp",le="1"} 3' in lines
+    assert 'demo_seconds_bucket{stage="nlp",le="+Inf"} 4' in lines
+    assert 'demo_seconds_sum{stage="nlp"} 4.05' in lines
+    assert 'demo_seconds_count{stage="nlp"} 4' in lines
+
+def test_server_timing_header():
+    """
+    This test checks that the middleware adds the stages timed during a request to its
+    Server-Timing header, and counts a failing stage as an error.
+    """
+    demo = FastAPI()
+    demo.add_middleware(instrumentation.MetricsMiddleware, server_timing=True)
+
+    @demo.get("/demo")
+    async def run_demo():
+        with instrumentation.stage("primary", "text"):
+            pass
+        try:
+            with instrumentation.stage("social", "text"):
+                raise RuntimeError("platform down")
+        except RuntimeError:
+            pass
+        return {"ok": True}
+
+    errors_before = instrumentation.STAGE_ERRORS.value(stage="social", input_type="text")
+    response = TestClient(demo).get("/demo")
+    assert response.status_code == 200
+    names = [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+    assert names == ["primary", "social", "total"]
+    assert instrumentation.STAGE_ERRORS.value(stage="social", input_type="text") == errors_before + 1
+    assert instrumentation.STAGE_IN_FLIGHT.value(stage="social", input_type="text") == 0
+
+def test_metrics_endpoint(stand_in_classifier, monkeypatch):
+    """
+    This test checks that GET /metrics exposes the stage, service call, social platform and
+    request histograms recorded by a /news/verify request.
+    """
+    migrate()
+    monkeypatch.setattr(social_service, "PLATFORM_ANALYZERS", {"twitter": lambda keyword: (0.5, "stand-in")})
+    verdict_cache.clear()
+    social_service.clear_cache()
+    client = TestClient(app)
+    response = client.post("/news/verify", data={"input_type": "text", "input_data": "Metrics endpoint sample news text."})
+    assert response.status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'news_verify_stage_duration_seconds_count{stage="primary",input_type="text"}' in body
+    assert 'news_verify_stage_duration_seconds_count{stage="social",input_type="text"}' in body
+    assert 'news_service_call_duration_seconds_count{function="nlp_service.analyze_text"}' in body
+    assert 'news_social_platform_duration_seconds_count{platform="twitter",status="ok"}' in body
+    assert 'news_http_request_duration_seconds_count{method="POST",route="/news/verify",status="200"}' in body
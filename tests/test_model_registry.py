@@ -0,0 +1,28 @@
+from app.services import model_registry
+
+def test_models_load_lazily_and_can_be_swapped(monkeypatch):
+    """
+    This test replaces the pipeline loader with a stand-in and checks that:
+    - no model is loaded until it is first requested,
+    - swapping activates the new model and unloads the previous one.
+    """
+    loaded = []
+
+    def fake_load(name, task):
+        loaded.append(name)
+        return f"pipeline:{name}"
+
+    monkeypatch.setattr(model_registry, "_load_pipeline", fake_load)
+    monkeypatch.setattr(model_registry, "_models", {})
+    monkeypatch.setattr(model_registry, "_active_model_name", "model-a")
+
+    assert not model_registry.is_loaded()
+    assert model_registry.get_model() == "pipeline:model-a"
+    assert model_registry.get_model() == "pipeline:model-a"
+    assert loaded == ["model-a"], "A model should only be loaded once"
+    assert model_registry.status()["ready"]
+
+    previous = model_registry.swap_model("model-b")
+    assert previous == "model-a"
+    assert model_registry.get_active_model_name() == "model-b"
+    assert model_registry.status()["loaded"] == ["model-b"]
@@ -0,0 +1,100 @@
+import datetime
+from sqlalchemy import create_engine, inspect, text
+
+from app.database import SessionLocal
+from app.migrations import migrate
+from app.models import News
+from app.services import news_query
+
+migrate()
+
+def _store(rows: list):
+    db = SessionLocal()
+    try:
+        db.add_all(rows)
+        db.commit()
+    finally:
+        db.close()
+
+def test_keyset_pages_cover_every_row_once():
+    """
+    This test stores verdicts sharing publication dates (ties on the sort column) and checks that
+    paging through them with cursors returns every row exactly once, in order, with the filters applied.
+    """
+    base = datetime.datetime(2024, 1, 1)
+    _store([
+        News(title=f"Story {i}", content="central bank rates" if i % 3 == 0 else "sports results",
+             source="pagination-test", published_date=base + datetime.timedelta(days=i // 4),
+             veracity_score=(i % 10) / 10, is_fake=(i % 10) < 5, analysis_report="{}")
+        for i in range(40)
+    ])
+
+    seen = []
+    cursor = None
+    while True:
+        page = news_query.list_verdicts(source="pagination-test", limit=7, cursor=cursor)
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == 40 and len({item["id"] for item in seen}) == 40
+    assert [item["published_date"] for item in seen] == sorted((item["published_date"] for item in seen), reverse=True)
+
+    by_score = news_query.list_verdicts(source="pagination-test", sort="veracity_score", order="asc", limit=100)
+    assert [item["veracity_score"] for item in by_score["items"]] == sorted(item["veracity_score"] for item in seen)
+
+    fake = news_query.list_verdicts(source="pagination-test", is_fake=True, min_score=0.2, limit=100)["items"]
+    assert fake and all(item["is_fake"] and item["veracity_score"] >= 0.2 for item in fake)
+
+    dated = news_query.list_verdicts(
+        source="pagination-test", start=base + datetime.timedelta(days=2), end=base + datetime.timedelta(days=3)
+    )["items"]
+    assert len(dated) == 4
+
+    searched = news_query.list_verdicts(source="pagination-test", q="Central BANK", limit=100)["items"]
+    assert len(searched) == 14
+
+def test_keyset_pages_cross_rows_without_a_sort_value():
+    """
+    This test stores verdicts of which some have no veracity score (NULL) and checks that paging by
+    score, in either order, returns every row exactly once, with the NULL rows last.
+    """
+    _store([
+        News(title=f"Unscored {i}", content="text", source="null-pagination-test",
+             published_date=datetime.datetime(2024, 2, 1), veracity_score=None if i % 2 else i / 10,
+             is_fake=False, analysis_report="{}")
+        for i in range(10)
+    ])
+    for order in ["asc", "desc"]:
+        seen = []
+        cursor = None
+        while True:
+            page = news_query.list_verdicts(source="null-pagination-test", sort="veracity_score", order=order,
+                                            limit=3, cursor=cursor)
+            seen.extend(page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert len(seen) == 10 and len({item["id"] for item in seen}) == 10
+        scores = [item["veracity_score"] for item in seen]
+        assert scores[:5] == sorted(scores[:5], reverse=order == "desc") and scores[5:] == [None] * 5
+
+def test_migrations_upgrade_a_database_created_by_the_old_schema(tmp_path):
+    """
+    This test creates the original news table (without the query indexes), then checks that
+    migrating adds the indexes and indexes existing rows for full-text search, and is idempotent.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE news (id INTEGER PRIMARY KEY, title VARCHAR(256) NOT NULL, content TEXT NOT NULL, "
+            "source VARCHAR(256), published_date DATETIME, veracity_score FLOAT, is_fake BOOLEAN, analysis_report TEXT)"
+        ))
+        connection.execute(text("INSERT INTO news (title, content) VALUES ('Old story', 'flood warning issued')"))
+
+    assert migrate(engine) == [1, 2, 3, 4]
+    assert migrate(engine) == []
+    indexes = {index["name"] for index in inspect(engine).get_indexes("news")}
+    assert {"ix_news_published_date_id", "ix_news_is_fake_published_date_id", "ix_news_veracity_score_id"} <= indexes
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT rowid FROM news_fts WHERE news_fts MATCH 'flood'")).fetchall() == [(1,)]
@@ -0,0 +1,89 @@
+import datetime
+import threading
+from sqlalchemy import text
+
+from app.database import engine, SessionLocal
+from app.models import Base, News
+from app.services import news_writer
+
+Base.metadata.create_all(bind=engine)
+
+def _record(title: str) -> News:
+    return News(title=title, content=title, source="User Submitted", published_date=datetime.datetime.utcnow(),
+                veracity_score=0.5, is_fake=False, analysis_report="{}")
+
+def test_sqlite_connections_use_wal():
+    """
+    This test checks that file-based SQLite connections are opened in WAL mode with a busy timeout.
+    """
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar().lower() == "wal"
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() > 0
+
+def test_ids_are_allocated_up_front_without_duplicates(monkeypatch):
+    """
+    This test allocates ids from many threads, with small blocks, and checks they never collide.
+    """
+    monkeypatch.setattr(news_writer, "NEWS_ID_BLOCK_SIZE", 3)
+    ids = []
+    lock = threading.Lock()
+
+    def allocate():
+        allocated = [news_writer.allocate_id() for _ in range(20)]
+        with lock:
+            ids.extend(allocated)
+
+    threads = [threading.Thread(target=allocate) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(ids)) == 100
+
+def test_write_behind_flushes_in_bulk_and_drains_on_shutdown(monkeypatch):
+    """
+    This test queues rows through the write-behind writer and checks that:
+    - the returned ids are the ids the rows are eventually stored with,
+    - rows are written in bulk transactions, and every queued row is written by shutdown().
+    """
+    monkeypatch.setattr(news_writer, "NEWS_WRITE_BEHIND", True)
+    writer = news_writer.WriteBehindWriter(batch_size=10, flush_ms=10_000)
+    monkeypatch.setattr(news_writer, "_writer", writer)
+
+    ids = [news_writer.save(_record(f"queued story {i}")) for i in range(25)]
+    news_writer.shutdown()
+
+    assert writer.stats["written"] == 25 and writer.stats["flushes"] == 3
+    db = SessionLocal()
+    try:
+        stored = {row.id: row.title for row in db.query(News).filter(News.id.in_(ids))}
+    finally:
+        db.close()
+    assert stored == {news_id: f"queued story {i}" for i, news_id in enumerate(ids)}
+
+def test_failed_bulk_insert_is_retried_then_written_row_by_row(monkeypatch):
+    """
+    This test checks that a batch holding a row that cannot be inserted (a duplicate id) is retried,
+    then inserted row by row, so every other row is still written and only the bad one is counted as failed.
+    """
+    monkeypatch.setattr(news_writer, "NEWS_WRITE_RETRY_MS", 0)
+    existing_id = news_writer.save_many([_record("already stored")])[0]
+    duplicate = _record("duplicate id")
+    duplicate.id = existing_id
+    records = [_record(f"batched story {i}") for i in range(3)]
+    ids = []
+    for record in records:
+        record.id = news_writer.allocate_id()
+        ids.append(record.id)
+
+    writer = news_writer.WriteBehindWriter(batch_size=10)
+    writer._flush(records[:2] + [duplicate] + records[2:])
+
+    assert writer.stats["retries"] == news_writer.NEWS_WRITE_RETRIES
+    assert writer.stats["written"] == 3 and writer.stats["failed"] == 1
+    db = SessionLocal()
+    try:
+        stored = {row.id: row.title for row in db.query(News).filter(News.id.in_(ids + [existing_id]))}
+    finally:
+        db.close()
+    assert stored == {existing_id: "already stored", **{news_id: f"batched story {i}" for i, news_id in enumerate(ids)}}
@@ -0,0 +1,113 @@
+import re
+import pytest
+
+from app.services import nlp_service, model_registry
+
+
+class WordTokenizer:
+    """
+    Stand-in for a fast tokenizer: one token per word, with character offsets.
+    """
+
+    def __call__(self, text, add_special_tokens=False, return_offsets_mapping=False):
+        spans = [match.span() for match in re.finditer(r"\S+", text)]
+        encoded = {"input_ids": list(range(len(spans)))}
+        if return_offsets_mapping:
+            encoded["offset_mapping"] = spans
+        return encoded
+
+
+class StandInClassifier:
+    """
+    Scores a text as fake when it contains "hoax"; records the inputs of every call.
+    """
+
+    def __init__(self):
+        self.tokenizer = WordTokenizer()
+        self.calls = []
+        self.batch_sizes = []
+
+    def __call__(self, texts, labels, batch_size=1):
+        self.calls.append(list(texts))
+        self.batch_sizes.append(batch_size)
+        results = []
+        for text in texts:
+            real = 0.1 if "hoax" in text else 0.9
+            results.append({"labels": ["real", "fake"], "scores": [real, 1 - real]})
+        return results
+
+def test_split_into_chunks_overlaps_and_covers_the_text():
+    text = " ".join(f"w{i}" for i in range(25))
+    chunks = nlp_service.split_into_chunks(text, WordTokenizer(), max_tokens=10, overlap=3)
+    assert chunks[0] == " ".join(f"w{i}" for i in range(10))
+    assert chunks[1].startswith("w7 ")
+    assert chunks[-1].endswith("w24")
+    assert nlp_service.split_into_chunks("short text", WordTokenizer(), max_tokens=10, overlap=3) == ["short text"]
+    assert len(nlp_service.split_into_chunks(text, WordTokenizer(), max_tokens=4, overlap=0, max_chunks=2)) == 2
+
+def test_aggregate_scores():
+    scores = [0.9, 0.9, 0.1]
+    assert nlp_service.aggregate_scores(scores, "mean") == pytest.approx(19 / 30)
+    assert nlp_service.aggregate_scores(scores, "min") == 0.1
+    attention = nlp_service.aggregate_scores(scores, "attention")
+    assert 0.1 < attention < nlp_service.aggregate_scores(scores, "mean")
+    with pytest.raises(ValueError):
+        nlp_service.aggregate_scores(scores, "max")
+
+def test_long_texts_are_classified_in_one_batched_pass(monkeypatch):
+    classifier = StandInClassifier()
+    monkeypatch.setattr(model_registry, "_models", {"stand-in": classifier})
+    monkeypatch.setattr(nlp_service, "NLP_CHUNK_TOKENS", 10)
+    monkeypatch.setattr(nlp_service, "NLP_CHUNK_OVERLAP", 2)
+    monkeypatch.setattr(nlp_service, "NLP_CHUNK_AGGREGATION", "min")
+    long_text = " ".join(["word"] * 30 + ["hoax"] + ["word"] * 5)
+
+    (short_score, short_report), (long_score, long_report) = nlp_service.analyze_texts(
+        ["a short true story", long_text], model_name="stand-in"
+    )
+    assert len(classifier.calls) == 1, "All chunks of all texts should go through one classifier call"
+    assert len(classifier.calls[0]) == 1 + 5
+    assert short_score == 0.9 and "Label 'real': confidence 0.90" in short_report
+    # The last chunk, past the model's window, decides with the "min" strategy
+    assert long_score == 0.1
+    assert "Text split into 5 overlapping chunks" in long_report
+    assert "Chunk 4: confidence for 'real' 0.10" in long_report
+
+def test_inference_batch_size_is_capped(monkeypatch):
+    """
+    This test checks that the batch size handed to the classifier never exceeds NLP_MAX_INFERENCE_BATCH.
+    """
+    classifier = StandInClassifier()
+    monkeypatch.setattr(model_registry, "_models", {"stand-in": classifier})
+    monkeypatch.setattr(nlp_service, "NLP_CHUNK_TOKENS", 10)
+    monkeypatch.setattr(nlp_service, "NLP_CHUNK_OVERLAP", 2)
+    monkeypatch.setattr(nlp_service, "NLP_MAX_INFERENCE_BATCH", 4)
+    nlp_service.analyze_texts([" ".join(["word"] * 100)], model_name="stand-in")
+    assert len(classifier.calls[0]) > 4 and classifier.batch_sizes == [4]
+    nlp_service.analyze_texts(["short"], model_name="stand-in")
+    assert classifier.batch_sizes[-1] == len(nlp_service.CANDIDATE_LABELS)
+
+def test_cascade_decides_confident_texts_and_escalates_uncertain_ones(monkeypatch):
+    """
+    This test trains a small cascade model on texts where "hoax" marks fake news, and checks
+    that confident texts are decided by the first pass without the classifier, while a text
+    without any known word is escalated, and that each report says which stage decided.
+    """
+    from app.services import cascade
+
+    fake_texts = [f"shocking hoax about topic {i}" for i in range(50)]
+    real_texts = [f"official statement on topic {i}" for i in range(50)]
+    model = cascade.train(fake_texts + real_texts, [0] * 50 + [1] * 50, n_features=2 ** 12, epochs=10)
+    classifier = StandInClassifier()
+    monkeypatch.setattr(model_registry, "_models", {"stand-in": classifier})
+    monkeypatch.setattr(nlp_service, "NLP_CASCADE_ENABLED", True)
+    monkeypatch.setattr(cascade, "_model", model)
+
+    results = nlp_service.analyze_texts(
+        ["another shocking hoax", "official statement today", "zebra quartz"], model_name="stand-in"
+    )
+    assert classifier.calls == [["zebra quartz"]]
+    (fake_score, fake_report), (real_score, real_report), (_, escalated_report) = results
+    assert fake_score < nlp_service.NLP_CASCADE_LOW and real_score > nlp_service.NLP_CASCADE_HIGH
+    assert "Decided by: first-pass classifier" in fake_report and "Decided by: first-pass classifier" in real_report
+    assert "Decided by: zero-shot classifier (first-pass score 0.5" in escalated_report
@@ -0,0 +1,95 @@
+from sqlalchemy import create_engine, text
+
+from app.database import SessionLocal
+from app import migrations
+from app.migrations import migrate
+from app.models import News
+from app.services import news_query, news_writer, report_store
+from app.services.verification import build_news_record
+
+migrate()
+
+def _report(posts: int = 50) -> dict:
+    return {
+        "input_type": "text",
+        "primary_analysis": {
+            "veracity_score": 0.8,
+            "analysis_report": {"Headline matches": [f"Trusted headline number {i}" for i in range(20)]},
+        },
+        "social_media_analysis": {
+            "twitter": {
+                "score": 0.7, "status": "ok",
+                "tweets": [{"text": f"Tweet {i} about the central bank raising rates again", "likes": i}
+                           for i in range(posts)],
+            },
+            "instagram": {"score": None, "status": "rate_limited", "posts": []},
+        },
+        "excluded_platforms": ["instagram"],
+        "final_veracity_score": 0.76,
+        "conclusion": "The news is likely authentic.",
+    }
+
+def test_summary_row_is_small_and_full_report_round_trips():
+    """
+    This test stores a verdict with a bulky report and checks that the news row only holds the
+    compact summary, that it is several times smaller than the old repr, and that the full report
+    is returned unchanged on demand.
+    """
+    report = _report()
+    news_id = news_writer.save(build_news_record("text", "Central bank raises rates", report))
+
+    db = SessionLocal()
+    try:
+        stored = db.get(News, news_id).analysis_report
+    finally:
+        db.close()
+    assert len(stored) * 5 < len(str(report))
+
+    summary = news_query.get_verdict(news_id)["analysis_report"]
+    assert summary["v"] == report_store.REPORT_FORMAT_VERSION
+    assert summary["final_veracity_score"] == 0.76 and summary["primary_score"] == 0.8
+    assert summary["social_scores"]["instagram"] == {"score": None, "status": "rate_limited"}
+    assert news_query.get_verdict(news_id, detail="full")["analysis_report"] == report
+
+def test_large_details_are_compressed():
+    """
+    This test checks that full reports above the threshold are compressed and decode to the original.
+    """
+    report = _report(posts=500)
+    codec, payload = report_store.encode_details(report)
+    assert codec != "json" and len(payload) * 3 < len(str(report))
+    assert report_store.decode_details(codec, payload) == report
+
+def test_migration_converts_legacy_reports(tmp_path):
+    """
+    This test stores a report the old way (a Python repr) and checks that migrating moves the full
+    report to the side table and leaves a summary on the row; unparseable reports are left as they are.
+    It also checks that converting again, in chunks of one row (as when resuming an interrupted
+    conversion), skips the rows already converted.
+    """
+    report = _report(posts=5)
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE news (id INTEGER PRIMARY KEY, title VARCHAR(256) NOT NULL, content TEXT NOT NULL, "
+            "source VARCHAR(256), published_date DATETIME, veracity_score FLOAT, is_fake BOOLEAN, analysis_report TEXT)"
+        ))
+        connection.execute(text("INSERT INTO news (title, content, analysis_report) VALUES ('a', 'a', :r)"),
+                           {"r": str(report)})
+        connection.execute(text("INSERT INTO news (title, content, analysis_report) VALUES ('b', 'b', 'not a dict')"))
+
+    migrate(engine)
+    with engine.connect() as connection:
+        rows = dict(connection.execute(text("SELECT id, analysis_report FROM news")).fetchall())
+        codec, payload = connection.execute(text("SELECT codec, payload FROM news_report_details")).one()
+    assert report_store.decode_summary(rows[1])["conclusion"] == report["conclusion"]
+    assert rows[2] == "not a dict"
+    assert report_store.decode_details(codec, payload) == report
+
+    with engine.connect() as connection:
+        connection.execute(text("INSERT INTO news (title, content, analysis_report) VALUES ('c', 'c', :r)"),
+                           {"r": str(report)})
+        connection.commit()
+        migrations._convert_legacy_reports(connection, chunk_size=1)
+        details = connection.execute(text("SELECT news_id FROM news_report_details ORDER BY news_id")).fetchall()
+    assert [row[0] for row in details] == [1, 3]
@@ -0,0 +1,69 @@
+import time
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from app.services.scraper import AsyncScraper
+
+PAGE = b"<html><body><h1>Local headline</h1><h2>Second headline</h2></body></html>"
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Local stand-in for a news site: every page takes 0.3s and carries an ETag.
+    """
+    requests_seen = []
+
+    def do_GET(self):
+        StandInHandler.requests_seen.append((self.path, self.headers.get("If-None-Match")))
+        time.sleep(0.3)
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = PAGE if self.path != "/large" else b"<h1>Big</h1>" + b"x" * 100000
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_async_scraper_against_local_server():
+    """
+    This test runs the scraper against a local HTTP server and checks that:
+    - sources are fetched concurrently (total time close to the slowest source),
+    - a second fetch sends the ETag and reuses the headlines on a 304 response,
+    - large bodies are truncated at the configured size.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    sources = [f"{base}/source{i}" for i in range(5)]
+
+    async def run():
+        scraper = AsyncScraper(max_per_host=5, max_body_bytes=1024)
+        try:
+            start = time.perf_counter()
+            first = await scraper.update_trusted_sources(sources)
+            elapsed = time.perf_counter() - start
+
+            second = await scraper.scrape_headlines(sources[0])
+            large = await scraper.scrape_headlines(f"{base}/large")
+            return first, elapsed, second, large, dict(scraper.stats)
+        finally:
+            await scraper.aclose()
+
+    try:
+        first, elapsed, second, large, stats = asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    assert all(headlines == ["Local headline", "Second headline"] for headlines in first.values())
+    assert elapsed < 1.0, f"Sources should be fetched concurrently, took {elapsed:.2f}s"
+    assert second == ["Local headline", "Second headline"]
+    assert ("/source0", '"v1"') in StandInHandler.requests_seen
+    assert stats["not_modified"] == 1
+    assert large == ["Big"]
+    assert stats["truncated"] == 1
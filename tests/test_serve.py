@@ -0,0 +1,83 @@
+import os
+import time
+import signal
+import multiprocessing
+from app import serve
+from app.services import model_registry
+
+def _idle_worker(sock, workers, max_requests, graceful_timeout):
+    # Stand-in for uvicorn: records its pid, then serves until stopped
+    with open(os.path.join(os.environ["SERVE_TEST_DIR"], str(os.getpid())), "w"):
+        pass
+    time.sleep(3600)
+
+def _run_launcher(directory: str):
+    os.environ["SERVE_TEST_DIR"] = directory
+    serve.serve_worker = _idle_worker
+    serve.Launcher(host="127.0.0.1", port=0, workers=2, preload_model=False, graceful_timeout=5).run()
+
+def _wait_for(condition, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+def _alive(pid: int) -> bool:
+    # A stopped worker lingers as a zombie until the launcher reaps it
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split(")")[-1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+def test_launcher_replaces_and_stops_workers(tmp_path):
+    """
+    This test checks that the launcher keeps its number of workers, replaces a worker that dies,
+    replaces all workers on SIGHUP and stops them on SIGTERM.
+    """
+    directory = str(tmp_path)
+    started = lambda: {int(name) for name in os.listdir(directory)}
+    launcher = multiprocessing.get_context("fork").Process(target=_run_launcher, args=(directory,))
+    launcher.start()
+    try:
+        assert _wait_for(lambda: len(started()) == 2)
+        first = started()
+
+        # A worker that dies is replaced
+        crashed = next(iter(first))
+        os.kill(crashed, signal.SIGKILL)
+        assert _wait_for(lambda: len(started()) == 3)
+        running = started() - {crashed}
+
+        # SIGHUP: every worker is replaced, one at a time
+        os.kill(launcher.pid, signal.SIGHUP)
+        assert _wait_for(lambda: len(started()) == 5)
+        assert _wait_for(lambda: not any(_alive(pid) for pid in running))
+        replacements = started() - first - running
+        assert all(_alive(pid) for pid in replacements)
+
+        # SIGTERM: the workers are stopped and the launcher exits
+        os.kill(launcher.pid, signal.SIGTERM)
+        launcher.join(timeout=10)
+        assert launcher.exitcode == 0
+        assert not any(os.path.exists(f"/proc/{pid}") for pid in replacements)
+    finally:
+        if launcher.is_alive():
+            launcher.kill()
+
+def test_serving_workers_share_the_cores(monkeypatch):
+    """
+    This test checks that the inference threads are divided between the serving workers.
+    """
+    monkeypatch.setattr(model_registry, "NLP_INFERENCE_THREADS", 0)
+    monkeypatch.setattr(model_registry, "CPU_POOL_SIZE", 0)
+    monkeypatch.setattr(model_registry, "_threads_configured", False)
+    monkeypatch.setattr(model_registry.os, "cpu_count", lambda: 16)
+    monkeypatch.setattr(model_registry, "_serving_workers", 1)
+    assert model_registry.inference_threads() == 16
+    model_registry.set_serving_workers(4)
+    assert model_registry.inference_threads() == 4
+    model_registry.set_serving_workers(32)
+    assert model_registry.inference_threads() == 1
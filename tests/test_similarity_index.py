@@ -0,0 +1,55 @@
+import zlib
+import numpy as np
+from app.services.similarity_index import SimilarityIndex
+
+def bag_of_words_embed(texts):
+    """
+    Stand-in embedder: hashed bag-of-words vectors, normalized to unit length.
+    """
+    matrix = np.zeros((len(texts), 64), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().split():
+            matrix[row, zlib.crc32(word.encode()) % 64] += 1.0
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-9)
+
+def test_similarity_index_search_persist_and_evict(tmp_path):
+    """
+    This test builds an index with a stand-in embedder and checks that:
+    - a batched lookup returns the closest headline and its source for each query,
+    - only new headlines are embedded when the index is updated,
+    - the index is reopened from disk without re-embedding,
+    - headlines are evicted by age, into a new matrix file (a reader of the old one is unaffected).
+    """
+    embedded = []
+
+    def embed(texts):
+        embedded.extend(texts)
+        return bag_of_words_embed(texts)
+
+    index = SimilarityIndex(str(tmp_path), embed=embed)
+    index.add(["Parliament passes new budget", "Storm hits the northern coast"], "https://www.bbc.com")
+    index.add(["Storm hits the northern coast", "Central bank raises interest rates"], "https://www.reuters.com")
+    assert len(index) == 3
+    assert embedded.count("Storm hits the northern coast") == 1
+
+    results = index.search(["bank raises rates again", "budget passes parliament"], k=2)
+    assert results[0][0]["headline"] == "Central bank raises interest rates"
+    assert results[0][0]["source"] == "https://www.reuters.com"
+    assert results[1][0]["headline"] == "Parliament passes new budget"
+    assert results[0][0]["similarity"] >= results[0][1]["similarity"]
+
+    embedded.clear()
+    reopened = SimilarityIndex(str(tmp_path), embed=embed)
+    assert len(reopened) == 3
+    assert reopened.search(["storm coast"], k=1)[0][0]["headline"] == "Storm hits the northern coast"
+    assert embedded == ["storm coast"], "Reopening the index must not re-embed the corpus"
+
+    reopened._entries[0]["last_seen"] -= 3600
+    mapped_before = reopened._vectors
+    first_row = np.array(mapped_before[0])
+    assert reopened.evict_older_than(60) == 1
+    assert np.array_equal(mapped_before[0], first_row), "Eviction must not rewrite the mapped matrix in place"
+    assert [entry["text"] for entry in reopened._entries] == [
+        "Storm hits the northern coast", "Central bank raises interest rates"
+    ]
+    assert reopened.search(["bank rates"], k=1)[0][0]["headline"] == "Central bank raises interest rates"
@@ -0,0 +1,88 @@
+import time
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from app.services import social_service
+from app.utils.rate_limit import TokenBucket
+
+def test_social_fan_out_runs_concurrently_and_drops_timeouts(monkeypatch):
+    """
+    This test replaces the platform analyzers with stand-ins and checks that:
+    - the platforms run concurrently (total time close to the slowest completed platform),
+    - a platform exceeding its timeout is reported as such and left out of the average.
+    """
+    def slow(score, delay):
+        def analyzer(keyword):
+            time.sleep(delay)
+            return score, f"report for {keyword}"
+        return analyzer
+
+    monkeypatch.setattr(social_service, "PLATFORM_ANALYZERS", {
+        "twitter": slow(0.2, 0.3),
+        "facebook": slow(0.8, 0.3),
+        "instagram": slow(0.5, 2.0)
+    })
+    monkeypatch.setattr(social_service, "PLATFORM_TIMEOUTS", {"twitter": 1.0, "facebook": 1.0, "instagram": 0.5})
+    social_service.clear_cache()
+
+    start = time.perf_counter()
+    results = asyncio.run(social_service.analyze_social_media("election"))
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.9, f"Platforms should run concurrently, took {elapsed:.2f}s"
+    assert results["twitter"] == {"score": 0.2, "report": "report for election", "status": "ok"}
+    assert results["instagram"]["status"] == "timeout"
+    assert results["instagram"]["score"] is None
+    assert abs(social_service.social_average(results) - 0.5) < 1e-9
+
+
+class FakeTwitter:
+    """
+    Local stand-in for tweepy.API, counting searches.
+    """
+
+    def __init__(self):
+        self.searches = 0
+
+    def search_tweets(self, q, lang, count, tweet_mode):
+        self.searches += 1
+        time.sleep(0.1)
+        user = SimpleNamespace(verified=True, screen_name="reporter")
+        return [SimpleNamespace(user=user, created_at=datetime(2025, 1, 1), full_text=f"{q} confirmed")]
+
+def test_social_clients_are_reused_and_results_cached_and_rate_limited(monkeypatch):
+    """
+    This test uses a fake Twitter client and checks that:
+    - the client is created once and concurrent requests for the same keyword share one search,
+    - a repeated keyword is served from the cache without calling the platform,
+    - once the token bucket is empty, the expired result is returned as "stale" without waiting,
+      and a keyword without any cached result is reported as "rate_limited".
+    """
+    fake = FakeTwitter()
+    created = []
+    monkeypatch.setattr(social_service, "CLIENT_FACTORIES", {**social_service.CLIENT_FACTORIES,
+                                                             "twitter": lambda: created.append(1) or fake})
+    monkeypatch.setattr(social_service, "PLATFORM_RATE_LIMITS", {"twitter": TokenBucket(capacity=1, rate=0)})
+    monkeypatch.setattr(social_service, "PLATFORM_CACHE_TTLS", {"twitter": 60})
+    social_service.reset_clients()
+    social_service.clear_cache()
+
+    async def concurrent():
+        return await asyncio.gather(*(social_service.analyze_social_media("Election", ["twitter"]) for _ in range(5)))
+    results = asyncio.run(concurrent())
+    assert fake.searches == 1 and len(created) == 1
+    assert all(result["twitter"]["status"] == "ok" and result["twitter"]["score"] == 1.0 for result in results)
+
+    cached = asyncio.run(social_service.analyze_social_media("election ", ["twitter"]))["twitter"]
+    assert cached["cached"] and cached["status"] == "ok" and fake.searches == 1
+
+    # The bucket is empty: an expired result is served as stale, an unknown keyword is rate limited
+    monkeypatch.setattr(social_service, "PLATFORM_CACHE_TTLS", {"twitter": 0})
+    start = time.perf_counter()
+    stale = asyncio.run(social_service.analyze_social_media("election", ["twitter"]))["twitter"]
+    limited = asyncio.run(social_service.analyze_social_media("budget", ["twitter"]))["twitter"]
+    assert time.perf_counter() - start < 0.1
+    assert stale["status"] == "stale" and stale["score"] == 1.0
+    assert limited == {"score": None, "report": "Twitter rate limit reached.", "status": "rate_limited"}
+    assert fake.searches == 1
+    social_service.reset_clients()
@@ -0,0 +1,97 @@
+import os
+import asyncio
+import hashlib
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.services import uploads
+
+BOUNDARY = "upload-test-boundary"
+
+def _form_body(fields: dict, data: bytes = None, filename: str = "clip.mp4") -> bytes:
+    parts = [
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        for name, value in fields.items()
+    ]
+    if data is not None:
+        parts.append(
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f"Content-Type: application/octet-stream\r\n\r\n".encode() + data + b"\r\n"
+        )
+    return b"".join(parts) + f"--{BOUNDARY}--\r\n".encode()
+
+def _request(body: bytes, chunk_size: int = 64, content_length: bool = True) -> tuple:
+    """
+    Returns a request streaming `body` in chunks, and the list of chunks it has sent so far.
+    """
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+    sent = []
+
+    async def receive():
+        chunk = chunks[len(sent)] if len(sent) < len(chunks) else b""
+        sent.append(chunk)
+        return {"type": "http.request", "body": chunk, "more_body": len(sent) < len(chunks)}
+
+    headers = [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())]
+    if content_length:
+        headers.append((b"content-length", str(len(body)).encode()))
+    return Request({"type": "http", "method": "POST", "headers": headers}, receive), sent
+
+def test_receive_form_keeps_images_in_memory(tmp_path):
+    """
+    This test checks that an image upload is kept in memory with its digest, next to the text fields.
+    """
+    data = os.urandom(1000)
+    request, _ = _request(_form_body({"input_type": "image", "no_cache": "true"}, data, "photo.jpg"))
+    fields, upload = asyncio.run(uploads.receive_form(request, str(tmp_path)))
+    assert fields == {"input_type": "image", "no_cache": "true"}
+    assert upload.data == data and upload.path is None
+    assert upload.digest == hashlib.sha256(data).hexdigest()
+    assert os.listdir(tmp_path) == []
+
+def test_receive_form_writes_videos_once_to_unique_files(tmp_path):
+    """
+    This test checks that video uploads are written to unique files in the spool directory, whether
+    the input type arrives before or after the file, with no other copy left behind.
+    """
+    data = os.urandom(5000)
+    request, _ = _request(_form_body({"input_type": "video"}, data))
+    first = asyncio.run(uploads.receive_form(request, str(tmp_path)))[1]
+    body = _form_body({}, data)[:-len(f"--{BOUNDARY}--\r\n")] + _form_body({"input_type": "video"})
+    second = asyncio.run(uploads.receive_form(_request(body)[0], str(tmp_path)))[1]
+    assert first.path != second.path and first.path.endswith(".mp4")
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(upload.path) for upload in [first, second])
+    for upload in [first, second]:
+        with open(upload.path, "rb") as f:
+            assert f.read() == data
+        assert upload.digest == hashlib.sha256(data).hexdigest() and upload.data is None
+        upload.cleanup()
+    assert os.listdir(tmp_path) == []
+
+def test_oversized_uploads_are_rejected_before_being_stored(tmp_path, monkeypatch):
+    """
+    This test checks that an upload over its limit is rejected with 413 from its Content-Length before
+    any of the body is read, and otherwise as soon as the received bytes exceed the limit, without
+    reading the rest of the body and with the partial file removed.
+    """
+    monkeypatch.setattr(uploads, "UPLOAD_LIMITS", {"image": 500, "video": 2000})
+    monkeypatch.setattr(uploads, "MAX_FIELD_BYTES", 100)
+    body = _form_body({"input_type": "video"}, os.urandom(20000))
+
+    request, sent = _request(body)
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(uploads.receive_form(request, str(tmp_path)))
+    assert excinfo.value.status_code == 413 and sent == []
+
+    request, sent = _request(body, content_length=False)
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(uploads.receive_form(request, str(tmp_path)))
+    assert excinfo.value.status_code == 413
+    assert len(sent) * 64 < 4000
+    assert os.listdir(tmp_path) == []
+
+    # An image is held to the image limit
+    request, _ = _request(_form_body({"input_type": "image"}, os.urandom(1000), "a.png"), content_length=False)
+    with pytest.raises(HTTPException):
+        asyncio.run(uploads.receive_form(request, str(tmp_path)))
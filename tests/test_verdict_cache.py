@@ -0,0 +1,36 @@
+from app.services import verdict_cache
+
+def test_cache_keys_normalize_input():
+    """
+    This test checks that equivalent inputs share a cache key and different inputs do not.
+    """
+    assert verdict_cache.make_key("text", "Breaking  news\n today ") == verdict_cache.make_key("TEXT", "Breaking news today")
+    assert verdict_cache.make_key("link", "HTTPS://Example.com/story/#top") == verdict_cache.make_key("link", "https://example.com/story")
+    assert verdict_cache.make_key("text", "Breaking news") != verdict_cache.make_key("link", "Breaking news")
+    assert verdict_cache.make_key("image", content=b"abc") != verdict_cache.make_key("image", content=b"abd")
+
+def test_components_expire_with_their_own_ttl(monkeypatch):
+    """
+    This test stores two components under the same key and checks that only the component
+    whose TTL has passed is reported as a miss.
+    """
+    monkeypatch.setattr(verdict_cache, "VERDICT_CACHE_ENABLED", True)
+    monkeypatch.setattr(verdict_cache, "VERDICT_CACHE_PERSISTENT", False)
+    monkeypatch.setattr(verdict_cache, "COMPONENT_TTLS", {"primary": 3600, "social": 60, "verdict": 60})
+    verdict_cache.clear()
+
+    now = [1000.0]
+    monkeypatch.setattr(verdict_cache.time, "time", lambda: now[0])
+
+    key = verdict_cache.make_key("text", "A viral story")
+    verdict_cache.put(key, "primary", {"veracity_score": 0.8})
+    verdict_cache.put(key, "social", {"twitter": {"score": 0.5}})
+
+    now[0] += 120
+    assert verdict_cache.get(key, "primary") == {"veracity_score": 0.8}
+    assert verdict_cache.get(key, "social") is None
+
+    stats = verdict_cache.get_stats()["components"]
+    assert stats["primary"]["memory_hits"] == 1
+    assert stats["social"]["misses"] == 1
+    verdict_cache.clear()
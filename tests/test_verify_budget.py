@@ -0,0 +1,74 @@
+import time
+import threading
+from fastapi.testclient import TestClient
+from app.main import app
+from app.migrations import migrate
+from app.services import social_service, verdict_cache
+from app.utils.deadline import Deadline
+
+
+# Set at the end of the test, so the stand-ins do not hold the batcher and social threads any longer
+_release = threading.Event()
+
+
+def _slow_instagram(keyword: str) -> tuple:
+    _release.wait(timeout=5)
+    return 0.2, "Instagram stand-in."
+
+def test_deadline_shares():
+    """
+    This test checks that a stage's timeout is its share of the budget, capped by the time left and
+    by its own timeout, and that a deadline without a budget never limits a stage.
+    """
+    deadline = Deadline(10)
+    assert 3.9 < deadline.timeout(0.4) <= 4
+    assert deadline.timeout(0.4, cap=2) == 2
+    deadline.started -= 9
+    assert deadline.timeout(0.4) <= 1
+    deadline.started -= 2
+    assert deadline.expired() and deadline.timeout() == 0
+    assert Deadline().timeout(0.4) is None and Deadline(0).timeout(0.4, cap=5) == 5
+
+def test_verify_returns_a_partial_verdict_within_budget(stand_in_classifier, monkeypatch):
+    """
+    This test runs a verification whose text analysis and Instagram lookup overrun a two-second
+    budget, and checks that the response arrives within the budget with the verdict computed from
+    the platform that completed, the skipped components listed, and nothing cached.
+    """
+    migrate()
+    # The classifier takes longer than the text analysis share of the budget
+    stand_in_classifier.before_call = lambda: _release.wait(timeout=5)
+    monkeypatch.setattr(social_service, "PLATFORM_ANALYZERS", {
+        "twitter": lambda keyword: (0.5, "Twitter stand-in."),
+        "instagram": _slow_instagram,
+    })
+    verdict_cache.clear()
+    social_service.clear_cache()
+
+    client = TestClient(app)
+    started = time.monotonic()
+    try:
+        response = client.post("/news/verify", data={
+            "input_type": "text", "input_data": "Budgeted sample news text.", "budget_seconds": "2"
+        })
+    finally:
+        _release.set()
+    assert time.monotonic() - started < 2
+    assert response.status_code == 200
+    report = response.json()
+
+    assert report["partial"] is True
+    assert report["skipped"] == ["primary", "social.instagram"]
+    assert report["primary_analysis"]["status"] == "timeout"
+    assert report["final_veracity_score"] == 0.5
+    assert report["budget_seconds"] == 2
+    assert report["news_record_id"] is not None
+    key = verdict_cache.make_key("text", "Budgeted sample news text.")
+    assert verdict_cache.get(key, "verdict") is None and verdict_cache.get(key, "primary") is None
+
+def test_verify_rejects_invalid_budget():
+    """
+    This test checks that a budget that is not positive is rejected with a 400 response.
+    """
+    response = TestClient(app).post("/news/verify", data={"input_type": "text", "input_data": "x", "budget_seconds": "0"})
+    assert response.status_code == 400
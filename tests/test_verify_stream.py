@@ -0,0 +1,54 @@
+import json
+import time
+from fastapi.testclient import TestClient
+from app.main import app
+from app.migrations import migrate
+from app.services import social_service, verdict_cache
+
+def _parse_events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def _slow_instagram(keyword: str) -> tuple:
+    time.sleep(0.5)
+    return 0.2, "Instagram stand-in."
+
+def test_verify_stream(stand_in_classifier, monkeypatch):
+    """
+    This test checks that /news/verify/stream sends the primary analysis before the slowest social
+    media platform has answered, one event per platform, then the final verdict with its record id.
+    """
+    migrate()
+    monkeypatch.setattr(social_service, "PLATFORM_ANALYZERS", {
+        "twitter": lambda keyword: (0.5, "Twitter stand-in."),
+        "instagram": _slow_instagram,
+    })
+    verdict_cache.clear()
+    social_service.clear_cache()
+
+    client = TestClient(app)
+    response = client.post("/news/verify/stream", data={"input_type": "text", "input_data": "Streamed sample news text."})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_events(response.text)
+
+    names = [name for name, _ in events]
+    assert sorted(names) == ["final", "primary", "social", "social"]
+    assert names[-1] == "final"
+    assert names.index("primary") < [data.get("platform") for _, data in events].index("instagram")
+    assert events[names.index("primary")][1]["veracity_score"] == 0.8
+
+    final = events[-1][1]
+    assert abs(final["final_veracity_score"] - (0.6 * 0.8 + 0.4 * (0.5 + 0.2) / 2)) < 1e-9
+    assert final["news_record_id"] is not None
+    assert "primary_analysis" not in final
+
+def test_verify_stream_rejects_invalid_input():
+    """
+    This test checks that invalid input is rejected with a 400 response before the stream starts.
+    """
+    response = TestClient(app).post("/news/verify/stream", data={"input_type": "text"})
+    assert response.status_code == 400
@@ -0,0 +1,42 @@
+"""
+Trains the first-pass cascade model (see NLP_CASCADE_ENABLED) from the labeled News rows of the
+application database, and saves it to NLP_CASCADE_MODEL_PATH:
+
+    python train_cascade.py --epochs 5
+
+Rows with id % 5 == 0 are held out for benchmarks/bench_cascade.py.
+"""
+import sys
+import time
+import argparse
+
+from app.config import NLP_CASCADE_MODEL_PATH, NLP_CASCADE_FEATURES
+from app.services import cascade
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--features", type=int, default=NLP_CASCADE_FEATURES, help="size of the hashed feature space")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--learning-rate", type=float, default=0.5)
+    parser.add_argument("--output", default=NLP_CASCADE_MODEL_PATH)
+    args = parser.parse_args()
+
+    texts, labels = cascade.labeled_news(held_out=False)
+    if not texts:
+        print("No labeled News rows to train on.")
+        return 1
+    started = time.perf_counter()
+    model = cascade.train(texts, labels, args.features, args.epochs, args.learning_rate)
+    print(f"Trained on {len(texts)} rows ({sum(labels)} real) in {time.perf_counter() - started:.1f}s")
+
+    held_out_texts, held_out_labels = cascade.labeled_news(held_out=True)
+    if held_out_texts:
+        scores = model.score(held_out_texts)
+        correct = sum((score > 0.5) == bool(label) for score, label in zip(scores, held_out_labels))
+        print(f"Accuracy on {len(held_out_texts)} held-out rows: {correct / len(held_out_texts):.3f}")
+    model.save(args.output)
+    print(f"Saved to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())